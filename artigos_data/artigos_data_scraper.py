@@ -2,8 +2,14 @@
 # -*- coding: utf-8 -*-
 
 import os
+import re
+import sys
+import json
 import time
-import pandas as pd
+import queue
+import asyncio
+import argparse
+import threading
 import logging
 from datetime import datetime
 
@@ -13,6 +19,23 @@ from selenium.common.exceptions import WebDriverException, NoSuchElementExceptio
 from selenium.webdriver.chrome.service import Service as ChromeService
 from selenium.webdriver.edge.service import Service as EdgeService
 
+# Módulos compartilhados (pasta comum/ na raiz do repositório)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from comum.parquet_incremental import EscritorParquet
+from comum.extracao_http import criar_sessao, baixar_html, parse_html, extrair_campos, campos_faltando
+from comum.espera import EsperaAdaptativa
+from comum.fronteira import Fronteira, FILA_ARTIGOS, PENDENTE
+from comum.oai_pmh import listar_registros, janelas, OAI_URL
+from comum.mets_dim import url_mets, parse_dim, valores
+from comum.http_async import buscar_concorrente, CONCORRENCIA, REQ_POR_SEGUNDO
+from comum.cache_http import CacheHTTP, interpretar_ttls
+from comum.ritmo import (ControladorRitmo, ErroProxy, requisicao, penalizar, erro_de_proxy, CLASSE_NAVEGADOR,
+                         RITMO_DB, CONCORRENCIA_MAX)
+from comum.extracao_navegador import extrair_campos_navegador
+from comum.campos import Campo, Especificacao
+from comum.metricas import Metricas
+from comum.navegador_leve import aplicar_perfil, ativar_bloqueio, medir_pagina, descrever_medida, PERFIS, PERFIL_PADRAO
+
 # -------------------------------------------------------------------------
 # CONFIGURAÇÕES
 # -------------------------------------------------------------------------
@@ -29,17 +52,45 @@ logging.basicConfig(
 PARQUET_FILE = "arq_articulos_authors/articulos.parquet"
 CHECKPOINT_FILE = "arq_articulos_authors/execucao_checkpoint.txt"
 LINKS_FILE = "saida_arq_articulo_link/links_coletados.txt"
+READY_TIMES_FILE = "arq_articulos_authors/tempos_prontidao.json"
+OAI_CHECKPOINT_FILE = "arq_articulos_authors/oai_checkpoint.json"
+CACHE_DIR = "arq_articulos_authors/cache_http"
+
+MAX_TENTATIVAS_LINK = 3
+
+# Espera explícita pelo título/autores do item (timeout derivado do p99 observado)
+ESPERA = EsperaAdaptativa(READY_TIMES_FILE)
+
+# Tempos por etapa, erros e ETA (metricas.json / metricas.prom; --metrics-port para HTTP)
+METRICAS = Metricas("artigos", "arq_articulos_authors/metricas")
+
+# Ritmo AIMD com orçamento da máquina (comum/ritmo.py), configurado na CLI
+RITMO = None
+
+# Layout do dataset (comum/parquet_incremental.py): dicionário só nas colunas de
+# poucos valores; as partições hive por ano e tipo vêm na compactação
+# (comum/compactacao.py), a coleta grava uma parte plana por flush
+COMPRESSAO = "zstd"
+NIVEL_COMPRESSAO = 6
+COLUNAS_DICIONARIO = ["Idioma", "Revista", "Editorial", "Tipo de Recurso", "Data de Publicacao"]
+
+def abrir_escritor(**opcoes):
+    return EscritorParquet(PARQUET_FILE,
+                           dicionario=COLUNAS_DICIONARIO,
+                           compressao=COMPRESSAO, nivel_compressao=NIVEL_COMPRESSAO,
+                           **opcoes)
 
 # -------------------------------------------------------------------------
 # FUNÇÃO PARA INICIAR DRIVER LOCAL (sem webdriver_manager)
 # -------------------------------------------------------------------------
 
-def iniciar_driver_local(browser="edge", driver_path=None, headless=False):
+def iniciar_driver_local(browser="edge", driver_path=None, headless=False, perfil=PERFIL_PADRAO):
     if browser.lower() == "edge":
         options = webdriver.EdgeOptions()
         options.use_chromium = True
         if headless:
             options.add_argument("--headless=new")
+        aplicar_perfil(options, perfil)
 
         if driver_path:
             service = EdgeService(executable_path=driver_path)
@@ -51,6 +102,7 @@ def iniciar_driver_local(browser="edge", driver_path=None, headless=False):
         options = webdriver.ChromeOptions()
         if headless:
             options.add_argument("--headless=new")
+        aplicar_perfil(options, perfil)
 
         if driver_path:
             service = ChromeService(executable_path=driver_path)
@@ -61,8 +113,17 @@ def iniciar_driver_local(browser="edge", driver_path=None, headless=False):
     else:
         raise ValueError("Browser inválido (use 'chrome' ou 'edge').")
 
+    ativar_bloqueio(driver, perfil)
     return driver
 
+def driver_saudavel(driver):
+    """Health-check barato: uma chamada ao driver que não navega."""
+    try:
+        driver.execute_script("return 1")
+        return True
+    except Exception:
+        return False
+
 # -------------------------------------------------------------------------
 # UTILITÁRIOS
 # -------------------------------------------------------------------------
@@ -73,114 +134,679 @@ def escapar_texto(texto):
         texto = texto.replace('\n', ' ').replace('\r', ' ')
     return texto
 
-def salvar_dados(dados, arquivo_parquet):
-    os.makedirs(os.path.dirname(arquivo_parquet), exist_ok=True)
-
-    df_new = pd.DataFrame([dados])
-
-    if os.path.exists(arquivo_parquet):
-        try:
-            df_exist = pd.read_parquet(arquivo_parquet)
-            df = pd.concat([df_exist, df_new], ignore_index=True)
-        except:
-            df = df_new
-    else:
-        df = df_new
-
-    df.to_parquet(arquivo_parquet, engine="pyarrow", index=False)
+def salvar_dados(dados, escritor):
+    # O escritor acumula as linhas e grava partes em PARQUET_FILE/ (diretório)
+    escritor.escrever(dados)
 
 def salvar_checkpoint(path, lista):
     with open(path, "w") as f:
         f.write("\n".join(lista))
 
+def consumir_links(caminho, processados):
+    """
+    Tira de `caminho` os links já gravados (delta da coleta incremental). Relê
+    o arquivo na hora: linhas acrescentadas durante a execução ficam.
+    """
+    feitos = set(processados)
+    with open(caminho, "r", encoding="utf-8") as f:
+        restantes = [l for l in f.read().splitlines() if l and l not in feitos]
+    tmp = caminho + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.writelines(l + "\n" for l in restantes)
+    os.replace(tmp, caminho)
+    return len(restantes)
+
 # -------------------------------------------------------------------------
 # EXTRAÇÃO DE INFORMAÇÕES DO ARTIGO
 # -------------------------------------------------------------------------
 
+# Campos da página do item — usados tanto no Selenium quanto no lxml (ver comum/campos.py)
+CAMPOS_ARTIGO = Especificacao([
+    Campo("Titulo", '//h1[@style="font-size:150%;font-weight: 500;font-family: \'Roboto\'; margin-top: 3px;"]'),
+    Campo("Autores", '//div[@class="simple-item-view-authors"]//a', multi=True),
+    Campo("Data de Publicacao", '//div[@class="simple-item-view-other"]/span[contains(text(), "Fecha de publicación:")]/following-sibling::span'),
+    Campo("Editorial", '//div[@class="simple-item-view-other"]/span[contains(text(), "Editorial:")]/following-sibling::span'),
+    Campo("Revista", '//div[@class="simple-item-view-other"]/span[contains(text(), "Revista:")]/following-sibling::span'),
+    Campo("ISSN", '//div[@class="simple-item-view-other"]/span[contains(text(), "ISSN:")]/following-sibling::span'),
+    Campo("e-ISSN", '//div[@class="simple-item-view-other"]/span[contains(text(), "e-ISSN:")]/following-sibling::span'),
+    Campo("ISBN", '//div[@class="simple-item-view-other"]/span[contains(text(), "ISBN:")]/following-sibling::span'),
+    Campo("Idioma", '//div[@class="simple-item-view-other"]/span[contains(text(), "Idioma:")]/following-sibling::span'),
+    Campo("Tipo de Recurso", '//div[@class="simple-item-view-other"]/span[contains(text(), "Tipo de recurso:")]/following-sibling::span'),
+    Campo("Resumo", '//div[@class="simple-item-view-description"]//div[@style="overflow-wrap: break-word;"]'),
+    Campo("Palavras-chave", '//div[@class="simple-item-view-description"]//a[contains(@href, "/discover?filtertype=subject")]', multi=True),
+    Campo("URI", '//span[contains(text(), "URI:")]/following-sibling::a', attr="href"),
+    Campo("URL_1", '(//span[contains(text(), "URL:")]/following-sibling::a)[1]', attr="href"),
+    Campo("URL_2", '(//span[contains(text(), "URL:")]/following-sibling::a)[2]', attr="href"),
+    Campo("DOI", '//span[contains(text(), "DOI:")]/following-sibling::a', attr="href"),
+    Campo("dc_identifier", '//meta[@name="DC.identifier"]', attr="content"),
+    Campo("metadata", '//div[@class="item-summary-view-metadata"]'),
+])
+
+# Sem estes campos a página HTTP é considerada incompleta e vai para o Selenium
+CAMPOS_OBRIGATORIOS = ("Titulo", "Autores")
+
 def extrair_informacoes(driver, url):
-    driver.get(url)
-    time.sleep(3)
+    with METRICAS.etapa("carga_pagina"), requisicao(RITMO, url, CLASSE_NAVEGADOR) as r:
+        driver.get(url)
+        ESPERA.aguardar(driver, "artigo")
+        if erro_de_proxy(driver.title):
+            r.sinalizar("proxy")
+            raise ErroProxy(url)
+    logging.info(f"Selenium {url}: {descrever_medida(medir_pagina(driver))}")
+    inicio_extracao = time.perf_counter()
 
     dados = {"url": url}
 
-    def safe_xpath(xpath, attr="text", multi=False):
+    def safe_xpath(xpath, attr="text", multi=False, juntar="; "):
+        valor = lambda e: (e.get_attribute(attr) or "") if attr != "text" else e.text
         try:
             if multi:
                 elems = driver.find_elements(By.XPATH, xpath)
-                return "; ".join([escapar_texto(e.text) for e in elems])
-            elem = driver.find_element(By.XPATH, xpath)
-            return escapar_texto(elem.get_attribute(attr) if attr != "text" else elem.text)
+                return juntar.join([escapar_texto(valor(e)) for e in elems])
+            return escapar_texto(valor(driver.find_element(By.XPATH, xpath)))
         except:
             return ""
 
-    dados["Titulo"] = safe_xpath('//h1[@style="font-size:150%;font-weight: 500;font-family: \'Roboto\'; margin-top: 3px;"]')
-    dados["Autores"] = safe_xpath('//div[@class="simple-item-view-authors"]//a', multi=True)
-    dados["Data de Publicacao"] = safe_xpath('//div[@class="simple-item-view-other"]/span[contains(text(), "Fecha de publicación:")]/following-sibling::span')
-    dados["Editorial"] = safe_xpath('//div[@class="simple-item-view-other"]/span[contains(text(), "Editorial:")]/following-sibling::span')
-    dados["Revista"] = safe_xpath('//div[@class="simple-item-view-other"]/span[contains(text(), "Revista:")]/following-sibling::span')
-    dados["ISSN"] = safe_xpath('//div[@class="simple-item-view-other"]/span[contains(text(), "ISSN:")]/following-sibling::span')
-    dados["e-ISSN"] = safe_xpath('//div[@class="simple-item-view-other"]/span[contains(text(), "e-ISSN:")]/following-sibling::span')
-    dados["ISBN"] = safe_xpath('//div[@class="simple-item-view-other"]/span[contains(text(), "ISBN:")]/following-sibling::span')
-    dados["Idioma"] = safe_xpath('//div[@class="simple-item-view-other"]/span[contains(text(), "Idioma:")]/following-sibling::span')
-    dados["Tipo de Recurso"] = safe_xpath('//div[@class="simple-item-view-other"]/span[contains(text(), "Tipo de recurso:")]/following-sibling::span')
-    dados["Resumo"] = safe_xpath('//div[@class="simple-item-view-description"]//div[@style="overflow-wrap: break-word;"]')
-    dados["Palavras-chave"] = safe_xpath('//div[@class="simple-item-view-description"]//a[contains(@href, "/discover?filtertype=subject")]', multi=True)
-    dados["URI"] = safe_xpath('//span[contains(text(), "URI:")]/following-sibling::a', attr="href")
-    dados["URL_1"] = safe_xpath('(//span[contains(text(), "URL:")]/following-sibling::a)[1]', attr="href")
-    dados["URL_2"] = safe_xpath('(//span[contains(text(), "URL:")]/following-sibling::a)[2]', attr="href")
-    dados["DOI"] = safe_xpath('//span[contains(text(), "DOI:")]/following-sibling::a', attr="href")
-    dados["dc_identifier"] = safe_xpath('//meta[@name="DC.identifier"]', attr="content")
-    dados["metadata"] = safe_xpath('//div[@class="item-summary-view-metadata"]')
+    # Todos os campos num único execute_script; o que falhar lá vai campo a campo
+    extraidos, falhos = extrair_campos_navegador(driver, CAMPOS_ARTIGO, tratar=escapar_texto)
+    for spec, (campo, xpath, attr, multi) in zip(CAMPOS_ARTIGO, CAMPOS_ARTIGO.para_navegador()):
+        if campo in falhos:
+            dados[campo] = safe_xpath(xpath, attr=attr, multi=multi, juntar=spec.juntar)
+        else:
+            dados[campo] = extraidos[campo]
 
+    METRICAS.observar("extracao", time.perf_counter() - inicio_extracao)
+    return dados
+
+def extrair_informacoes_http(sessao, url, cache=None):
+    """Mesmos campos de extrair_informacoes, via requests + lxml (sem navegador)."""
+    doc = parse_html(baixar_html(sessao, url, cache=cache, ritmo=RITMO), url)
+    if erro_de_proxy(doc.findtext(".//title")):
+        penalizar(RITMO, url, "proxy")
+        raise ErroProxy(url)
+    dados = {"url": url}
+    dados.update(extrair_campos(doc, CAMPOS_ARTIGO, url=url, tratar=escapar_texto))
     return dados
 
 # -------------------------------------------------------------------------
 # PROCESSAMENTO PRINCIPAL
 # -------------------------------------------------------------------------
 
-def processar_links(driver, links):
-    logging.info("Iniciando processamento dos links.")
+class ExtratorArtigos:
+    """
+    Escolhe o motor de extração por item.
+    engine="http": requests + lxml; o Selenium só é aberto (uma vez, sob demanda)
+    quando faltam campos obrigatórios ou a requisição falha.
+    engine="selenium": comportamento original, navegador para todos os itens.
+    """
+
+    def __init__(self, engine="http", browser="edge", driver_path=None, headless=False, cache=None,
+                 perfil=PERFIL_PADRAO):
+        self.engine = engine
+        self.perfil = perfil
+        self.cache = cache
+        self.browser = browser
+        self.driver_path = driver_path
+        self.headless = headless
+        self.sessao = criar_sessao() if engine == "http" else None
+        self.driver = None
+        self.fallbacks = 0
+
+    def _driver(self):
+        if self.driver is not None and not driver_saudavel(self.driver):
+            logging.warning("Driver não responde; substituindo.")
+            self.reiniciar_driver()
+        if self.driver is None:
+            self.driver = iniciar_driver_local(browser=self.browser, driver_path=self.driver_path,
+                                               headless=self.headless, perfil=self.perfil)
+        return self.driver
+
+    def reiniciar_driver(self):
+        if self.driver is not None:
+            try:
+                self.driver.quit()
+            except Exception:
+                pass
+            self.driver = None
+
+    def extrair(self, url):
+        if self.engine == "http":
+            try:
+                with METRICAS.etapa("extracao_http"):
+                    dados = extrair_informacoes_http(self.sessao, url, self.cache)
+                faltando = campos_faltando(dados, CAMPOS_OBRIGATORIOS)
+                if not faltando:
+                    return dados
+                if self.cache is not None:
+                    # página incompleta (erro/proxy) não fica no cache
+                    self.cache.invalidar(url)
+                logging.warning(f"HTTP incompleto ({', '.join(faltando)}), usando Selenium: {url}")
+            except Exception as e:
+                logging.warning(f"HTTP falhou ({e}), usando Selenium: {url}")
+                METRICAS.erro(e)
+            self.fallbacks += 1
+            METRICAS.contar("fallback_selenium")
+        return extrair_informacoes(self._driver(), url)
+
+    def fechar(self):
+        self.reiniciar_driver()
+        if self.sessao is not None:
+            self.sessao.close()
+
+class FonteLista:
+    """Links em memória (links_coletados.txt); retentativas controladas aqui."""
+
+    def __init__(self, links):
+        self.fila = queue.Queue()
+        self.tentativas = {}
+        for link in links:
+            self.fila.put(link)
+
+    def proximo(self):
+        try:
+            return self.fila.get_nowait()
+        except queue.Empty:
+            return None
+
+    def falhou(self, link, erro):
+        """True se o link voltou para a fila."""
+        self.tentativas[link] = self.tentativas.get(link, 0) + 1
+        if self.tentativas[link] < MAX_TENTATIVAS_LINK:
+            self.fila.put(link)
+            return True
+        return False
+
+    def manter(self, links):
+        pass
+
+    def gravados(self, links):
+        pass
+
+class FonteFronteira:
+    """
+    Links arrendados da fronteira compartilhada (comum/fronteira.py): vários
+    processos podem consumir a mesma fila sem duplicar itens. Um link só é
+    marcado como concluído depois que sua linha foi gravada em disco; até lá
+    o lease dos links extraídos é renovado (manter), senão outro processo
+    receberia de novo o que só está esperando o flush.
+    """
+
+    def __init__(self, caminho):
+        self.caminho = caminho
+        self.fronteira = Fronteira(caminho, max_tentativas=MAX_TENTATIVAS_LINK)
+        self._renovado = time.monotonic()
+
+    def proximo(self):
+        itens = self.fronteira.arrendar(FILA_ARTIGOS, 1)
+        return itens[0][0] if itens else None
+
+    def falhou(self, link, erro):
+        if not self.fronteira.falhar(FILA_ARTIGOS, link, erro):
+            logging.warning(f"Lease de {link} vencido; falha não registrada na fronteira")
+            return False
+        return self.fronteira.status(FILA_ARTIGOS, link) == PENDENTE
+
+    def manter(self, links):
+        # renova com folga: a cada terço do lease
+        if not links or time.monotonic() - self._renovado < self.fronteira.lease_segundos / 3:
+            return
+        self._renovado = time.monotonic()
+        for link in self.fronteira.renovar(FILA_ARTIGOS, links):
+            logging.warning(f"Lease de {link} vencido antes do flush; outro processo pode repeti-lo")
+
+    def gravados(self, links):
+        if links:
+            for link in self.fronteira.concluir(FILA_ARTIGOS, links):
+                logging.warning(f"Lease de {link} vencido; gravado aqui mas entregue a outro processo")
+
+def _trabalhador(n, fonte, resultados, opcoes_extrator):
+    """
+    Um extrator (e no máximo um navegador) por thread. Um driver com falha é
+    substituído aqui mesmo, sem afetar os outros trabalhadores; o link volta
+    para a fonte até MAX_TENTATIVAS_LINK.
+    """
+    extrator = ExtratorArtigos(**opcoes_extrator)
+    try:
+        while True:
+            link = fonte.proximo()
+            if link is None:
+                return
+            try:
+                logging.info(f"[w{n}] Processando: {link}")
+                resultados.put(("ok", link, extrator.extrair(link)))
+            except Exception as e:
+                METRICAS.erro(e)
+                if isinstance(e, WebDriverException):
+                    extrator.reiniciar_driver()
+                if not fonte.falhou(link, e):
+                    resultados.put(("erro", link, e))
+                if RITMO is None:
+                    with METRICAS.etapa("espera"):
+                        time.sleep(2)
+    finally:
+        extrator.fechar()
+        resultados.put(("fim", n, extrator.fallbacks))
+
+def _registrar_progresso():
+    """Grava as métricas (a cada METRICAS.intervalo s) e loga a ETA junto."""
+    if METRICAS.flush_se_necessario():
+        d = METRICAS.instantaneo()
+        eta = f"{d['eta_s'] / 3600:.2f}h" if d["eta_s"] is not None else "?"
+        logging.info(f"PROGRESSO: {d['concluidos']}/{d['total'] or '?'} | "
+                     f"{d['taxa_ewma_por_s'] or 0:.2f} itens/s (EWMA) | ETA {eta}")
+
+def processar_links(links, workers=1, fronteira=None, **opcoes_extrator):
+    """
+    Pool de `workers` extratores alimentados por uma fonte compartilhada
+    (lista em memória ou, com `fronteira`, a fila SQLite com leases).
+    A gravação fica só nesta thread, então a saída continua sendo um único dataset.
+    """
+    logging.info(f"Iniciando processamento dos links ({workers} worker(s)).")
     processados = []
+    fallbacks = 0
 
-    for link in links:
-        try:
-            logging.info(f"Processando: {link}")
-            dados = extrair_informacoes(driver, link)
-            salvar_dados(dados, PARQUET_FILE)
-            processados.append(link)
-        except Exception as e:
-            logging.error(f"Erro no link {link}: {e}")
-            time.sleep(2)
+    if fronteira:
+        fonte = FonteFronteira(fronteira)
+        novos = fonte.fronteira.enfileirar(FILA_ARTIGOS, links)
+        logging.info(f"Fronteira {fronteira}: {novos} links novos; {fonte.fronteira.contagem(FILA_ARTIGOS)}")
+    else:
+        fonte = FonteLista(links)
+    resultados = queue.Queue(maxsize=workers * 4)
+
+    threads = [
+        threading.Thread(target=_trabalhador, args=(n, fonte, resultados, opcoes_extrator), daemon=True)
+        for n in range(workers)
+    ]
+    for t in threads:
+        t.start()
+
+    ativos = len(threads)
+    aguardando_gravacao = []
+    with abrir_escritor(flush_automatico=False) as escritor:
+        while ativos:
+            try:
+                tipo, chave, valor = resultados.get(timeout=60)
+            except queue.Empty:
+                # trabalhadores lentos: os leases do que espera o flush não podem vencer
+                fonte.manter(aguardando_gravacao)
+                continue
+            if tipo == "ok":
+                with METRICAS.etapa("persistencia"):
+                    salvar_dados(valor, escritor)
+                    processados.append(chave)
+                    aguardando_gravacao.append(chave)
+                    if escritor.flush_se_necessario():
+                        fonte.gravados(aguardando_gravacao)
+                        aguardando_gravacao = []
+                    else:
+                        fonte.manter(aguardando_gravacao)
+                METRICAS.progresso(len(processados), len(links))
+                _registrar_progresso()
+            elif tipo == "erro":
+                logging.error(f"Erro no link {chave}: {valor}")
+            else:
+                ativos -= 1
+                fallbacks += valor
+    fonte.gravados(aguardando_gravacao)
+
+    logging.info(f"Fallbacks para Selenium: {fallbacks}")
+    ESPERA.salvar()
+    logging.info(f"Tempos de prontidão: {ESPERA.resumo()}")
+    return processados
 
+# -------------------------------------------------------------------------
+# EXTRAÇÃO VIA METS/DIM
+# -------------------------------------------------------------------------
+
+# coluna -> chaves DIM em ordem de preferência; True = multivalorado ("; ")
+CAMPOS_DIM = [
+    ("Titulo", ["dc.title"], False),
+    ("Autores", ["dc.contributor.author", "dc.creator"], True),
+    ("Data de Publicacao", ["dc.date.issued"], False),
+    ("Editorial", ["dc.publisher"], False),
+    ("Revista", ["dc.journal.title", "dc.relation.ispartof", "dc.source"], False),
+    ("ISSN", ["dc.identifier.issn", "dc.journal.issn"], False),
+    ("e-ISSN", ["dc.identifier.eissn", "dc.journal.eissn"], False),
+    ("ISBN", ["dc.identifier.isbn"], False),
+    ("Idioma", ["dc.language.iso", "dc.language"], False),
+    ("Tipo de Recurso", ["dc.type"], False),
+    ("Resumo", ["dc.description.abstract"], False),
+    ("Palavras-chave", ["dc.subject"], True),
+    ("URI", ["dc.identifier.uri"], False),
+    ("DOI", ["dc.identifier.doi"], False),
+]
+
+def dim_para_dados(url, campos):
+    """Campos DIM -> mesmas colunas de extrair_informacoes."""
+    dados = {"url": url}
+    for coluna, chaves, multi in CAMPOS_DIM:
+        vals = valores(campos, chaves)
+        if multi:
+            dados[coluna] = "; ".join(escapar_texto(v) for v in vals)
+        else:
+            dados[coluna] = escapar_texto(vals[0]) if vals else ""
+    if dados["DOI"] and not dados["DOI"].startswith("http"):
+        dados["DOI"] = "https://doi.org/" + dados["DOI"].split("doi:", 1)[-1].strip()
+    urls = valores(campos, ["dc.identifier.url"])
+    dados["URL_1"] = urls[0] if len(urls) > 0 else ""
+    dados["URL_2"] = urls[1] if len(urls) > 1 else ""
+    dados["dc_identifier"] = dados["URI"]
+    dados["metadata"] = ""
+    # mesma ordem de colunas das outras engines
+    return {c: dados.get(c, "") for c in ["url"] + CAMPOS_ARTIGO.nomes}
+
+def processar_links_mets(links, concorrencia=CONCORRENCIA, req_por_segundo=REQ_POR_SEGUNDO, cache=None,
+                         **opcoes_extrator):
+    """
+    Baixa o mets.xml de vários itens em paralelo (asyncio) e grava conforme chegam.
+    Itens sem os campos obrigatórios ou com erro seguem pela engine http
+    (que ainda tem o Selenium como último recurso).
+    """
+    logging.info(f"Iniciando processamento METS/DIM ({concorrencia} downloads simultâneos).")
+    processados = []
+    refazer = []
+
+    with abrir_escritor() as escritor:
+        def ao_receber(link, url, conteudo):
+            try:
+                dados = dim_para_dados(link, parse_dim(conteudo))
+            except Exception as e:
+                logging.warning(f"METS inválido ({e}): {link}")
+                dados = None
+            if dados is None or campos_faltando(dados, CAMPOS_OBRIGATORIOS):
+                if cache is not None:
+                    cache.invalidar(url)
+                refazer.append(link)
+                return
+            with METRICAS.etapa("persistencia"):
+                salvar_dados(dados, escritor)
+            processados.append(link)
+            METRICAS.progresso(len(processados), len(links))
+            _registrar_progresso()
+
+        def ao_falhar(link, url, erro):
+            METRICAS.erro(erro)
+            logging.warning(f"METS falhou ({erro}): {link}")
+            refazer.append(link)
+
+        asyncio.run(buscar_concorrente(
+            ((link, url_mets(link)) for link in links),
+            ao_receber, ao_falhar,
+            concorrencia=concorrencia, req_por_segundo=req_por_segundo,
+            tentativas=MAX_TENTATIVAS_LINK, cache=cache, ritmo=RITMO,
+        ))
+
+    logging.info(f"METS: {len(processados)} itens gravados, {len(refazer)} para a engine http.")
+    if refazer:
+        opcoes_extrator["engine"] = "http"
+        processados += processar_links(refazer, cache=cache, **opcoes_extrator)
     return processados
 
+# -------------------------------------------------------------------------
+# COLETA EM LOTE VIA OAI-PMH
+# -------------------------------------------------------------------------
+
+_ISSN = re.compile(r"^(?:issn:?\s*)?(\d{4}-\d{3}[\dXx])$", re.I)
+_ISBN = re.compile(r"^(?:isbn:?\s*)?((?:97[89][-\s]?)?\d[\d\-\s]{8,}[\dXx])$", re.I)
+_DOI = re.compile(r"(?:doi\.org/|^doi:\s*|^)(10\.\d{4,9}/\S+)$", re.I)
+
+def _juntar(valores):
+    return "; ".join(escapar_texto(v) for v in valores)
+
+def _primeiro(valores):
+    return escapar_texto(valores[0]) if valores else ""
+
+def registro_oai_para_dados(registro):
+    """
+    Converte um registro oai_dc/qdc para as mesmas colunas de extrair_informacoes.
+    Os identificadores (handle, DOI, ISSN, ISBN, URLs) vêm misturados em
+    dc:identifier e são separados pelo formato.
+    """
+    campos = registro["campos"]
+    handle = registro["identificador"].rsplit(":", 1)[-1]  # oai:ri.conicet.gov.ar:11336/12345
+    dados = {"url": f"https://ri.conicet.gov.ar/handle/{handle}"}
+
+    identificadores = campos.get("identifier", []) + campos.get("relation", [])
+    uri, doi, issns, isbns, urls = "", "", [], [], []
+    for ident in identificadores:
+        # dc:relation do DSpace: info:eu-repo/semantics/altIdentifier/<tipo>/<valor>
+        ident = ident.split("/altIdentifier/", 1)[-1].split("/", 1)[-1] if "/altIdentifier/" in ident else ident
+        if "hdl.handle.net/" in ident or "/handle/" in ident:
+            uri = uri or ident
+        elif _DOI.search(ident):
+            doi = doi or ("https://doi.org/" + _DOI.search(ident).group(1))
+        elif _ISSN.match(ident):
+            issns.append(_ISSN.match(ident).group(1))
+        elif _ISBN.match(ident):
+            isbns.append(_ISBN.match(ident).group(1))
+        elif ident.startswith("http"):
+            urls.append(ident)
+
+    # oai_dc mistura accessioned/available/issued em dc:date; a de publicação não tem hora
+    datas = campos.get("issued") or [d for d in campos.get("date", []) if "T" not in d]
+
+    dados["Titulo"] = _primeiro(campos.get("title", []))
+    dados["Autores"] = _juntar(campos.get("creator", []) or campos.get("contributor", []))
+    dados["Data de Publicacao"] = _primeiro(datas)
+    dados["Editorial"] = _primeiro(campos.get("publisher", []))
+    dados["Revista"] = _primeiro([v for v in campos.get("source", []) if not _ISSN.match(v)])
+    dados["ISSN"] = issns[0] if issns else ""
+    dados["e-ISSN"] = issns[1] if len(issns) > 1 else ""
+    dados["ISBN"] = isbns[0] if isbns else ""
+    dados["Idioma"] = _primeiro(campos.get("language", []))
+    dados["Tipo de Recurso"] = _primeiro(campos.get("type", []))
+    dados["Resumo"] = _primeiro(campos.get("abstract", []) or campos.get("description", []))
+    dados["Palavras-chave"] = _juntar(campos.get("subject", []))
+    dados["URI"] = uri or dados["url"]
+    dados["URL_1"] = urls[0] if len(urls) > 0 else ""
+    dados["URL_2"] = urls[1] if len(urls) > 1 else ""
+    dados["DOI"] = doi
+    dados["dc_identifier"] = uri
+    dados["metadata"] = ""
+    return dados
+
+def _carregar_checkpoint_oai():
+    if os.path.exists(OAI_CHECKPOINT_FILE):
+        with open(OAI_CHECKPOINT_FILE, "r", encoding="utf-8") as f:
+            return json.load(f)
+    return {}
+
+def _salvar_checkpoint_oai(checkpoint):
+    os.makedirs(os.path.dirname(OAI_CHECKPOINT_FILE), exist_ok=True)
+    tmp = OAI_CHECKPOINT_FILE + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(checkpoint, f, indent=2)
+    os.replace(tmp, OAI_CHECKPOINT_FILE)
+
+def _colher_janela(chave, de, ate, token, resultados, base_url, metadata_prefix, set_spec):
+    try:
+        def ao_pagina(proximo):
+            # marcador na fila: tudo desta página já foi entregue antes dele
+            resultados.put(("token", chave, proximo))
+
+        for registro in listar_registros(base_url, metadata_prefix, de=de, ate=ate, set_spec=set_spec,
+                                         token=token, ao_pagina=ao_pagina, ritmo=RITMO):
+            if not registro["apagado"]:
+                resultados.put(("ok", registro["identificador"], registro_oai_para_dados(registro)))
+    except Exception as e:
+        resultados.put(("erro", chave, e))
+    finally:
+        resultados.put(("fim", chave, None))
+
+def coletar_oai(base_url=OAI_URL, metadata_prefix="oai_dc", de=None, ate=None,
+                dias_janela=None, paralelo=1, set_spec=None):
+    """
+    Harvest ListRecords para PARQUET_FILE. Com de/ate/dias_janela o intervalo é
+    dividido em janelas colhidas em paralelo; cada janela guarda o último
+    resumptionToken em OAI_CHECKPOINT_FILE (só depois das linhas estarem em disco).
+    """
+    if de and ate and dias_janela:
+        lista_janelas = janelas(de, ate, dias_janela)
+    else:
+        lista_janelas = [(de, ate)]
+
+    checkpoint = _carregar_checkpoint_oai()
+    pendentes = []
+    for j_de, j_ate in lista_janelas:
+        chave = f"{j_de or ''}..{j_ate or ''}"
+        estado = checkpoint.get(chave, {})
+        if estado.get("concluida"):
+            continue
+        pendentes.append((chave, j_de, j_ate, estado.get("token")))
+    logging.info(f"OAI: {len(pendentes)} janela(s) pendente(s) de {len(lista_janelas)}.")
+
+    resultados = queue.Queue(maxsize=1000)
+    fila_janelas = queue.Queue()
+    for item in pendentes:
+        fila_janelas.put(item)
+
+    def trabalhador():
+        while True:
+            try:
+                chave, j_de, j_ate, token = fila_janelas.get_nowait()
+            except queue.Empty:
+                return
+            _colher_janela(chave, j_de, j_ate, token, resultados, base_url, metadata_prefix, set_spec)
+
+    n_threads = max(1, min(paralelo, len(pendentes)))
+    threads = [threading.Thread(target=trabalhador, daemon=True) for _ in range(n_threads)]
+    for t in threads:
+        t.start()
+
+    total = 0
+    restantes = len(pendentes)
+    tokens_pendentes = {}
+    with abrir_escritor(flush_automatico=False) as escritor:
+        while restantes:
+            tipo, chave, valor = resultados.get()
+            if tipo == "ok":
+                with METRICAS.etapa("persistencia"):
+                    salvar_dados(valor, escritor)
+                total += 1
+                METRICAS.progresso(total)
+                _registrar_progresso()
+            elif tipo == "token":
+                tokens_pendentes[chave] = valor
+            elif tipo == "erro":
+                METRICAS.erro(valor)
+                # o token já recebido continua valendo: as linhas antes dele estão
+                # no escritor, e a retomada parte dali (sem repetir a página)
+                logging.error(f"OAI janela {chave}: {valor}")
+            else:
+                restantes -= 1
+            if tokens_pendentes and escritor.flush_se_necessario():
+                for c, token in tokens_pendentes.items():
+                    checkpoint[c] = {"token": token, "concluida": token is None}
+                _salvar_checkpoint_oai(checkpoint)
+                tokens_pendentes = {}
+    for c, token in tokens_pendentes.items():
+        checkpoint[c] = {"token": token, "concluida": token is None}
+    _salvar_checkpoint_oai(checkpoint)
+
+    logging.info(f"OAI: {total} registros gravados.")
+    return total
+
 # -------------------------------------------------------------------------
 # EXECUÇÃO
 # -------------------------------------------------------------------------
 
 if __name__ == "__main__":
-    # --- INICIA DRIVER LOCAL (como o outro script) ---
-    driver = iniciar_driver_local(browser="edge", driver_path=None, headless=False)
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--engine", type=str, default="http", choices=["http", "selenium", "mets", "oai"],
+                        help="http: requests + lxml com fallback para Selenium; selenium: navegador em todos os itens; "
+                             "mets: mets.xml (DIM) em paralelo com fallback para http; "
+                             "oai: coleta em lote via OAI-PMH (não usa a lista de links)")
+    parser.add_argument("--browser", type=str, default="edge", choices=["edge", "chrome"])
+    parser.add_argument("--driver-path", type=str, default=None)
+    parser.add_argument("--headless", action="store_true")
+    parser.add_argument("--browser-profile", type=str, default=PERFIL_PADRAO, choices=PERFIS,
+                        help="sem_midia (padrão): bloqueia imagens, fontes e rastreadores; leve: também o CSS "
+                             "(pode mudar o .text dos campos)")
+    parser.add_argument("--workers", type=int, default=1, help="extratores (navegadores) em paralelo")
+    parser.add_argument("--frontier", type=str, default=None,
+                        help="fronteira SQLite compartilhada (ex.: fronteira.sqlite); permite vários processos")
+    parser.add_argument("--concurrency", type=int, default=CONCORRENCIA, help="downloads simultâneos (engine mets)")
+    parser.add_argument("--rate", type=float, default=REQ_POR_SEGUNDO,
+                        help="teto de requisições/s por host do controle de ritmo (somando os processos da máquina)")
+    parser.add_argument("--max-concurrency", type=int, default=CONCORRENCIA_MAX,
+                        help="teto de requisições em voo por host (somando os processos da máquina)")
+    parser.add_argument("--rate-db", type=str, default=RITMO_DB, help="estado do ritmo, compartilhado na máquina")
+    parser.add_argument("--no-rate-control", action="store_true",
+                        help="ritmo fixo (engine mets: --rate constante; demais: sem espaçamento)")
+    parser.add_argument("--metrics-port", type=int, default=None,
+                        help="expõe /metrics (Prometheus) e /metrics.json em 127.0.0.1:PORTA")
+    parser.add_argument("--links", type=str, default=LINKS_FILE,
+                        help="arquivo de links (ex.: saida_arq_articulo_link/links_novos.txt da coleta incremental)")
+    parser.add_argument("--consume-links", action="store_true",
+                        help="ao final, remove do arquivo de --links os que foram gravados (use com links_novos.txt)")
+    parser.add_argument("--cache-dir", type=str, default=CACHE_DIR, help="cache HTTP em disco (engines http e mets)")
+    parser.add_argument("--no-cache", action="store_true", help="sempre buscar na rede")
+    parser.add_argument("--cache-ttl", action="append", default=[], metavar="CLASSE=SEGUNDOS",
+                        help="validade por classe de URL (artigo, mets, discover, autor, ...); repetível")
+    parser.add_argument("--compression", type=str, default=COMPRESSAO, choices=["zstd", "snappy", "gzip", "none"])
+    parser.add_argument("--compression-level", type=int, default=NIVEL_COMPRESSAO, help="nível (zstd/gzip)")
+    parser.add_argument("--oai-url", type=str, default=OAI_URL)
+    parser.add_argument("--oai-prefix", type=str, default="oai_dc", choices=["oai_dc", "qdc"])
+    parser.add_argument("--oai-from", type=str, default=None, help="data inicial (AAAA-MM-DD)")
+    parser.add_argument("--oai-until", type=str, default=None, help="data final (AAAA-MM-DD)")
+    parser.add_argument("--oai-window-days", type=int, default=None, help="divide from/until em janelas de N dias")
+    parser.add_argument("--oai-set", type=str, default=None)
+    args = parser.parse_args()
+    if args.metrics_port:
+        METRICAS.servir(args.metrics_port)
+    if not args.no_rate_control:
+        RITMO = ControladorRitmo(args.rate_db, taxa_max=args.rate, concorrencia_max=args.max_concurrency,
+                                 log=logging.warning)
+    COMPRESSAO = args.compression
+    NIVEL_COMPRESSAO = args.compression_level if args.compression in ("zstd", "gzip") else None
+
+    if args.engine == "oai":
+        total = coletar_oai(base_url=args.oai_url, metadata_prefix=args.oai_prefix,
+                            de=args.oai_from, ate=args.oai_until, dias_janela=args.oai_window_days,
+                            paralelo=max(args.workers, 1), set_spec=args.oai_set)
+        METRICAS.fechar()
+        print(f"Execução concluída ({total} registros via OAI-PMH).")
+        logging.info("Execução concluída.")
+        sys.exit(0)
 
     # --- CARREGA LINKS ---
-    if not os.path.exists(LINKS_FILE):
-        print("Arquivo de links não encontrado:", LINKS_FILE)
+    if not os.path.exists(args.links):
+        print("Arquivo de links não encontrado:", args.links)
         exit()
 
-    with open(LINKS_FILE, "r") as f:
+    with open(args.links, "r") as f:
         links = f.read().splitlines()
 
     # --- LIMITA PROCESSAMENTO (você muda aqui) ---
     #links_a_processar = links[:20]
     links_a_processar = links
 
-    # --- PROCESSA ---
-    processados = processar_links(driver, links_a_processar)
+    cache = None if args.no_cache else CacheHTTP(args.cache_dir, interpretar_ttls(args.cache_ttl))
+
+    # --- PROCESSA (cada worker inicia o próprio driver local só se necessário) ---
+    if args.engine == "mets" and not args.frontier:
+        processados = processar_links_mets(links_a_processar, concorrencia=args.concurrency,
+                                           req_por_segundo=args.rate, cache=cache, workers=max(args.workers, 1),
+                                           browser=args.browser, driver_path=args.driver_path,
+                                           headless=args.headless, perfil=args.browser_profile)
+    else:
+        # com --frontier a engine mets cai para http (itens arrendados um a um)
+        processados = processar_links(links_a_processar, workers=max(args.workers, 1),
+                                      fronteira=args.frontier,
+                                      engine="http" if args.engine == "mets" else args.engine,
+                                      browser=args.browser, cache=cache,
+                                      driver_path=args.driver_path, headless=args.headless,
+                                      perfil=args.browser_profile)
 
     # --- CHECKPOINT ---
     salvar_checkpoint(CHECKPOINT_FILE, processados)
-
-    driver.quit()
+    if args.consume_links:
+        restantes = consumir_links(args.links, processados)
+        logging.info(f"{args.links}: {len(processados)} links consumidos, {restantes} restantes")
+    if cache is not None:
+        logging.info(f"Cache HTTP: {cache.resumo()}")
+        cache.fechar()
+    METRICAS.fechar()
 
     print("Execução concluída.")
     logging.info("Execução concluída.")
@@ -7,13 +7,16 @@ Sem webdriver_manager; passe --driver-path se o driver não estiver no PATH.
 """
 
 import os
+import sys
 import time
+import queue
+import asyncio
+import threading
 import argparse
-import json
 import csv
 from datetime import datetime
-import pandas as pd
 import re
+from lxml import etree
 
 from selenium import webdriver
 from selenium.webdriver.common.by import By
@@ -21,20 +24,51 @@ from selenium.common.exceptions import WebDriverException, NoSuchElementExceptio
 from selenium.webdriver.chrome.service import Service as ChromeService
 from selenium.webdriver.edge.service import Service as EdgeService
 
+# Módulos compartilhados (pasta comum/ na raiz do repositório)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from comum.parquet_incremental import EscritorParquet
+from comum.bitmap import Bitmap
+from comum.indice_handles import IndiceHandles, importar_texto
+from comum.extracao_http import parse_html, texto_elemento, criar_sessao, baixar_html
+from comum.http_async import buscar_concorrente, buscar_um, CONCORRENCIA, REQ_POR_SEGUNDO
+from comum.espera import EsperaAdaptativa
+from comum.fronteira import Fronteira, FILA_DISCOVER, FILA_ARTIGOS
+from comum.cache_http import CacheHTTP, interpretar_ttls
+from comum.ritmo import (ControladorRitmo, ErroProxy, requisicao, erro_de_proxy, CLASSE_NAVEGADOR, RITMO_DB,
+                         CONCORRENCIA_MAX)
+from comum.extracao_navegador import extrair_campos_navegador
+from comum.campos import Campo, Especificacao
+from comum.metricas import Metricas
+from comum.navegador_leve import aplicar_perfil, ativar_bloqueio, medir_pagina, descrever_medida, PERFIS, PERFIL_PADRAO
+
 # ---------- CONFIG ----------
 OUTPUT_DIR = "saida_arq_articulo_link"
 os.makedirs(OUTPUT_DIR, exist_ok=True)
 
 LINKS_FILE = os.path.join(OUTPUT_DIR, "links_coletados.txt")
-CHECKPOINT_FILE = os.path.join(OUTPUT_DIR, "checkpoint_articulo_link.txt")
+LINKS_INDEX_FILE = os.path.join(OUTPUT_DIR, "links_coletados.idx")
+NEW_LINKS_FILE = os.path.join(OUTPUT_DIR, "links_novos.txt")  # delta ainda não consumido pelo artigos_data
+CHECKPOINT_FILE = os.path.join(OUTPUT_DIR, "checkpoint_articulo_link.txt")  # legado (próxima página)
+PAGES_BITMAP_FILE = os.path.join(OUTPUT_DIR, "paginas_concluidas.bin")
 PARQUET_FILE = os.path.join(OUTPUT_DIR, "dados_completos_articulos_link.parquet")
 ERRORS_FILE = os.path.join(OUTPUT_DIR, "erros_selenium.csv")
+READY_TIMES_FILE = os.path.join(OUTPUT_DIR, "tempos_prontidao.json")
+CACHE_DIR = os.path.join(OUTPUT_DIR, "cache_http")
 
 URL_BASE = "https://ri.conicet.gov.ar/discover?rpp=10&etal=0&group_by=none&page="
-PAGE_LOAD_SLEEP = 3
+# Mesma listagem, mais recentes primeiro (data de depósito)
+URL_INCREMENTAL = ("https://ri.conicet.gov.ar/discover?rpp=10&etal=0&group_by=none"
+                   "&sort_by=dc.date.accessioned_dt&order=desc&page=")
+PAGE_LOAD_SLEEP = 3  # timeout inicial da espera adaptativa (antes: sleep fixo)
 HEADLESS = True
 MAX_TENTATIVAS_PAGINA = 10
-SLEEP_BETWEEN_PAGES = 3
+SLEEP_BETWEEN_PAGES = 3  # só com --no-rate-control; senão quem espaça é o controlador de ritmo
+PAGINA_MAX_FALLBACK = 27154
+
+ESPERA = EsperaAdaptativa(READY_TIMES_FILE, timeout_inicial=PAGE_LOAD_SLEEP * 3)
+METRICAS = Metricas("links", os.path.join(OUTPUT_DIR, "metricas"))
+_LOCK_ERROS = threading.Lock()
+RITMO = None  # ControladorRitmo (comum/ritmo.py), configurado na CLI
 
 # ---------- HELPERS ----------
 def log(msg):
@@ -47,27 +81,48 @@ def escapar_texto(texto):
     return texto.replace('"', '""').replace("\n", " ").replace("\r", " ").strip()
 
 def carregar_checkpoint():
-    if os.path.exists(CHECKPOINT_FILE):
+    """Bitmap de páginas concluídas. Migra o checkpoint antigo (número da próxima página)."""
+    concluidas = Bitmap(PAGES_BITMAP_FILE)
+    if not os.path.exists(PAGES_BITMAP_FILE) and os.path.exists(CHECKPOINT_FILE):
         try:
             with open(CHECKPOINT_FILE, "r", encoding="utf-8") as f:
-                return int(f.read().strip())
+                proxima = int(f.read().strip())
+            concluidas.marcar_intervalo(1, proxima - 1)
+            concluidas.salvar()
+            log(f"Checkpoint antigo migrado: páginas 1..{proxima - 1} marcadas como concluídas.")
         except:
-            return 1
-    return 1
+            pass
+    return concluidas
 
-def salvar_checkpoint(pagina):
-    with open(CHECKPOINT_FILE, "w", encoding="utf-8") as f:
-        f.write(str(pagina))
+def salvar_checkpoint(concluidas, paginas):
+    for pagina in paginas:
+        concluidas.marcar(pagina)
+    concluidas.salvar()
 
 def carregar_links_existentes():
-    s = set()
-    if os.path.exists(LINKS_FILE):
-        with open(LINKS_FILE, "r", encoding="utf-8") as f:
-            for line in f:
-                line = line.strip()
-                if line:
-                    s.add(line)
-    return s
+    """
+    Índice de handles (comum/indice_handles.py) no lugar de um set de URLs.
+    links_coletados.idx guarda até que byte de LINKS_FILE já foi indexado;
+    só o restante do arquivo é lido.
+    """
+    try:
+        indice = IndiceHandles(LINKS_INDEX_FILE)
+    except Exception as e:
+        log(f"Índice de links ilegível ({e}); reconstruindo a partir de {LINKS_FILE}.")
+        indice = IndiceHandles()
+        indice.caminho = LINKS_INDEX_FILE
+    tamanho = os.path.getsize(LINKS_FILE) if os.path.exists(LINKS_FILE) else 0
+    if indice.marca > tamanho:
+        # arquivo de links truncado ou trocado: o índice não vale mais
+        indice = IndiceHandles()
+        indice.caminho = LINKS_INDEX_FILE
+    indice.marca = importar_texto(LINKS_FILE, indice, indice.marca)
+    return indice
+
+def salvar_indice_links(indice):
+    # salvar_links_novos mantém índice e arquivo em sincronia, então a marca é o tamanho atual
+    tamanho = os.path.getsize(LINKS_FILE) if os.path.exists(LINKS_FILE) else 0
+    indice.salvar(marca=tamanho)
 
 def salvar_links_novos(links, existing_set):
     if not links:
@@ -78,29 +133,23 @@ def salvar_links_novos(links, existing_set):
                 f.write(link + "\n")
                 existing_set.add(link)
 
-def salvar_dado_parquet(dado, parquet_path=PARQUET_FILE):
-    df_new = pd.DataFrame([dado])
-    if os.path.exists(parquet_path):
-        try:
-            df_exist = pd.read_parquet(parquet_path)
-            df = pd.concat([df_exist, df_new], ignore_index=True)
-        except Exception:
-            df = df_new
-    else:
-        df = df_new
-    df.to_parquet(parquet_path, engine="pyarrow", index=False)
+def salvar_dado_parquet(dado, escritor):
+    # Gravação em partes dentro de PARQUET_FILE/ (ver comum/parquet_incremental.py)
+    escritor.escrever(dado)
 
 def append_error(pagina_url, erro):
+    METRICAS.erro(erro)
     row = {"pagina": pagina_url, "erro": str(erro), "ts": datetime.utcnow().isoformat()}
-    write_header = not os.path.exists(ERRORS_FILE)
-    with open(ERRORS_FILE, "a", encoding="utf-8", newline="") as f:
-        writer = csv.DictWriter(f, fieldnames=["pagina", "erro", "ts"])
-        if write_header:
-            writer.writeheader()
-        writer.writerow(row)
+    with _LOCK_ERROS:  # chamado pelos workers do pipeline
+        write_header = not os.path.exists(ERRORS_FILE)
+        with open(ERRORS_FILE, "a", encoding="utf-8", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=["pagina", "erro", "ts"])
+            if write_header:
+                writer.writeheader()
+            writer.writerow(row)
 
 # ---------- WEBDRIVER ----------
-def iniciar_driver_local(browser="edge", driver_path=None, headless=True):
+def iniciar_driver_local(browser="edge", driver_path=None, headless=True, perfil=PERFIL_PADRAO):
     try:
         if browser.lower() == "edge":
             options = webdriver.EdgeOptions()
@@ -111,6 +160,7 @@ def iniciar_driver_local(browser="edge", driver_path=None, headless=True):
             options.add_argument("--no-sandbox")
             options.add_argument("--disable-dev-shm-usage")
             options.add_argument("--window-size=1920,1080")
+            aplicar_perfil(options, perfil)
             if driver_path:
                 if not os.path.exists(driver_path):
                     raise FileNotFoundError(f"Edge driver não encontrado: {driver_path}")
@@ -126,7 +176,8 @@ def iniciar_driver_local(browser="edge", driver_path=None, headless=True):
             options.add_argument("--disable-gpu")
             options.add_argument("--no-sandbox")
             options.add_argument("--disable-dev-shm-usage")
-            options.add.add_argument("--window-size=1920,1080")
+            options.add_argument("--window-size=1920,1080")
+            aplicar_perfil(options, perfil)
             if driver_path:
                 if not os.path.exists(driver_path):
                     raise FileNotFoundError(f"Chrome driver não encontrado: {driver_path}")
@@ -137,6 +188,7 @@ def iniciar_driver_local(browser="edge", driver_path=None, headless=True):
         else:
             raise ValueError("browser inválido, use 'edge' ou 'chrome'")
 
+        ativar_bloqueio(driver, perfil)
         return driver
 
     except Exception as e:
@@ -148,10 +200,27 @@ def iniciar_driver_local(browser="edge", driver_path=None, headless=True):
         raise RuntimeError(msg)
 
 # ---------- EXTRAÇÃO ----------
+# Especificação declarativa (comum/campos.py), a mesma usada em artigos_data
+CAMPOS_ITEM = Especificacao([
+    Campo("author", '//div[contains(@class,"simple-item-view-authors")]//a'),
+])
+
+def _carregar(driver, url, pronta):
+    """driver.get pelo controlador de ritmo; página de erro do proxy vira ErroProxy (nova tentativa)."""
+    with requisicao(RITMO, url, CLASSE_NAVEGADOR) as r:
+        driver.get(url)
+        ESPERA.aguardar(driver, pronta)
+        if erro_de_proxy(driver.title):
+            r.sinalizar("proxy")
+            raise ErroProxy(url)
+
 def extrair_informacoes(driver, url):
-    driver.get(url)
-    time.sleep(PAGE_LOAD_SLEEP)
+    _carregar(driver, url, "artigo")
     dados = {"link": url, "author": ""}
+    extraidos, falhos = extrair_campos_navegador(driver, CAMPOS_ITEM, tratar=escapar_texto)
+    if not falhos:
+        dados.update(extraidos)
+        return dados
     try:
         try:
             autor_elem = driver.find_element(By.XPATH, '//div[contains(@class,"simple-item-view-authors")]//a')
@@ -163,10 +232,35 @@ def extrair_informacoes(driver, url):
     return dados
 
 # ---------- COLETA LINKS ----------
+XPATH_ITEM = '//*[contains(concat(" ", normalize-space(@class), " "), " ds-artifact-item ")]'
+_ITENS = etree.XPath(XPATH_ITEM)
+_HREFS_HANDLE = etree.XPath('.//a[contains(@href, "/handle/11336/")]/@href')
+
+def calcular_total_paginas(texto_cabecalho):
+    m = re.search(r"total de\s+([\d\.]+)", texto_cabecalho)
+    if not m:
+        return None, None
+    total_resultados = int(m.group(1).replace(".", ""))
+    pagina_max = (total_resultados // 10) + (1 if total_resultados % 10 > 0 else 0)
+    return total_resultados, pagina_max
+
+def extrair_links_html(conteudo):
+    """Equivalente HTML de coletar_links_da_pagina: um handle por ds-artifact-item."""
+    doc = parse_html(conteudo)
+    links = []
+    for item in _ITENS(doc):
+        hrefs = _HREFS_HANDLE(item)
+        if hrefs:
+            href = hrefs[0]
+            if href.startswith("/"):
+                href = "https://ri.conicet.gov.ar" + href
+            links.append(href)
+    return links
+
 def coletar_links_da_pagina(driver, page):
     url = URL_BASE + str(page)
-    driver.get(url)
-    time.sleep(PAGE_LOAD_SLEEP)
+    _carregar(driver, url, "discover")
+    log(f"Página {page}: {descrever_medida(medir_pagina(driver))}")
     items = driver.find_elements(By.CLASS_NAME, "ds-artifact-item")
     links = []
     for item in items:
@@ -181,19 +275,140 @@ def coletar_links_da_pagina(driver, page):
             continue
     return links
 
+# ---------- PIPELINE ----------
+# Listagem -> detalhes -> gravação, ligados por filas limitadas: a listagem só
+# avança enquanto há espaço na fila de detalhes e os detalhes só enquanto o
+# gravador acompanha. Uma página entra no checkpoint quando todos os seus
+# itens foram gravados e o escritor confirmou que estão em disco.
+DETALHE_WORKERS = 2
+FILA_DETALHES_MAX = 50     # ~5 páginas de listagem à frente dos detalhes
+FILA_GRAVACAO_MAX = 200
+MAX_TENTATIVAS_ITEM = 3
+_FIM = None  # sentinela das filas
+
+def _fechar_driver(driver):
+    if driver is None:
+        return
+    try:
+        driver.quit()
+    except:
+        pass
+
+def _consumidor_detalhes(fila_detalhes, fila_gravacao, novo_driver, parar):
+    """Um driver próprio; manda ("item", página, dados) ao gravador (dados=None se falhou)."""
+    driver = None
+    try:
+        while True:
+            msg = fila_detalhes.get()
+            if msg is _FIM:
+                break
+            page, link = msg
+            dados = None
+            tentativa = 0
+            while dados is None and tentativa < MAX_TENTATIVAS_ITEM and not parar.is_set():
+                try:
+                    if driver is None:
+                        driver = novo_driver()
+                    with METRICAS.etapa("extracao"):
+                        dados = extrair_informacoes(driver, link)
+                except WebDriverException as e:
+                    tentativa += 1
+                    append_error(link, e)
+                    log(f"WebDriverException em {link}, tentativa {tentativa}. Reiniciando driver.")
+                    _fechar_driver(driver)
+                    driver = None
+                    time.sleep(3)
+                except Exception as e:
+                    tentativa += 1
+                    append_error(link, e)
+                    log(f"Erro em {link}, tentativa {tentativa}: {e}")
+                    if RITMO is None:
+                        time.sleep(2)
+            with METRICAS.etapa("espera_fila_gravacao"):
+                fila_gravacao.put(("item", page, dados))
+    finally:
+        fila_gravacao.put(_FIM)
+        _fechar_driver(driver)
+
+def _gravador(fila_gravacao, n_consumidores, concluidas, total_paginas, parar):
+    """
+    Único dono do EscritorParquet. Recebe ("pagina", página, n_itens) antes
+    dos itens da página e ("item", página, dados) de cada consumidor.
+    """
+    escritor = EscritorParquet(PARQUET_FILE, flush_automatico=False)
+    pendentes = {}   # página -> itens ainda não gravados
+    falhas = set()   # páginas com item perdido: ficam para a próxima execução
+    aguardando_gravacao = []
+    ativos = n_consumidores
+    try:
+        while ativos:
+            try:
+                msg = fila_gravacao.get(timeout=1)
+            except queue.Empty:
+                msg = ()
+            if msg is _FIM:
+                ativos -= 1
+            elif msg:
+                tipo, page, valor = msg
+                if tipo == "pagina":
+                    pendentes[page] = valor
+                else:
+                    if valor is None:
+                        falhas.add(page)
+                    else:
+                        with METRICAS.etapa("persistencia"):
+                            salvar_dado_parquet(valor, escritor)
+                    pendentes[page] -= 1
+                if pendentes.get(page) == 0:
+                    del pendentes[page]
+                    if page in falhas:
+                        falhas.discard(page)
+                        log(f"Página {page} com itens não extraídos. Fica pendente para a próxima execução.")
+                    else:
+                        aguardando_gravacao.append(page)
+                    METRICAS.progresso(total=total_paginas)
+
+            if escritor.flush_se_necessario() and aguardando_gravacao:
+                with METRICAS.etapa("persistencia"):
+                    salvar_checkpoint(concluidas, aguardando_gravacao)
+                aguardando_gravacao = []
+                ESPERA.salvar()
+            if METRICAS.flush_se_necessario():
+                eta = METRICAS.eta_segundos()
+                if eta is not None:
+                    log(f"ETA: {eta / 3600:.2f}h ({METRICAS.concluidos}/{total_paginas} páginas nesta execução)")
+    except Exception as e:
+        append_error("gravacao", e)
+        log(f"Erro na gravação: {e}. Parando o pipeline.")
+        parar.set()
+        # esvazia a fila para os consumidores não ficarem presos no put
+        while ativos:
+            if fila_gravacao.get() is _FIM:
+                ativos -= 1
+    finally:
+        escritor.fechar()
+        if aguardando_gravacao:
+            salvar_checkpoint(concluidas, aguardando_gravacao)
+
 # ---------- MAIN ----------
-def main(browser="edge", driver_path=None, start_page=None, end_page=None, headless=True):
+def main(browser="edge", driver_path=None, start_page=None, end_page=None, headless=True, fronteira=None,
+         perfil=PERFIL_PADRAO, workers=DETALHE_WORKERS, fila_detalhes_max=FILA_DETALHES_MAX,
+         fila_gravacao_max=FILA_GRAVACAO_MAX):
     log("Iniciando coleta (driver local).")
     global HEADLESS
     HEADLESS = headless
 
-    start = start_page if start_page is not None else carregar_checkpoint()
+    concluidas = carregar_checkpoint()
+    start = start_page if start_page is not None else 1
     if start < 1:
         start = 1
     existing_links = carregar_links_existentes()
 
+    def novo_driver():
+        return iniciar_driver_local(browser=browser, driver_path=driver_path, headless=headless, perfil=perfil)
+
     try:
-        driver = iniciar_driver_local(browser=browser, driver_path=driver_path, headless=headless)
+        driver = novo_driver()
     except RuntimeError as e:
         log(str(e))
         return
@@ -202,88 +417,284 @@ def main(browser="edge", driver_path=None, start_page=None, end_page=None, headl
     if end_page is None:
         try:
             url0 = URL_BASE + "1"
-            driver.get(url0)
-            time.sleep(PAGE_LOAD_SLEEP)
+            _carregar(driver, url0, "discover")
 
             h2 = driver.find_element(By.CSS_SELECTOR, "h2.ds-div-head").text
 
-            m = re.search(r"total de\s+([\d\.]+)", h2)
-            if m:
-                total_resultados = int(m.group(1).replace(".", ""))
-                pagina_max = (total_resultados // 10) + (1 if total_resultados % 10 > 0 else 0)
+            total_resultados, pagina_max = calcular_total_paginas(h2)
+            if pagina_max:
                 log(f"Total de resultados: {total_resultados}. Total de páginas: {pagina_max}")
             else:
-                log("Não consegui identificar total de páginas. Fallback 27154.")
-                pagina_max = 27154
+                log(f"Não consegui identificar total de páginas. Fallback {PAGINA_MAX_FALLBACK}.")
+                pagina_max = PAGINA_MAX_FALLBACK
         except Exception as e:
             log(f"Erro ao detectar total: {e}")
-            pagina_max = 27154
+            pagina_max = PAGINA_MAX_FALLBACK
     else:
         pagina_max = end_page
 
-    # ---------------- LOOP PRINCIPAL -----------------
+    paginas = concluidas.pendentes(start, pagina_max)
+    log(f"{len(paginas)} páginas pendentes entre {start} e {pagina_max}; {workers} workers de detalhes.")
+
+    # ---------------- PIPELINE -----------------
+    fila_detalhes = queue.Queue(maxsize=fila_detalhes_max)
+    fila_gravacao = queue.Queue(maxsize=fila_gravacao_max)
+    parar = threading.Event()
+    gravador = threading.Thread(target=_gravador, name="gravador",
+                                args=(fila_gravacao, workers, concluidas, len(paginas), parar))
+    consumidores = [
+        threading.Thread(target=_consumidor_detalhes, name=f"detalhes-{i}",
+                         args=(fila_detalhes, fila_gravacao, novo_driver, parar))
+        for i in range(workers)
+    ]
+    gravador.start()
+    for t in consumidores:
+        t.start()
+
+    # ---------------- LISTAGEM (produtor) -----------------
     try:
-        page = start
-
-        while page <= pagina_max:
+        for page in paginas:
+            if parar.is_set():
+                break
             tentativa = 0
             success = False
+            fim_real = False
 
             while tentativa < MAX_TENTATIVAS_PAGINA and not success:
                 try:
                     log(f"Processando página {page}/{pagina_max}...")
-                    links = coletar_links_da_pagina(driver, page)
+                    with METRICAS.etapa("listagem"):
+                        links = coletar_links_da_pagina(driver, page)
 
                     if not links:
+                        # fora do gravador: não vai para o checkpoint e fica pendente,
+                        # como no modo assíncrono (pode ter sido erro/proxy, não o fim)
                         log(f"Nenhum item na página {page}. Encerrando (fim real).")
-                        salvar_checkpoint(page)
-                        return
+                        fim_real = True
+                        break
 
-                    salvar_links_novos(links, existing_links)
+                    with METRICAS.etapa("persistencia"):
+                        salvar_links_novos(links, existing_links)
+                        if fronteira:
+                            fronteira.enfileirar(FILA_ARTIGOS, links)
 
                     log(f"Encontrados {len(links)} links na página {page}.")
 
-                    # detalhes
-                    for l in links:
-                        dados = extrair_informacoes(driver, l)
-                        salvar_dado_parquet(dados)
-
-                    salvar_checkpoint(page + 1)
+                    # o gravador precisa saber quantos itens esperar antes do primeiro chegar
+                    fila_gravacao.put(("pagina", page, len(links)))
+                    with METRICAS.etapa("espera_fila_detalhes"):
+                        for l in links:
+                            fila_detalhes.put((page, l))
                     success = True
 
                 except WebDriverException as e:
                     tentativa += 1
                     append_error(URL_BASE + str(page), e)
                     log(f"WebDriverException página {page}, tentativa {tentativa}. Reiniciando driver.")
-                    try:
-                        driver.quit()
-                    except:
-                        pass
+                    _fechar_driver(driver)
                     time.sleep(3)
-                    driver = iniciar_driver_local(browser=browser, driver_path=driver_path, headless=headless)
+                    driver = novo_driver()
 
                 except Exception as e:
                     tentativa += 1
                     append_error(URL_BASE + str(page), e)
                     log(f"Erro inesperado página {page}, tentativa {tentativa}: {e}")
-                    time.sleep(2)
+                    if RITMO is None:
+                        time.sleep(2)
 
+            if fim_real:
+                break
             if not success:
-                log(f"Falha definitiva página {page}. Avançando.")
-                salvar_checkpoint(page + 1)
+                log(f"Falha definitiva página {page}. Avançando (fica pendente para a próxima execução).")
 
-            time.sleep(SLEEP_BETWEEN_PAGES)
-            page += 1
+            if RITMO is None:
+                with METRICAS.etapa("espera"):
+                    time.sleep(SLEEP_BETWEEN_PAGES)
 
+    except KeyboardInterrupt:
+        log("Interrompido. Páginas com itens ainda na fila ficam pendentes.")
+        parar.set()
     finally:
-        try:
-            driver.quit()
-        except:
-            pass
+        _fechar_driver(driver)
+        for _ in consumidores:
+            fila_detalhes.put(_FIM)
+        for t in consumidores:
+            t.join()
+        gravador.join()
+        salvar_indice_links(existing_links)
+        METRICAS.fechar()
+        ESPERA.salvar()
+        log(f"Tempos de prontidão: {ESPERA.resumo()}")
 
     log("Coleta finalizada.")
 
 
+# ---------- MAIN ASSÍNCRONO ----------
+async def main_async(start_page=None, end_page=None, concorrencia=CONCORRENCIA, req_por_segundo=REQ_POR_SEGUNDO,
+                     fronteira=None, cache=None):
+    """
+    Coleta só os links (handles) das páginas do discover, várias páginas em paralelo
+    via HTTP. Os detalhes ficam para artigos_data (engine http).
+    As páginas terminam fora de ordem; cada uma é marcada no bitmap ao ser salva.
+    Com `fronteira`, as páginas são arrendadas da fila "discover" (vários processos
+    podem dividir a listagem) e os handles vão para a fila "artigo".
+    """
+    if RITMO is None:
+        log(f"Iniciando coleta assíncrona (concorrência={concorrencia}, {req_por_segundo} req/s).")
+    else:
+        log(f"Iniciando coleta assíncrona (até {concorrencia} em paralelo, ritmo adaptativo: {RITMO.resumo()}).")
+
+    concluidas = carregar_checkpoint()
+    start = max(start_page or 1, 1)
+    existing_links = carregar_links_existentes()
+
+    if end_page is None:
+        try:
+            doc = parse_html(await buscar_um(URL_BASE + "1", cache=cache, ritmo=RITMO))
+            h2 = doc.xpath('//h2[contains(concat(" ", normalize-space(@class), " "), " ds-div-head ")]')
+            total_resultados, pagina_max = calcular_total_paginas(texto_elemento(h2[0]) if h2 else "")
+            if pagina_max:
+                log(f"Total de resultados: {total_resultados}. Total de páginas: {pagina_max}")
+            else:
+                log(f"Não consegui identificar total de páginas. Fallback {PAGINA_MAX_FALLBACK}.")
+                pagina_max = PAGINA_MAX_FALLBACK
+        except Exception as e:
+            log(f"Erro ao detectar total: {e}")
+            pagina_max = PAGINA_MAX_FALLBACK
+    else:
+        pagina_max = end_page
+
+    pendentes = concluidas.pendentes(start, pagina_max)
+    log(f"{len(pendentes)} páginas pendentes entre {start} e {pagina_max}.")
+
+    def ao_receber(page, url, conteudo):
+        with METRICAS.etapa("extracao"):
+            links = extrair_links_html(conteudo)
+        if not links:
+            # página sem itens (erro/proxy): não reaproveitar do cache e não marcar
+            # como concluída; fica pendente para a próxima execução
+            if cache is not None:
+                cache.invalidar(url)
+            ao_falhar(page, url, "página sem itens (erro ou proxy)")
+            return
+        salvar_links_novos(links, existing_links)
+        salvar_checkpoint(concluidas, [page])
+        if fronteira:
+            fronteira.enfileirar(FILA_ARTIGOS, links)
+            if fronteira.concluir(FILA_DISCOVER, url):
+                log(f"Página {page}: lease vencido, já entregue a outro worker.")
+        log(f"Página {page}: {len(links)} links ({concluidas.contar()} páginas concluídas).")
+        METRICAS.progresso(total=len(pendentes))
+        METRICAS.flush_se_necessario()
+
+    def ao_falhar(page, url, erro):
+        append_error(url, erro)
+        if fronteira and not fronteira.falhar(FILA_DISCOVER, url, erro):
+            log(f"Página {page}: lease vencido, falha não registrada na fronteira.")
+        log(f"Falha definitiva página {page}: {erro}. Fica pendente para a próxima execução.")
+
+    def paginas_da_fronteira():
+        while True:
+            lote = fronteira.arrendar(FILA_DISCOVER, concorrencia)
+            if not lote:
+                return
+            for url, dados in lote:
+                yield dados["pagina"], url
+
+    if fronteira:
+        fronteira.enfileirar(FILA_DISCOVER, [URL_BASE + str(p) for p in pendentes],
+                             [{"pagina": p} for p in pendentes])
+        itens = paginas_da_fronteira()
+    else:
+        itens = ((page, URL_BASE + str(page)) for page in pendentes)
+
+    ok, falhas = await buscar_concorrente(
+        itens,
+        ao_receber, ao_falhar,
+        concorrencia=concorrencia, req_por_segundo=req_por_segundo,
+        tentativas=MAX_TENTATIVAS_PAGINA, cache=cache, ritmo=RITMO,
+    )
+    log(f"Coleta assíncrona finalizada: {ok} páginas ok, {falhas} com falha.")
+    salvar_indice_links(existing_links)
+    METRICAS.fechar()
+    if cache is not None:
+        log(f"Cache HTTP: {cache.resumo()}")
+
+
+# ---------- MAIN INCREMENTAL ----------
+def main_incremental(paginas_conhecidas=1, max_paginas=None, fronteira=None):
+    """
+    Coleta diária: percorre o discover ordenado por data de depósito (mais novo
+    primeiro) e para quando `paginas_conhecidas` páginas seguidas só trazem
+    handles que já estão em links_coletados.txt.
+    Os handles novos vão para links_coletados.txt, para NEW_LINKS_FILE (entrada
+    do artigos_data com --links ... --consume-links) e, com `fronteira`, para a
+    fila "artigo". NEW_LINKS_FILE só cresce aqui: quem o esvazia é o consumidor,
+    senão um delta ainda não processado sumiria na execução seguinte (os
+    handles dele já contam como conhecidos).
+    Não usa o cache nem o bitmap de páginas: a numeração muda a cada depósito.
+    """
+    log("Iniciando coleta incremental (mais recentes primeiro).")
+    existing_links = carregar_links_existentes()
+    if not existing_links:
+        log("links_coletados.txt vazio: rode a coleta completa primeiro.")
+        return []
+
+    sessao = criar_sessao()
+    novos = []
+    seguidas = 0
+    page = 1
+    try:
+        while max_paginas is None or page <= max_paginas:
+            url = URL_INCREMENTAL + str(page)
+            for tentativa in range(MAX_TENTATIVAS_PAGINA):
+                try:
+                    with METRICAS.etapa("listagem"):
+                        links = extrair_links_html(baixar_html(sessao, url, ritmo=RITMO))
+                    break
+                except Exception as e:
+                    append_error(url, e)
+                    log(f"Erro página {page}, tentativa {tentativa + 1}: {e}")
+                    if RITMO is None:
+                        time.sleep(min(2 ** tentativa, 60))
+            else:
+                log(f"Falha definitiva na página {page}; encerrando (os novos já encontrados foram salvos).")
+                break
+
+            if not links:
+                log(f"Nenhum item na página {page}. Fim da listagem.")
+                break
+
+            pagina_novos = [l for l in links if l not in existing_links]
+            if pagina_novos:
+                seguidas = 0
+                # delta antes do arquivo principal: uma queda entre os dois só repete handles
+                with open(NEW_LINKS_FILE, "a", encoding="utf-8") as f:
+                    f.writelines(link + "\n" for link in pagina_novos)
+                salvar_links_novos(pagina_novos, existing_links)
+                novos.extend(pagina_novos)
+                if fronteira:
+                    fronteira.enfileirar(FILA_ARTIGOS, pagina_novos)
+            else:
+                seguidas += 1
+            log(f"Página {page}: {len(pagina_novos)} novos de {len(links)} ({len(novos)} no total).")
+            METRICAS.progresso()
+            METRICAS.flush_se_necessario()
+            if seguidas >= paginas_conhecidas:
+                log(f"{seguidas} página(s) só com handles conhecidos. Delta completo.")
+                break
+            page += 1
+            if RITMO is None:
+                time.sleep(SLEEP_BETWEEN_PAGES)
+    finally:
+        sessao.close()
+        salvar_indice_links(existing_links)
+        METRICAS.fechar()
+
+    log(f"Coleta incremental finalizada: {len(novos)} handles novos em {NEW_LINKS_FILE}.")
+    return novos
+
+
 # ---------- CLI ----------
 if __name__ == "__main__":
     parser = argparse.ArgumentParser()
@@ -292,10 +703,64 @@ if __name__ == "__main__":
     parser.add_argument("--start-page", type=int, default=None)
     parser.add_argument("--end-page", type=int, default=None)
     parser.add_argument("--headless", action="store_true")
+    parser.add_argument("--browser-profile", type=str, default=PERFIL_PADRAO, choices=PERFIS,
+                        help="sem_midia (padrão): bloqueia imagens, fontes e rastreadores; leve: também o CSS "
+                             "(pode mudar o .text dos campos)")
+    parser.add_argument("--mode", type=str, default="selenium", choices=["selenium", "async", "incremental"],
+                        help="async: só links, várias páginas em paralelo via HTTP; "
+                             "incremental: só os handles depositados desde a última coleta")
+    parser.add_argument("--known-pages", type=int, default=1,
+                        help="incremental: para após N páginas seguidas sem handle novo")
+    parser.add_argument("--max-pages", type=int, default=None, help="incremental: limite de páginas")
+    parser.add_argument("--workers", type=int, default=DETALHE_WORKERS,
+                        help="selenium: drivers extraindo detalhes em paralelo à listagem")
+    parser.add_argument("--detail-queue", type=int, default=FILA_DETALHES_MAX,
+                        help="selenium: links aguardando extração (limite da fila)")
+    parser.add_argument("--write-queue", type=int, default=FILA_GRAVACAO_MAX,
+                        help="selenium: itens extraídos aguardando gravação (limite da fila)")
+    parser.add_argument("--concurrency", type=int, default=CONCORRENCIA)
+    parser.add_argument("--rate", type=float, default=REQ_POR_SEGUNDO,
+                        help="teto de requisições/s por host do controle de ritmo (somando os processos da máquina)")
+    parser.add_argument("--max-concurrency", type=int, default=CONCORRENCIA_MAX,
+                        help="teto de requisições em voo por host (somando os processos da máquina)")
+    parser.add_argument("--rate-db", type=str, default=RITMO_DB, help="estado do ritmo, compartilhado na máquina")
+    parser.add_argument("--no-rate-control", action="store_true",
+                        help="ritmo fixo: SLEEP_BETWEEN_PAGES e, no modo async, --rate constante")
+    parser.add_argument("--frontier", type=str, default=None,
+                        help="fronteira SQLite compartilhada: publica os handles na fila 'artigo'")
+    parser.add_argument("--cache-dir", type=str, default=CACHE_DIR, help="cache HTTP em disco (modo async)")
+    parser.add_argument("--no-cache", action="store_true", help="sempre buscar na rede")
+    parser.add_argument("--cache-ttl", action="append", default=[], metavar="CLASSE=SEGUNDOS",
+                        help="validade por classe de URL (discover, artigo, ...); repetível")
+    parser.add_argument("--metrics-port", type=int, default=None,
+                        help="expõe /metrics (Prometheus) e /metrics.json em 127.0.0.1:PORTA")
     args = parser.parse_args()
-
-    main(browser=args.browser,
-         driver_path=args.driver_path,
-         start_page=args.start_page,
-         end_page=args.end_page,
-         headless=args.headless)
+    if args.metrics_port:
+        METRICAS.servir(args.metrics_port)
+    if not args.no_rate_control:
+        RITMO = ControladorRitmo(args.rate_db, taxa_max=args.rate, concorrencia_max=args.max_concurrency, log=log)
+
+    fronteira = Fronteira(args.frontier) if args.frontier else None
+
+    if args.mode == "incremental":
+        main_incremental(paginas_conhecidas=max(args.known_pages, 1),
+                         max_paginas=args.max_pages,
+                         fronteira=fronteira)
+    elif args.mode == "async":
+        asyncio.run(main_async(start_page=args.start_page,
+                               end_page=args.end_page,
+                               concorrencia=args.concurrency,
+                               req_por_segundo=args.rate,
+                               fronteira=fronteira,
+                               cache=None if args.no_cache else CacheHTTP(args.cache_dir, interpretar_ttls(args.cache_ttl))))
+    else:
+        main(browser=args.browser,
+             driver_path=args.driver_path,
+             start_page=args.start_page,
+             end_page=args.end_page,
+             headless=args.headless,
+             fronteira=fronteira,
+             perfil=args.browser_profile,
+             workers=max(args.workers, 1),
+             fila_detalhes_max=args.detail_queue,
+             fila_gravacao_max=args.write_queue)
@@ -10,21 +10,41 @@ from bs4 import BeautifulSoup
 import csv
 import time
 import os
-import json
+import sys
 import re
+import html
 import argparse
+import shutil
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urljoin, urlsplit, urlunsplit, parse_qsl, urlencode
 from datetime import datetime, date, timedelta
 from selenium import webdriver
 from selenium.webdriver.edge.service import Service
 from selenium.webdriver.common.by import By
 from selenium.common.exceptions import NoSuchElementException
-from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 
+# Módulos compartilhados (pasta comum/ na raiz do repositório)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from comum.espera import EsperaAdaptativa
+from comum.estado import abrir_estado, EstadoJSON
+from comum.indice_handles import IndiceHandles
+from comum.fronteira import Fronteira, FILA_LISTAGEM_AUTORES, FILA_AUTORES
+from comum.cache_http import CacheHTTP, get_com_cache, interpretar_ttls
+from comum.ritmo import (ControladorRitmo, requisicao, penalizar, erro_de_proxy, CLASSE_NAVEGADOR, RITMO_DB,
+                         TAXA_MAX, CONCORRENCIA_MAX)
+from comum.campos import Campo, Especificacao
+from comum.metricas import Metricas
+from comum.extracao_navegador import extrair_campos_navegador
+from comum.navegador_leve import aplicar_perfil, ativar_bloqueio, medir_pagina, descrever_medida, PERFIS, PERFIL_PADRAO
+
 # Optional Parquet
 try:
+    import pyarrow as pa
     import pyarrow.parquet as pq
-    import pandas as pd
+    from comum.parquet_incremental import EscritorParquet, ler_dataset, remover_dataset, listar_partes, _migrar_arquivo_legado
     HAS_PYARROW = True
 except Exception:
     HAS_PYARROW = False
@@ -37,20 +57,45 @@ os.makedirs(LOG_DIR, exist_ok=True)
 
 CSV_FILE = os.path.join(OUTPUT_DIR, "autores_completo.csv")
 PARQUET_FILE = os.path.join(OUTPUT_DIR, "autores_completo.parquet")
+EDGES_FILE = os.path.join(OUTPUT_DIR, "autor_artigo.parquet")  # (author_ref, handle_id)
 ERROR_FILE = os.path.join(OUTPUT_DIR, "erros.csv")
-STATE_FILE = os.path.join(OUTPUT_DIR, "estado.json")
+STATE_FILE = os.path.join(OUTPUT_DIR, "estado.json")  # backend json (legado)
+STATE_DB_FILE = os.path.join(OUTPUT_DIR, "estado.sqlite")
 PREVISAO_FILE = os.path.join(OUTPUT_DIR, "previsao.txt")
+READY_TIMES_FILE = os.path.join(OUTPUT_DIR, "tempos_prontidao.json")
+CACHE_DIR = os.path.join(OUTPUT_DIR, "cache_http")
+# Handles citados pelos autores (comum/indice_handles.py); compare com o índice do link scraper:
+#   python -m comum.indice_handles diferenca handles_autores.idx links_coletados.idx
+HANDLES_INDEX_FILE = os.path.join(OUTPUT_DIR, "handles_autores.idx")
 
 BASE_URL = "https://ri.conicet.gov.ar/explorar-autores?field=null&offset="
 PAGE_SIZE = 90
+# Sem o controle de ritmo (--no-rate-control), intervalos fixos:
 WAIT_SECONDS = 1
-WAIT_SELENIUM = 2
+WAIT_SELENIUM = 2  # intervalo mínimo entre autores (o tempo de carga já conta)
 TZ_OFFSET = -3
+RPP_AUTOR = 100        # itens por página pedidos na lista de publicações do autor
+PAGINAS_SIMULTANEAS = 4
+
+# Espera explícita pela tabela/publicações do autor (timeout derivado do p99 observado)
+ESPERA = EsperaAdaptativa(READY_TIMES_FILE, timeout_inicial=5)
+
+# Tempos por etapa, erros e ETA (metricas.json / metricas.prom; --metrics-port para HTTP)
+METRICAS = Metricas("autores", os.path.join(OUTPUT_DIR, "metricas"))
+INDICE_HANDLES = None  # aberto em main()/main_fronteira()
 
 HEADERS = {
     'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
 }
 
+# Sessão keep-alive para a listagem + cache em disco (configurado na CLI)
+SESSAO = requests.Session()
+SESSAO.headers.update(HEADERS)
+CACHE = None
+# Ritmo AIMD com orçamento da máquina (comum/ritmo.py), configurado na CLI
+RITMO = None
+PERFIL_NAVEGADOR = PERFIL_PADRAO  # --browser-profile
+
 CSV_COLUMNS = [
     # Identificação
     "Autor",
@@ -73,28 +118,33 @@ CSV_COLUMNS = [
 ]
 
 # ----------------- Logging -----------------
+PREFIXO_LOG = ""  # "[shard 2/4] " nos workers de --shards
+
 def log_line(message):
     today = date.today().isoformat()
     logfile = os.path.join(LOG_DIR, f"{today}.log")
     ts = datetime.utcnow().isoformat()
-    line = f"{ts} - {message}"
+    line = f"{ts} - {PREFIXO_LOG}{message}"
     with open(logfile, "a", encoding="utf-8") as f:
         f.write(line + "\n")
     print(line)
 
 def write_previsao(offset, total, start_time, autores_processados):
-    """Escreve previsão de término atualizada"""
+    """Escreve previsão de término (taxa EWMA recente, não a média da execução)"""
     if autores_processados <= 0:
         return
     
     elapsed = time.time() - start_time
-    avg_per_autor = elapsed / autores_processados
+    taxa = METRICAS.taxa.taxa
+    if not taxa:
+        return
+    avg_per_autor = 1 / taxa
     
     pagina_atual = (offset // PAGE_SIZE)
     total_pages = (total // PAGE_SIZE) + (1 if total % PAGE_SIZE else 0)
     percent = (pagina_atual / total_pages) * 100 if total_pages > 0 else 0
     
-    autores_restantes = total - autores_processados
+    autores_restantes = max(total - autores_processados, 0)
     est_seconds = autores_restantes * avg_per_autor
     
     termino_utc = datetime.utcnow() + timedelta(seconds=est_seconds)
@@ -117,7 +167,7 @@ def write_previsao(offset, total, start_time, autores_processados):
         f.write(f"  • Tempo decorrido: {elapsed_horas:.2f}h\n")
         f.write(f"  • Tempo restante: {est_horas:.2f}h\n")
         f.write(f"  • Tempo total estimado: {(elapsed_horas + est_horas):.2f}h\n")
-        f.write(f"  • Velocidade média: {avg_per_autor:.2f}s por autor\n\n")
+        f.write(f"  • Velocidade atual (EWMA): {avg_per_autor:.2f}s por autor\n\n")
         
         f.write("CONCLUSÃO PREVISTA:\n")
         f.write(f"  • Data/Hora (UTC-3): {termino_local.strftime('%Y-%m-%d %H:%M:%S')}\n")
@@ -127,20 +177,37 @@ def write_previsao(offset, total, start_time, autores_processados):
         f.write("=" * 60 + "\n")
 
 # ----------------- Estado -----------------
-def carregar_estado():
-    if os.path.exists(STATE_FILE):
-        try:
-            with open(STATE_FILE, "r", encoding="utf-8") as f:
-                return json.load(f)
-        except Exception as e:
-            log_line(f"AVISO: falha ao ler estado: {e}")
-    return {"ultimo_offset": 0, "processados": {}, "total_autores": 0}
+def carregar_estado(backend="sqlite"):
+    """
+    sqlite: estado.sqlite (WAL), um INSERT por autor; migra estado.json na primeira vez.
+    json: estado.json reescrito inteiro a cada autor (comportamento antigo).
+    """
+    try:
+        return abrir_estado(backend, STATE_DB_FILE, STATE_FILE, log=log_line)
+    except Exception as e:
+        log_line(f"AVISO: falha ao ler estado: {e}")
+        if backend == "json":
+            os.replace(STATE_FILE, STATE_FILE + ".corrompido")
+            return EstadoJSON(STATE_FILE)
+        raise
 
 def salvar_estado(estado):
-    tmp = STATE_FILE + ".tmp"
-    with open(tmp, "w", encoding="utf-8") as f:
-        json.dump(estado, f, indent=2, ensure_ascii=False)
-    os.replace(tmp, STATE_FILE)
+    estado.salvar()
+
+def abrir_indice_handles(caminho=None):
+    global INDICE_HANDLES
+    caminho = caminho or HANDLES_INDEX_FILE
+    try:
+        INDICE_HANDLES = IndiceHandles(caminho)
+    except Exception as e:
+        log_line(f"AVISO: índice de handles ilegível ({e}); começando vazio")
+        INDICE_HANDLES = IndiceHandles()
+        INDICE_HANDLES.caminho = caminho
+    return INDICE_HANDLES
+
+def indexar_handles(dados):
+    if INDICE_HANDLES is not None and dados.get("Handles"):
+        INDICE_HANDLES.adicionar_varios(dados["Handles"].split("|"))
 
 # ----------------- CSV e Parquet helpers -----------------
 def initialize_csv():
@@ -154,28 +221,139 @@ def append_csv_row(row):
         writer = csv.DictWriter(f, fieldnames=CSV_COLUMNS)
         writer.writerow(row)
 
+# No Parquet, Handles é list<int32> (ids de 11336/<n>, em ordem numérica) e cada
+# par autor-publicação vai também para EDGES_FILE, com author_ref em dicionário:
+# joins e group-bys com os artigos sem partir strings. O CSV mantém "a|b|c".
+if HAS_PYARROW:
+    SCHEMA_AUTORES = pa.schema([
+        ("Autor", pa.string()),
+        ("Referencia", pa.string()),
+        ("Link Principal", pa.string()),
+        ("Conicet", pa.bool_()),
+        ("Titulo", pa.string()),
+        ("Grado", pa.string()),
+        ("Especialidade", pa.string()),
+        ("Campo de Aplicacao", pa.string()),
+        ("Local de Trabalho", pa.string()),
+        ("Quantidade de Handles", pa.int64()),
+        ("Handles", pa.list_(pa.int32())),
+    ])
+    SCHEMA_ARESTAS = pa.schema([
+        ("author_ref", pa.dictionary(pa.int32(), pa.string())),
+        ("handle_id", pa.int32()),
+    ])
+
+# Layout (comum/parquet_incremental.py): zstd e dicionário só nas colunas de poucos
+# valores distintos; a partição conicet=true/false vem na compactação
+COMPRESSAO = "zstd"
+NIVEL_COMPRESSAO = 6
+COLUNAS_DICIONARIO = ["Conicet", "Grado", "Especialidade", "Campo de Aplicacao"]
+
+def handles_para_ids(handles):
+    """"123|45" (formato do CSV), set ou lista -> [45, 123]. Ignora o que não é numérico."""
+    if not handles:
+        return []
+    if isinstance(handles, str):
+        handles = handles.split("|")
+    return sorted({int(h) for h in handles if str(h).isdigit()})
+
+def _arestas(referencia, ids):
+    return [{"author_ref": referencia, "handle_id": h} for h in ids]
+
+def _handles_em_texto(tipo):
+    # DataFrame.to_parquet grava string (pandas < 3) ou large_string (pandas >= 3);
+    # coluna toda vazia sai como null
+    return pa.types.is_string(tipo) or pa.types.is_large_string(tipo) or pa.types.is_null(tipo)
+
+def migrar_handles_legado():
+    """
+    Partes antigas com Handles em string viram list<int32>; as arestas delas
+    vão para EDGES_FILE. Roda uma vez (partes já convertidas são puladas).
+    """
+    partes = [p for p in listar_partes(PARQUET_FILE)
+              if _handles_em_texto(pq.read_schema(p).field("Handles").type)]
+    if not partes:
+        return
+    log_line(f"PARQUET: convertendo Handles de {len(partes)} parte(s) antigas para list<int32>")
+    with EscritorParquet(EDGES_FILE, schema=SCHEMA_ARESTAS, dicionario=["author_ref"], compressao=COMPRESSAO,
+                         nivel_compressao=NIVEL_COMPRESSAO, flush_automatico=False) as arestas:
+        for parte in partes:
+            tabela = pq.read_table(parte)
+            ids = [handles_para_ids(h) for h in tabela.column("Handles").to_pylist()]
+            for referencia, lista in zip(tabela.column("Referencia").to_pylist(), ids):
+                for aresta in _arestas(referencia, lista):
+                    arestas.escrever(aresta)
+            # arestas em disco antes de trocar a parte: uma queda no meio só duplica arestas
+            arestas.flush()
+            indice = tabela.schema.get_field_index("Handles")
+            tabela = tabela.set_column(indice, "Handles", pa.array(ids, type=pa.list_(pa.int32())))
+            tmp = os.path.join(os.path.dirname(parte), "." + os.path.basename(parte) + ".tmp")
+            pq.write_table(tabela.cast(SCHEMA_AUTORES), tmp, compression="snappy")
+            os.replace(tmp, parte)
+
+_parquet_writer = None
+_arestas_writer = None
+
 def append_parquet_row(row):
-    """Atualiza Parquet incrementalmente"""
+    """Atualiza Parquet incrementalmente (buffer + partes em PARQUET_FILE/ e EDGES_FILE/)"""
+    global _parquet_writer, _arestas_writer
     if not HAS_PYARROW:
         return
     
     try:
-        # Cria DataFrame com a nova linha
-        df_new = pd.DataFrame([row], columns=CSV_COLUMNS)
-        
-        # Se já existe, carrega e concatena
-        if os.path.exists(PARQUET_FILE):
-            df_existing = pd.read_parquet(PARQUET_FILE)
-            df_combined = pd.concat([df_existing, df_new], ignore_index=True)
-        else:
-            df_combined = df_new
-        
-        # Salva
-        df_combined.to_parquet(PARQUET_FILE, index=False, engine="pyarrow", compression="snappy")
+        if _parquet_writer is None:
+            migrar_handles_legado()
+            # flush só em parquet_gravado(): o estado avança junto com o que está em disco
+            _parquet_writer = EscritorParquet(PARQUET_FILE, colunas=CSV_COLUMNS, schema=SCHEMA_AUTORES,
+                                              dicionario=COLUNAS_DICIONARIO, flush_automatico=False,
+                                              compressao=COMPRESSAO, nivel_compressao=NIVEL_COMPRESSAO)
+            _arestas_writer = EscritorParquet(EDGES_FILE, schema=SCHEMA_ARESTAS, dicionario=["author_ref"],
+                                              flush_automatico=False,
+                                              compressao=COMPRESSAO, nivel_compressao=NIVEL_COMPRESSAO)
+        ids = handles_para_ids(row.get("Handles"))
+        _parquet_writer.escrever(dict(row, Handles=ids))
+        for aresta in _arestas(row.get("Referencia"), ids):
+            _arestas_writer.escrever(aresta)
     except Exception as e:
         log_line(f"AVISO: falha ao atualizar Parquet: {e}")
 
+def parquet_gravado():
+    """
+    Grava as partes se o buffer atingiu o limite (linhas ou segundos). True se
+    tudo o que foi escrito já está em disco: só então os autores pendentes
+    entram no estado (ou são concluídos na fronteira).
+    """
+    if _parquet_writer is None:
+        return True
+    try:
+        if not _parquet_writer.flush_se_necessario():
+            return False
+        _arestas_writer.flush()
+        return True
+    except Exception as e:
+        log_line(f"AVISO: falha ao gravar Parquet (autores ficam pendentes): {e}")
+        return False
+
+def close_parquet():
+    """Grava o que restou no buffer do Parquet. True se tudo foi para o disco."""
+    global _parquet_writer, _arestas_writer
+    ok = True
+    for escritor in (_parquet_writer, _arestas_writer):
+        if escritor is None:
+            continue
+        try:
+            escritor.fechar()
+        except Exception as e:
+            ok = False
+            log_line(f"AVISO: falha ao finalizar Parquet: {e}")
+    if ok:
+        # com falha os escritores ficam (e o buffer junto) para uma nova tentativa
+        _parquet_writer = None
+        _arestas_writer = None
+    return ok
+
 def log_error(url, erro):
+    METRICAS.erro(erro)
     erro_data = {"url": url, "erro": str(erro), "timestamp": datetime.utcnow().isoformat()}
     if not os.path.exists(ERROR_FILE):
         with open(ERROR_FILE, "w", newline="", encoding="utf-8") as f:
@@ -186,6 +364,10 @@ def log_error(url, erro):
         writer.writerow(erro_data)
 
 # ----------------- Selenium -----------------
+def _com_bloqueio(driver):
+    ativar_bloqueio(driver, PERFIL_NAVEGADOR)
+    return driver
+
 def configurar_driver():
     """Tenta configurar driver automaticamente (Edge, Chrome ou Firefox)"""
     
@@ -201,8 +383,9 @@ def configurar_driver():
             options.add_argument("--no-sandbox")
             options.add_argument("--headless")
             options.add_argument("--disable-gpu")
+            aplicar_perfil(options, PERFIL_NAVEGADOR)
             service = Service(edge_path)
-            return webdriver.Edge(service=service, options=options)
+            return _com_bloqueio(webdriver.Edge(service=service, options=options))
         except Exception as e:
             log_line(f"Edge local falhou: {e}")
     
@@ -216,7 +399,8 @@ def configurar_driver():
         options.add_argument("--no-sandbox")
         options.add_argument("--headless")
         options.add_argument("--disable-gpu")
-        return webdriver.Edge(options=options)
+        aplicar_perfil(options, PERFIL_NAVEGADOR)
+        return _com_bloqueio(webdriver.Edge(options=options))
     except Exception as e:
         log_line(f"Edge do sistema falhou: {e}")
     
@@ -229,7 +413,8 @@ def configurar_driver():
         options.add_argument("--no-sandbox")
         options.add_argument("--headless")
         options.add_argument("--disable-gpu")
-        return webdriver.Chrome(options=options)
+        aplicar_perfil(options, PERFIL_NAVEGADOR)
+        return _com_bloqueio(webdriver.Chrome(options=options))
     except Exception as e:
         log_line(f"Chrome falhou: {e}")
     
@@ -238,6 +423,7 @@ def configurar_driver():
         log_line("Tentando Firefox...")
         options = webdriver.FirefoxOptions()
         options.add_argument("--headless")
+        aplicar_perfil(options, PERFIL_NAVEGADOR)
         return webdriver.Firefox(options=options)
     except Exception as e:
         log_line(f"Firefox falhou: {e}")
@@ -252,14 +438,19 @@ def configurar_driver():
     )
 
 # ----------------- Detectar total -----------------
+def aguardar_nova_tentativa(segundos):
+    """Backoff fixo só sem o controlador: com ele, a próxima vaga já vem espaçada."""
+    if RITMO is None:
+        time.sleep(segundos)
+
 def obter_total_autores(max_retries=5):
     """Tenta obter total de autores com retry"""
     for tentativa in range(max_retries):
         try:
             log_line(f"Tentando obter total de autores (tentativa {tentativa + 1}/{max_retries})...")
-            r = requests.get(BASE_URL + "0", headers=HEADERS, timeout=20)
-            r.raise_for_status()
-            text = BeautifulSoup(r.text, "html.parser").get_text(" ", strip=True)
+            with METRICAS.etapa("listagem"):
+                conteudo = get_com_cache(SESSAO, BASE_URL + "0", CACHE, timeout=20, ritmo=RITMO)
+            text = BeautifulSoup(conteudo, "html.parser").get_text(" ", strip=True)
             
             patterns = [
                 r"[Dd]el\s+\d+\s+[Aa]l\s+\d+\s+[Dd]e\s+([\d\.,]+)",
@@ -279,14 +470,14 @@ def obter_total_autores(max_retries=5):
         except requests.exceptions.HTTPError as e:
             if tentativa < max_retries - 1:
                 wait_time = (2 ** tentativa) * 2  # 2s, 4s, 8s, 16s, 32s
-                log_line(f"ERRO HTTP {e.response.status_code}: aguardando {wait_time}s antes de tentar novamente...")
-                time.sleep(wait_time)
+                log_line(f"ERRO HTTP {e.response.status_code}: tentando novamente...")
+                aguardar_nova_tentativa(wait_time)
             else:
                 log_line(f"ERRO: falha após {max_retries} tentativas: {e}")
         except Exception as e:
             log_line(f"ERRO: falha ao obter total: {e}")
             if tentativa < max_retries - 1:
-                time.sleep(2 ** tentativa)
+                aguardar_nova_tentativa(2 ** tentativa)
     
     return None
 
@@ -297,9 +488,9 @@ def obter_links_pagina(offset, max_retries=3):
     
     for tentativa in range(max_retries):
         try:
-            resp = requests.get(url, headers=HEADERS, timeout=30)
-            resp.raise_for_status()
-            soup = BeautifulSoup(resp.text, "html.parser")
+            with METRICAS.etapa("listagem"):
+                conteudo = get_com_cache(SESSAO, url, CACHE, timeout=30, ritmo=RITMO)
+                soup = BeautifulSoup(conteudo, "html.parser")
             links = soup.find_all("a", href=re.compile(r"(author\/|filtertype=author)", re.I))
             
             autores = []
@@ -311,36 +502,181 @@ def obter_links_pagina(offset, max_retries=3):
                         href = "https://ri.conicet.gov.ar" + href
                     autores.append({"nome": nome, "link": href})
             
+            if not autores and CACHE is not None:
+                CACHE.invalidar(url)
             return autores
         
         except requests.exceptions.HTTPError as e:
             if tentativa < max_retries - 1:
                 wait_time = (2 ** tentativa) * 2
-                log_line(f"ERRO_HTTP (tentativa {tentativa + 1}): offset={offset} erro={e.response.status_code}, aguardando {wait_time}s...")
-                time.sleep(wait_time)
+                log_line(f"ERRO_HTTP (tentativa {tentativa + 1}): offset={offset} erro={e.response.status_code}")
+                aguardar_nova_tentativa(wait_time)
             else:
                 log_line(f"ERRO_HTTP: offset={offset} erro={e}")
                 log_error(url, e)
         except Exception as e:
             if tentativa < max_retries - 1:
                 wait_time = 2 ** tentativa
-                log_line(f"ERRO (tentativa {tentativa + 1}): offset={offset}, aguardando {wait_time}s...")
-                time.sleep(wait_time)
+                log_line(f"ERRO (tentativa {tentativa + 1}): offset={offset}")
+                aguardar_nova_tentativa(wait_time)
             else:
                 log_line(f"ERRO: offset={offset} erro={e}")
                 log_error(url, e)
     
     return []
 
+# ----------------- Publicações do autor via HTTP -----------------
+RE_HANDLE = re.compile(r"/handle/11336/(\d+)")
+RE_PROXIMA = re.compile(r'<a[^>]*class="next-page-link"[^>]*href="([^"]+)"|<a[^>]*href="([^"]+)"[^>]*class="next-page-link"')
+RE_INTERVALO = re.compile(r"(\d[\d\.,]*)\s*-\s*(\d[\d\.,]*)\s+de\s+(\d[\d\.,]*)")
+RE_TAGS = re.compile(r"<[^>]+>")
+
+def _inteiro(texto):
+    return int(texto.replace(".", "").replace(",", ""))
+
+def _com_parametros(url, **params):
+    partes = urlsplit(url)
+    query = dict(parse_qsl(partes.query))
+    query.update({k: str(v) for k, v in params.items()})
+    return urlunsplit(partes._replace(query=urlencode(query)))
+
+def _baixar_texto(url):
+    return get_com_cache(SESSAO, url, CACHE, timeout=30, ritmo=RITMO).decode("utf-8", "replace")
+
+def _proxima_pagina(texto, base):
+    m = RE_PROXIMA.search(texto)
+    if not m:
+        return None
+    return urljoin(base, html.unescape(m.group(1) or m.group(2)))
+
+def _urls_restantes(primeira, proxima, texto):
+    """
+    Deduz as URLs das páginas 2..n a partir do link "Página siguiente" e do
+    "Mostrando ítems 1-100 de N". None quando o formato não é reconhecido.
+    """
+    m = RE_INTERVALO.search(RE_TAGS.sub(" ", texto))
+    if not m:
+        return None
+    inicio, fim, total = (_inteiro(g) for g in m.groups())
+    por_pagina = fim - inicio + 1
+    if por_pagina <= 0:
+        return None
+    atual = dict(parse_qsl(urlsplit(primeira).query))
+    seguinte = dict(parse_qsl(urlsplit(proxima).query))
+    mudou = [k for k, v in seguinte.items() if atual.get(k) != v and v.isdigit()]
+    if len(mudou) != 1:
+        return None
+    param, valor = mudou[0], int(seguinte[mudou[0]])
+    n_paginas = (total + por_pagina - 1) // por_pagina
+    if valor == 2:                       # page=2, 3, ...
+        valores = range(2, n_paginas + 1)
+    elif valor in (por_pagina, por_pagina + 1):   # offset (base 0 ou 1)
+        valores = range(valor, valor + por_pagina * (n_paginas - 1), por_pagina)
+    else:
+        return None
+    return [_com_parametros(proxima, **{param: v}) for v in valores]
+
+def listar_handles_autor(link):
+    """
+    Handles das publicações do autor sem navegador: primeira página com o maior
+    rpp aceito e, conhecido o total, as demais em paralelo.
+    Retorna None em erro/proxy (quem chama usa o Selenium).
+    """
+    primeira = _com_parametros(link, rpp=RPP_AUTOR)
+    try:
+        texto = _baixar_texto(primeira)
+    except Exception as e:
+        log_line(f"AVISO: lista HTTP do autor falhou ({e}): {link}")
+        return None
+    if erro_de_proxy(texto):
+        penalizar(RITMO, primeira, "proxy")
+        if CACHE is not None:
+            CACHE.invalidar(primeira)
+        return None
+
+    handles = set(RE_HANDLE.findall(texto))
+    proxima = _proxima_pagina(texto, primeira)
+    if not proxima:
+        return handles
+
+    restantes = _urls_restantes(primeira, proxima, texto)
+    try:
+        if restantes is not None:
+            with ThreadPoolExecutor(max_workers=PAGINAS_SIMULTANEAS) as pool:
+                for pagina in pool.map(_baixar_texto, restantes):
+                    handles.update(RE_HANDLE.findall(pagina))
+        else:
+            # formato de paginação desconhecido: segue o "Página siguiente" em série
+            vistos = {primeira}
+            while proxima and proxima not in vistos:
+                vistos.add(proxima)
+                pagina = _baixar_texto(proxima)
+                handles.update(RE_HANDLE.findall(pagina))
+                proxima = _proxima_pagina(pagina, proxima)
+    except Exception as e:
+        log_line(f"AVISO: página da lista do autor falhou ({e}): {link}")
+        return None
+    return handles
+
+def _handles_selenium(driver):
+    """Caminho antigo: clica em "Página siguiente" até acabar."""
+    handles = set()
+    while True:
+        try:
+            pubs = driver.find_elements(By.XPATH, "//a[contains(@href, '/handle/11336/')]")
+            if not pubs:
+                break
+            
+            for pub in pubs:
+                href = pub.get_attribute("href")
+                if href:
+                    handle = href.split("/handle/11336/")[-1]
+                    if handle:
+                        handles.add(handle)
+            
+            try:
+                next_btn = driver.find_element(By.XPATH, "//a[@class='next-page-link' and contains(text(), 'Página siguiente')]")
+                anterior = pubs[0]
+                with requisicao(RITMO, driver.current_url, CLASSE_NAVEGADOR):
+                    next_btn.click()
+                    # Pronta quando a lista antiga saiu do DOM e a nova já tem handles
+                    ESPERA.aguardar(driver, "autor_pagina", lambda d: (
+                        EC.staleness_of(anterior)(d)
+                        and EC.presence_of_element_located((By.XPATH, "//a[contains(@href, '/handle/11336/')]"))(d)
+                    ))
+            except NoSuchElementException:
+                break
+        except Exception:
+            break
+    return handles
+
 # ----------------- Coleta de dados do autor -----------------
+def _campo_tabela(coluna, rotulo):
+    return Campo(coluna, f"//td[contains(text(), '{rotulo}')]/following-sibling::td")
+
+# Tabela do perfil do autor (comum/campos.py)
+CAMPOS_AUTOR = Especificacao([
+    _campo_tabela("Titulo", "Título"),
+    _campo_tabela("Local de Trabalho", "Lugar de trabajo"),
+    _campo_tabela("Campo de Aplicacao", "Campo de aplicación"),
+    _campo_tabela("Especialidade", "Especialidad"),
+    _campo_tabela("Grado", "Grado"),
+])
+
 def coletar_dados_autor(driver, nome, link):
     """Coleta dados detalhados de um autor usando Selenium"""
     try:
-        driver.get(link)
-        WebDriverWait(driver, 3).until(EC.presence_of_element_located((By.TAG_NAME, 'body')))
+        with METRICAS.etapa("carga_pagina"), requisicao(RITMO, link, CLASSE_NAVEGADOR) as r:
+            driver.get(link)
+            ESPERA.aguardar(driver, "autor")
+            # página de erro do proxy chega como carga normal: o controlador reduz o ritmo
+            erro_proxy = erro_de_proxy(driver.page_source)
+            if erro_proxy:
+                r.sinalizar("proxy")
+        log_line(f"PAGINA: {link} {descrever_medida(medir_pagina(driver))}")
         
-        page_source = driver.page_source
-        if any(err in page_source for err in ["Proxy Error", "502 Bad Gateway", "invalid response"]):
+        if erro_proxy:
+            METRICAS.erro("proxy")
             log_line(f"Erro de proxy em {link}")
             return None
         
@@ -369,46 +705,31 @@ def coletar_dados_autor(driver, nome, link):
             "Handles": set()
         }
         
-        # Coleta campos da tabela
-        campos_map = {
-            "Titulo": "Título",
-            "Local de Trabalho": "Lugar de trabajo",
-            "Campo de Aplicacao": "Campo de aplicación",
-            "Especialidade": "Especialidad",
-            "Grado": "Grado"
-        }
-        
-        for coluna, campo in campos_map.items():
+        # Coleta campos da tabela (uma chamada ao driver; campo a campo só se falhar)
+        inicio_extracao = time.perf_counter()
+        extraidos, falhos = extrair_campos_navegador(driver, CAMPOS_AUTOR, tratar=str.strip)
+        autor.update(extraidos)
+        for spec, (coluna, xpath, attr, multi) in zip(CAMPOS_AUTOR, CAMPOS_AUTOR.para_navegador()):
+            if coluna not in falhos:
+                continue
+            valor = lambda e: (e.get_attribute(attr) or "") if attr != "text" else e.text
+            if multi:
+                autor[coluna] = spec.juntar.join(valor(e).strip() for e in driver.find_elements(By.XPATH, xpath))
+                continue
             try:
-                elem = driver.find_element(By.XPATH, f"//td[contains(text(), '{campo}')]/following-sibling::td")
-                autor[coluna] = elem.text.strip()
+                autor[coluna] = valor(driver.find_element(By.XPATH, xpath)).strip()
             except NoSuchElementException:
                 pass
         
-        # Coleta handles (publicações)
-        while True:
-            try:
-                pubs = driver.find_elements(By.XPATH, "//a[contains(@href, '/handle/11336/')]")
-                if not pubs:
-                    break
-                
-                for pub in pubs:
-                    href = pub.get_attribute("href")
-                    if href:
-                        handle = href.split("/handle/11336/")[-1]
-                        if handle:
-                            autor["Handles"].add(handle)
-                
-                try:
-                    next_btn = driver.find_element(By.XPATH, "//a[@class='next-page-link' and contains(text(), 'Página siguiente')]")
-                    next_btn.click()
-                    WebDriverWait(driver, 3).until(
-                        EC.presence_of_element_located((By.XPATH, "//a[contains(@href, '/handle/11336/')]"))
-                    )
-                except NoSuchElementException:
-                    break
-            except Exception:
-                break
+        METRICAS.observar("extracao", time.perf_counter() - inicio_extracao)
+        
+        # Coleta handles (publicações): HTTP paginado; Selenium só se falhar
+        with METRICAS.etapa("lista_publicacoes"):
+            handles = listar_handles_autor(link)
+            if handles is None:
+                METRICAS.contar("publicacoes_via_selenium")
+                handles = _handles_selenium(driver)
+        autor["Handles"] = handles
         
         autor["Quantidade de Handles"] = len(autor["Handles"])
         autor["Handles"] = "|".join(sorted(autor["Handles"]))
@@ -422,21 +743,56 @@ def coletar_dados_autor(driver, nome, link):
         return None
 
 # ----------------- Main -----------------
-def main(reset=False):
+def remover_saidas():
+    for f in [STATE_FILE, STATE_DB_FILE, STATE_DB_FILE + "-wal", STATE_DB_FILE + "-shm",
+              CSV_FILE, ERROR_FILE, PREVISAO_FILE, PARQUET_FILE, EDGES_FILE, HANDLES_INDEX_FILE]:
+        if os.path.exists(f):
+            try:
+                if f in (PARQUET_FILE, EDGES_FILE) and HAS_PYARROW:
+                    remover_dataset(f)
+                else:
+                    os.remove(f)
+                log_line(f"RESET: removido {f}")
+            except Exception as e:
+                log_line(f"RESET: falha ao remover {f}: {e}")
+
+def main(reset=False, state_backend="sqlite", shards=1, shard_id=0):
+    """
+    Percorre a listagem de PAGE_SIZE em PAGE_SIZE. Com shards > 1, só as páginas
+    p com p % shards == shard_id, nas saídas de configurar_shard().
+    Retorna True se chegou ao fim da listagem.
+    """
     log_line("INICIO: coleta unificada")
+    concluido = False
     
     if reset:
-        for f in [STATE_FILE, CSV_FILE, ERROR_FILE, PREVISAO_FILE, PARQUET_FILE]:
-            if os.path.exists(f):
-                try:
-                    os.remove(f)
-                    log_line(f"RESET: removido {f}")
-                except Exception as e:
-                    log_line(f"RESET: falha ao remover {f}: {e}")
+        remover_saidas()
+    elif shards > 1 and shard_mesclado(shards, shard_id, state_backend):
+        log_line(f"SHARD {shard_id}/{shards}: já juntado em {OUTPUT_DIR}; nada a fazer")
+        return True
     
-    estado = carregar_estado()
-    offset = estado.get("ultimo_offset", 0)
-    processados = estado.get("processados", {})
+    estado = carregar_estado(state_backend)
+    if shards > 1:
+        # o estado só vale para a mesma divisão: outro N atribuiria outras páginas
+        divisao = estado.obter("shard")
+        if divisao is not None and list(divisao) != [shard_id, shards]:
+            log_line(f"ERRO_CRITICO: estado de {STATE_DB_FILE} é do shard {divisao[0]}/{divisao[1]}; use --reset")
+            estado.fechar()
+            return False
+        if divisao is None and not reset:
+            # shard novo: pula os autores que o estado principal já tem (coleta
+            # sem shards ou shards de outra divisão já juntados)
+            principal = _abrir_estado_principal(state_backend)
+            if principal is not None:
+                estado.marcar_varios(principal.chaves())
+                principal.fechar()
+                log_line(f"SHARD {shard_id}/{shards}: {len(estado)} autores já coletados no estado principal")
+        estado.definir("shard", [shard_id, shards])
+        estado.salvar()
+    abrir_indice_handles()
+    offset = estado.obter("ultimo_offset", shard_id * PAGE_SIZE)
+    passo = PAGE_SIZE * shards
+    processados = estado  # suporta `link in processados` e len()
     
     total = obter_total_autores()
     if total is None:
@@ -447,8 +803,8 @@ def main(reset=False):
         log_line("  3. Usar um valor estimado (última coleta: 313483 autores)")
         
         # Usa total do estado anterior ou valor padrão
-        if estado.get("total_autores", 0) > 0:
-            total = estado["total_autores"]
+        if estado.obter("total_autores", 0) > 0:
+            total = estado.obter("total_autores")
             log_line(f"USANDO total do estado anterior: {total} autores")
         else:
             # Valor padrão baseado na última execução
@@ -458,10 +814,14 @@ def main(reset=False):
     
     total_pages = (total // PAGE_SIZE) + (1 if total % PAGE_SIZE else 0)
     log_line(f"TOTAL: {total} autores em ~{total_pages} páginas")
+    meta = total  # autores que cabem a este processo (progresso, ETA, previsão)
+    if shards > 1:
+        meta = -(-total // shards)
+        log_line(f"SHARD {shard_id}/{shards}: ~{meta} autores, páginas {shard_id + 1}, {shard_id + 1 + shards}, ...")
     
     # Previsão inicial de tempo
     tempo_por_autor_estimado = WAIT_SELENIUM + 2  # 2s de processamento + espera
-    tempo_total_estimado_segundos = total * tempo_por_autor_estimado
+    tempo_total_estimado_segundos = meta * tempo_por_autor_estimado
     tempo_total_horas = tempo_total_estimado_segundos / 3600
     tempo_total_dias = tempo_total_horas / 24
     
@@ -475,14 +835,25 @@ def main(reset=False):
     log_line(f"  • Início: {datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S')} UTC")
     log_line(f"  • Término previsto: {termino_previsto_local.strftime('%Y-%m-%d %H:%M:%S')} UTC-3")
     log_line(f"  • Autores já processados: {len(processados)}")
-    log_line(f"  • Autores restantes: {total - len(processados)}")
+    log_line(f"  • Autores restantes: {meta - len(processados)}")
     if len(processados) > 0:
-        tempo_restante = (total - len(processados)) * tempo_por_autor_estimado / 3600
+        tempo_restante = (meta - len(processados)) * tempo_por_autor_estimado / 3600
         log_line(f"  • Tempo restante estimado: {tempo_restante:.1f} horas")
     log_line("=" * 70)
     
     initialize_csv()
     
+    # autores já no CSV e no buffer do Parquet, ainda fora do estado
+    pendentes = []
+    
+    def confirmar_pendentes(offset_atual=None):
+        if offset_atual is not None:
+            estado.definir("ultimo_offset", offset_atual)
+            estado.definir("total_autores", total)
+        estado.marcar_varios(pendentes)
+        salvar_estado(estado)
+        pendentes.clear()
+    
     driver = None
     try:
         driver = configurar_driver()
@@ -505,19 +876,23 @@ def main(reset=False):
                 nome = autor_info["nome"]
                 
                 # Pula se já foi processado
-                if link in processados:
+                if link in processados or link in pendentes:
                     continue
                 
                 log_line(f"  Processando: {nome}")
+                inicio_autor = time.time()
                 
                 # Coleta dados detalhados
                 dados = coletar_dados_autor(driver, nome, link)
                 
                 if dados:
-                    append_csv_row(dados)
-                    append_parquet_row(dados)  # Atualiza Parquet incrementalmente
-                    processados[link] = True
+                    with METRICAS.etapa("persistencia"):
+                        append_csv_row(dados)
+                        append_parquet_row(dados)  # Atualiza Parquet incrementalmente
+                        indexar_handles(dados)
+                        pendentes.append(link)
                     autores_processados_count += 1
+                    METRICAS.progresso(autores_processados_count, meta)
                     
                     if dados['Quantidade de Handles'] > 0:
                         log_line(f"    ✓ Salvo: {dados['Quantidade de Handles']} publicações")
@@ -526,29 +901,46 @@ def main(reset=False):
                 else:
                     log_line(f"    ✗ Erro ao processar")
                 
-                # Salva estado
-                estado["ultimo_offset"] = offset
-                estado["processados"] = processados
-                estado["total_autores"] = total
-                salvar_estado(estado)
+                # Salva estado só com o Parquet em disco: uma queda antes disso
+                # recomeça desta página e refaz os autores ainda no buffer
+                with METRICAS.etapa("persistencia"):
+                    if parquet_gravado():
+                        confirmar_pendentes(offset)
                 
-                # Atualiza previsão
-                write_previsao(offset, total, start_time, autores_processados_count)
+                # Atualiza métricas e previsão (a cada METRICAS.intervalo segundos)
+                if METRICAS.flush_se_necessario():
+                    write_previsao(offset, meta, start_time, autores_processados_count)
                 
-                time.sleep(WAIT_SELENIUM)
+                # Mantém o intervalo mínimo entre autores sem somar ao tempo de carga
+                # (com o controlador de ritmo, é ele quem espaça as requisições)
+                restante = WAIT_SELENIUM - (time.time() - inicio_autor)
+                if RITMO is None and restante > 0:
+                    with METRICAS.etapa("espera"):
+                        time.sleep(restante)
             
-            # Próxima página
-            offset += PAGE_SIZE
+            # Próxima página (a próxima deste shard)
+            offset += passo
             elapsed = time.time() - start_time
-            log_line(f"PROGRESSO: {autores_processados_count} autores | {elapsed/3600:.2f}h decorridas")
-            time.sleep(WAIT_SECONDS)
+            eta = METRICAS.eta_segundos()
+            log_line(f"PROGRESSO: {autores_processados_count} autores | {elapsed/3600:.2f}h decorridas"
+                     + (f" | ETA {eta/3600:.2f}h" if eta is not None else "")
+                     + (f" | ritmo {RITMO.resumo()}" if RITMO is not None else ""))
+            ESPERA.salvar()
+            INDICE_HANDLES.salvar()
+            if RITMO is None:
+                with METRICAS.etapa("espera"):
+                    time.sleep(WAIT_SECONDS)
         
         log_line(f"FINAL: {autores_processados_count} autores processados")
+        if close_parquet():
+            estado.definir("concluido", True)
+            confirmar_pendentes(offset)
+            concluido = True
         
         # Verifica se Parquet foi criado
-        if os.path.exists(PARQUET_FILE):
+        if os.path.exists(PARQUET_FILE) and HAS_PYARROW:
             try:
-                df = pd.read_parquet(PARQUET_FILE)
+                df = ler_dataset(PARQUET_FILE)
                 log_line(f"PARQUET: arquivo final com {len(df)} linhas")
             except Exception as e:
                 log_line(f"AVISO: erro ao verificar Parquet final: {e}")
@@ -560,14 +952,414 @@ def main(reset=False):
     except Exception as e:
         log_line(f"ERRO_CRITICO: {e}")
     finally:
+        if close_parquet() and pendentes:
+            confirmar_pendentes()
+        INDICE_HANDLES.salvar()
+        estado.fechar()
+        METRICAS.fechar()
+        ESPERA.salvar()
+        log_line(f"Tempos de prontidão: {ESPERA.resumo()}")
         if driver:
             driver.quit()
             log_line("Driver Selenium encerrado")
     
     log_line("FIM: execução concluída")
+    return concluido
+
+# ----------------- Main com fronteira compartilhada -----------------
+def main_fronteira(caminho_fronteira):
+    """
+    Modo multi-processo: as páginas de listagem e os autores ficam na fronteira
+    SQLite (comum/fronteira.py). Cada processo arrenda um autor por vez e, quando
+    não há autores pendentes, arrenda a próxima página de listagem e publica os
+    autores dela. Rode vários processos com o mesmo --frontier.
+    """
+    log_line(f"INICIO: coleta via fronteira {caminho_fronteira}")
+    fronteira = Fronteira(caminho_fronteira)
+    # um arquivo de métricas por processo (vários workers na mesma pasta)
+    METRICAS.prefixo = os.path.join(OUTPUT_DIR, f"metricas_{os.getpid()}")
+    # idem para o índice de handles; junte depois com `python -m comum.indice_handles uniao`
+    abrir_indice_handles(os.path.join(OUTPUT_DIR, f"handles_autores_{os.getpid()}.idx"))
+
+    total = obter_total_autores()
+    if total is None:
+        total = 313483
+        log_line(f"USANDO total estimado: {total} autores (baseado em coleta anterior)")
+    novas = fronteira.enfileirar(FILA_LISTAGEM_AUTORES, [f"{BASE_URL}{o}" for o in range(0, total + 1, PAGE_SIZE)])
+    log_line(f"FRONTEIRA: {novas} páginas de listagem novas; autores: {fronteira.contagem(FILA_AUTORES)}")
+
+    initialize_csv()
+    driver = None
+    processados = 0
+    pendentes = []  # autores no buffer do Parquet: concluídos na fronteira só após o flush
+
+    def concluir_pendentes():
+        for link in fronteira.concluir(FILA_AUTORES, pendentes):
+            log_line(f"  AVISO: lease de {link} vencido; já entregue a outro processo")
+        pendentes.clear()
+
+    try:
+        driver = configurar_driver()
+        while True:
+            itens = fronteira.arrendar(FILA_AUTORES, 1)
+            if itens:
+                link, info = itens[0]
+                nome = (info or {}).get("nome", "")
+                inicio_autor = time.time()
+                log_line(f"  Processando: {nome}")
+                dados = coletar_dados_autor(driver, nome, link)
+                if dados:
+                    with METRICAS.etapa("persistencia"):
+                        append_csv_row(dados)
+                        append_parquet_row(dados)
+                        indexar_handles(dados)
+                        pendentes.append(link)
+                    processados += 1
+                    METRICAS.progresso(processados)
+                else:
+                    if not fronteira.falhar(FILA_AUTORES, link, "falha na coleta do autor"):
+                        log_line(f"  AVISO: lease de {link} vencido; falha não registrada")
+                # o flush vem em até SEGUNDOS_POR_FLUSH (60 s), bem antes do lease vencer
+                if pendentes and parquet_gravado():
+                    concluir_pendentes()
+                METRICAS.flush_se_necessario()
+                restante = WAIT_SELENIUM - (time.time() - inicio_autor)
+                if RITMO is None and restante > 0:
+                    with METRICAS.etapa("espera"):
+                        time.sleep(restante)
+                continue
+
+            itens = fronteira.arrendar(FILA_LISTAGEM_AUTORES, 1)
+            if itens:
+                url, _ = itens[0]
+                offset = int(url.rsplit("=", 1)[-1])
+                autores_pagina = obter_links_pagina(offset)
+                if autores_pagina:
+                    fronteira.enfileirar(FILA_AUTORES,
+                                         [a["link"] for a in autores_pagina],
+                                         [{"nome": a["nome"]} for a in autores_pagina])
+                    if fronteira.concluir(FILA_LISTAGEM_AUTORES, url):
+                        log_line(f"  AVISO: lease da página offset={offset} vencido")
+                    log_line(f"PAGINA offset={offset}: {len(autores_pagina)} autores publicados")
+                else:
+                    if not fronteira.falhar(FILA_LISTAGEM_AUTORES, url, "página de listagem vazia ou com erro"):
+                        log_line(f"  AVISO: lease da página offset={offset} vencido")
+                if RITMO is None:
+                    time.sleep(WAIT_SECONDS)
+                continue
+
+            # Nada livre: ou acabou, ou outros processos ainda seguram leases
+            if fronteira.restantes(FILA_AUTORES) == 0 and fronteira.restantes(FILA_LISTAGEM_AUTORES) == 0:
+                break
+            time.sleep(10)
+
+        log_line(f"FINAL: {processados} autores processados neste processo; "
+                 f"autores={fronteira.contagem(FILA_AUTORES)} listagem={fronteira.contagem(FILA_LISTAGEM_AUTORES)}")
+    except Exception as e:
+        log_line(f"ERRO_CRITICO: {e}")
+    finally:
+        if close_parquet() and pendentes:
+            concluir_pendentes()
+        INDICE_HANDLES.salvar()
+        METRICAS.fechar()
+        ESPERA.salvar()
+        if driver:
+            driver.quit()
+            log_line("Driver Selenium encerrado")
+        fronteira.fechar()
+
+    log_line("FIM: execução concluída")
+
+# ----------------- Shards (--shards N) -----------------
+# O worker i fica com as páginas de listagem p (offset = p * PAGE_SIZE) em que
+# p % N == i: conjuntos disjuntos, sem coordenação entre processos. Cada um tem
+# driver, estado, índice, CSV e partes Parquet próprios em shards/shard_<i>_de_<N>/;
+# o supervisor relança quem cair (o shard retoma do próprio estado) e, com todos
+# concluídos, junta as saídas em OUTPUT_DIR.
+SHARDS_DIR = os.path.join(OUTPUT_DIR, "shards")
+STATE_DB_PRINCIPAL, STATE_FILE_PRINCIPAL = STATE_DB_FILE, STATE_FILE  # configurar_shard() troca os globais
+MAX_REINICIOS_SHARD = 3
+INTERVALO_SUPERVISOR = 5  # segundos entre verificações dos processos
+
+def dir_shard(shards, shard_id):
+    return os.path.join(SHARDS_DIR, f"shard_{shard_id:02d}_de_{shards:02d}")
+
+def configurar_shard(shards, shard_id):
+    """Aponta as saídas deste processo para dir_shard() (mesmos nomes de arquivo)."""
+    global LOG_DIR, CSV_FILE, PARQUET_FILE, EDGES_FILE, ERROR_FILE, STATE_FILE, STATE_DB_FILE
+    global PREVISAO_FILE, HANDLES_INDEX_FILE, PREFIXO_LOG
+    pasta = dir_shard(shards, shard_id)
+    LOG_DIR = os.path.join(pasta, "logs")
+    os.makedirs(LOG_DIR, exist_ok=True)
+    CSV_FILE, PARQUET_FILE, EDGES_FILE, ERROR_FILE, STATE_FILE, STATE_DB_FILE, PREVISAO_FILE, HANDLES_INDEX_FILE = (
+        os.path.join(pasta, os.path.basename(f))
+        for f in (CSV_FILE, PARQUET_FILE, EDGES_FILE, ERROR_FILE, STATE_FILE, STATE_DB_FILE, PREVISAO_FILE,
+                  HANDLES_INDEX_FILE))
+    PREFIXO_LOG = f"[shard {shard_id}/{shards}] "
+    METRICAS.prefixo = os.path.join(pasta, "metricas")
+    # parte das amostras já coletadas, mas grava no próprio arquivo (sem corrida entre processos)
+    ESPERA.caminho = os.path.join(pasta, os.path.basename(READY_TIMES_FILE))
+    # o cache HTTP é compartilhado: índice SQLite com timeout e arquivos gravados atomicamente
+
+def _abrir_estado_shard(pasta, backend):
+    banco = os.path.join(pasta, os.path.basename(STATE_DB_FILE))
+    arquivo = os.path.join(pasta, os.path.basename(STATE_FILE))
+    if not (os.path.exists(banco) or os.path.exists(arquivo)):
+        return None
+    return abrir_estado(backend, banco, arquivo, log=log_line)
+
+def _abrir_estado_principal(backend):
+    if not (os.path.exists(STATE_DB_PRINCIPAL) or os.path.exists(STATE_FILE_PRINCIPAL)):
+        return None
+    return abrir_estado(backend, STATE_DB_PRINCIPAL, STATE_FILE_PRINCIPAL, log=log_line)
+
+def shard_mesclado(shards, shard_id, backend="sqlite"):
+    """True se o shard já foi juntado em OUTPUT_DIR (a pasta dele não existe mais)."""
+    estado = _abrir_estado_principal(backend)
+    if estado is None:
+        return False
+    try:
+        return str(shard_id) in _offsets_mesclados(estado, shards)
+    finally:
+        estado.fechar()
+
+def shard_concluido(shards, shard_id, backend="sqlite"):
+    if shard_mesclado(shards, shard_id, backend):
+        return True
+    estado = _abrir_estado_shard(dir_shard(shards, shard_id), backend)
+    if estado is None:
+        return False
+    try:
+        return bool(estado.obter("concluido"))
+    finally:
+        estado.fechar()
+
+def _anexar_csv(origem, destino):
+    """Acrescenta as linhas de `origem` (sem o cabeçalho) ao fim de `destino`."""
+    if not os.path.exists(origem):
+        return
+    with open(origem, newline="", encoding="utf-8") as f:
+        cabecalho = f.readline()
+        novo = not os.path.exists(destino)
+        with open(destino, "a", newline="", encoding="utf-8") as saida:
+            if novo:
+                saida.write(cabecalho)
+            shutil.copyfileobj(f, saida)
+
+def _offsets_mesclados(estado, shards):
+    """{shard_id (str): offset final} dos shards já juntados nesta divisão."""
+    registro = estado.obter("offsets_shards") or {}
+    return dict(registro.get("offsets", {})) if registro.get("shards") == shards else {}
+
+def mesclar_shards(shards, backend="sqlite"):
+    """
+    Junta em OUTPUT_DIR os shards concluídos: estado (processados), índice de
+    handles, partes Parquet (movidas, mantendo as partições), CSV, erros e logs.
+    Pode ser repetida se cair no meio; no pior caso o CSV ganha linhas repetidas,
+    que `python -m comum.compactacao compact autores` remove.
+    O offset final de cada shard fica em "offsets_shards" no estado principal;
+    com todos juntados, ultimo_offset/total_autores/concluido valem para a
+    listagem inteira, como se um só processo tivesse feito a coleta.
+    """
+    estado = carregar_estado(backend)
+    indice = abrir_indice_handles()
+    if HAS_PYARROW:
+        for destino in (PARQUET_FILE, EDGES_FILE):
+            _migrar_arquivo_legado(destino)
+        migrar_handles_legado()
+    mesclados = 0
+    try:
+        for shard_id in range(shards):
+            pasta = dir_shard(shards, shard_id)
+            estado_shard = _abrir_estado_shard(pasta, backend)
+            if estado_shard is None:
+                continue
+            if not estado_shard.obter("concluido"):
+                estado_shard.fechar()
+                log_line(f"MESCLAGEM: shard {shard_id} incompleto, fica para depois")
+                continue
+            n_autores = len(estado_shard)
+            estado.marcar_varios(estado_shard.chaves())
+            offsets = _offsets_mesclados(estado, shards)
+            offsets[str(shard_id)] = estado_shard.obter("ultimo_offset", shard_id * PAGE_SIZE)
+            estado.definir("offsets_shards", {"shards": shards, "offsets": offsets})
+            estado.definir("total_autores", max(estado.obter("total_autores", 0),
+                                                estado_shard.obter("total_autores", 0)))
+            salvar_estado(estado)
+            estado_shard.fechar()
+
+            indice.atualizar(IndiceHandles(os.path.join(pasta, os.path.basename(HANDLES_INDEX_FILE))))
+            indice.salvar()
+
+            n_partes = 0
+            if HAS_PYARROW:
+                # nomes de parte levam o pid do processo: não colidem entre shards
+                for destino in (PARQUET_FILE, EDGES_FILE):
+                    origem = os.path.join(pasta, os.path.basename(destino))
+                    for parte in listar_partes(origem):
+                        alvo = os.path.join(destino, os.path.relpath(parte, origem))
+                        os.makedirs(os.path.dirname(alvo), exist_ok=True)
+                        os.replace(parte, alvo)
+                        n_partes += 1
+
+            marcador = os.path.join(pasta, ".csv_mesclado")
+            if not os.path.exists(marcador):
+                for destino in (CSV_FILE, ERROR_FILE):
+                    _anexar_csv(os.path.join(pasta, os.path.basename(destino)), destino)
+                open(marcador, "w").close()
+
+            logs = os.path.join(pasta, "logs")
+            if os.path.isdir(logs):
+                alvo = os.path.join(LOG_DIR, os.path.basename(pasta))
+                if os.path.isdir(alvo):
+                    shutil.rmtree(alvo)
+                os.replace(logs, alvo)
+            shutil.rmtree(pasta)
+            mesclados += 1
+            log_line(f"MESCLAGEM: shard {shard_id}: {n_autores} autores, {n_partes} partes Parquet")
+
+        offsets = _offsets_mesclados(estado, shards)
+        if len(offsets) == shards:
+            # shard i cobriu tudo abaixo do seu offset na sua classe; a união
+            # cobre tudo abaixo do menor deles (acima do total, com todos concluídos)
+            estado.definir("ultimo_offset", min(offsets.values()))
+            estado.definir("concluido", True)
+            salvar_estado(estado)
+            log_line(f"MESCLAGEM: listagem completa até offset {min(offsets.values())}")
+    finally:
+        INDICE_HANDLES.salvar()
+        estado.fechar()
+    log_line(f"MESCLAGEM: {mesclados} shard(s) juntados em {OUTPUT_DIR}; {len(indice)} handles no índice")
+    return mesclados
+
+def supervisionar(shards, backend="sqlite", argumentos=(), reset=False, porta_metricas=None,
+                  max_reinicios=MAX_REINICIOS_SHARD):
+    """
+    Lança este script com --shards N --shard-id i para cada shard não concluído,
+    relança quem sair com erro (até max_reinicios vezes) e, com todos concluídos,
+    chama mesclar_shards(). Retorna True se juntou tudo.
+    """
+    log_line(f"SUPERVISOR: {shards} shards em {SHARDS_DIR}")
+    if reset:
+        remover_saidas()
+        if os.path.isdir(SHARDS_DIR):
+            shutil.rmtree(SHARDS_DIR)
+            log_line(f"RESET: removido {SHARDS_DIR}")
+
+    def lancar(shard_id):
+        cmd = [sys.executable, os.path.abspath(__file__), "--shards", str(shards), "--shard-id", str(shard_id),
+               "--state-backend", backend] + list(argumentos)
+        if porta_metricas:
+            cmd += ["--metrics-port", str(porta_metricas + shard_id)]
+        return subprocess.Popen(cmd)
+
+    processos = {}
+    reinicios = dict.fromkeys(range(shards), 0)
+    for shard_id in range(shards):
+        if shard_concluido(shards, shard_id, backend):
+            log_line(f"SUPERVISOR: shard {shard_id} já concluído")
+        else:
+            processos[shard_id] = lancar(shard_id)
+    try:
+        while processos:
+            time.sleep(INTERVALO_SUPERVISOR)
+            for shard_id, proc in list(processos.items()):
+                codigo = proc.poll()
+                if codigo is None:
+                    continue
+                del processos[shard_id]
+                if codigo == 0 and shard_concluido(shards, shard_id, backend):
+                    log_line(f"SUPERVISOR: shard {shard_id} concluído")
+                elif reinicios[shard_id] < max_reinicios:
+                    reinicios[shard_id] += 1
+                    log_line(f"SUPERVISOR: shard {shard_id} saiu com código {codigo}; "
+                             f"reinício {reinicios[shard_id]}/{max_reinicios}")
+                    processos[shard_id] = lancar(shard_id)
+                else:
+                    log_line(f"SUPERVISOR: shard {shard_id} desistiu após {max_reinicios} reinícios; "
+                             f"retome com --shards {shards} --shard-id {shard_id}")
+    except KeyboardInterrupt:
+        log_line("SUPERVISOR: interrompido, encerrando os shards")
+        for proc in processos.values():
+            proc.terminate()
+        for proc in processos.values():
+            proc.wait()
+        return False
+
+    pendentes = [i for i in range(shards) if not shard_concluido(shards, i, backend)]
+    if pendentes:
+        log_line(f"SUPERVISOR: shards {pendentes} incompletos; rode o supervisor de novo "
+                 f"(só eles recomeçam) e a mesclagem acontece no fim")
+        return False
+    mesclar_shards(shards, backend)
+    return True
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser()
     parser.add_argument("--reset", action="store_true", help="Reiniciar do zero")
+    parser.add_argument("--state-backend", choices=["sqlite", "json"], default="sqlite",
+                        help="sqlite (padrão, migra estado.json) ou json (formato antigo)")
+    parser.add_argument("--frontier", type=str, default=None,
+                        help="fronteira SQLite compartilhada (vários processos podem usar a mesma)")
+    parser.add_argument("--cache-dir", type=str, default=CACHE_DIR, help="cache HTTP em disco da listagem")
+    parser.add_argument("--no-cache", action="store_true", help="sempre buscar na rede")
+    parser.add_argument("--cache-ttl", action="append", default=[], metavar="CLASSE=SEGUNDOS",
+                        help="validade por classe de URL (listagem_autores, autor, ...); repetível")
+    parser.add_argument("--browser-profile", type=str, default=PERFIL_PADRAO, choices=PERFIS,
+                        help="sem_midia (padrão): bloqueia imagens, fontes e rastreadores; leve: também o CSS "
+                             "(pode mudar o .text dos campos)")
+    parser.add_argument("--metrics-port", type=int, default=None,
+                        help="expõe /metrics (Prometheus) e /metrics.json em 127.0.0.1:PORTA")
+    parser.add_argument("--compression", type=str, default=COMPRESSAO, choices=["zstd", "snappy", "gzip", "none"])
+    parser.add_argument("--compression-level", type=int, default=NIVEL_COMPRESSAO, help="nível (zstd/gzip)")
+    parser.add_argument("--rate", type=float, default=TAXA_MAX,
+                        help="teto de requisições/s por host do controle de ritmo (somando os processos)")
+    parser.add_argument("--max-concurrency", type=int, default=CONCORRENCIA_MAX,
+                        help="teto de requisições em voo por host (somando os processos)")
+    parser.add_argument("--rate-db", type=str, default=RITMO_DB, help="estado do ritmo, compartilhado na máquina")
+    parser.add_argument("--no-rate-control", action="store_true", help="intervalos fixos (comportamento antigo)")
+    parser.add_argument("--shards", type=int, default=1,
+                        help="divide a listagem em N shards; sem --shard-id, supervisiona N processos e junta tudo")
+    parser.add_argument("--shard-id", type=int, default=None, help="roda só o shard i (0..N-1)")
+    parser.add_argument("--merge-shards", action="store_true",
+                        help="só junta em OUTPUT_DIR os shards já concluídos de --shards N")
     args = parser.parse_args()
-    main(reset=args.reset)
\ No newline at end of file
+    if args.shard_id is not None and not 0 <= args.shard_id < args.shards:
+        parser.error("--shard-id deve estar entre 0 e --shards - 1")
+    PERFIL_NAVEGADOR = args.browser_profile
+    COMPRESSAO = args.compression
+    NIVEL_COMPRESSAO = args.compression_level if args.compression in ("zstd", "gzip") else None
+
+    if args.shards > 1 and args.shard_id is None:
+        if args.merge_shards:
+            mesclar_shards(args.shards, args.state_backend)
+        else:
+            repassar = ["--cache-dir", args.cache_dir, "--browser-profile", args.browser_profile,
+                        "--compression", args.compression, "--compression-level", str(args.compression_level)]
+            repassar += [a for ttl in args.cache_ttl for a in ("--cache-ttl", ttl)]
+            if args.no_cache:
+                repassar.append("--no-cache")
+            repassar += ["--rate", str(args.rate), "--max-concurrency", str(args.max_concurrency),
+                         "--rate-db", args.rate_db]
+            if args.no_rate_control:
+                repassar.append("--no-rate-control")
+            ok = supervisionar(args.shards, args.state_backend, repassar, reset=args.reset,
+                               porta_metricas=args.metrics_port)
+            sys.exit(0 if ok else 1)
+        sys.exit(0)
+
+    if args.shards > 1:
+        configurar_shard(args.shards, args.shard_id)
+    if args.metrics_port:
+        METRICAS.servir(args.metrics_port)
+    if not args.no_cache:
+        CACHE = CacheHTTP(args.cache_dir, interpretar_ttls(args.cache_ttl))
+    if not args.no_rate_control:
+        RITMO = ControladorRitmo(args.rate_db, taxa_max=args.rate, concorrencia_max=args.max_concurrency, log=log_line)
+    if args.frontier:
+        main_fronteira(args.frontier)
+    else:
+        concluido = main(reset=args.reset, state_backend=args.state_backend,
+                         shards=args.shards, shard_id=args.shard_id or 0)
+        if args.shards > 1:
+            sys.exit(0 if concluido else 1)  # o supervisor relança shards que saem com erro
\ No newline at end of file
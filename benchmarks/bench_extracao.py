@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+bench_extracao.py
+Páginas/segundo do parse + extração lxml sobre as páginas salvas em
+fixtures/html/ (item, discover, perfil de autor), com as mesmas
+especificações de campos usadas pelos scrapers.
+
+    python benchmarks/bench_extracao.py --segundos 2 --saida bench_extracao.json
+    python benchmarks/bench_extracao.py --minimo item=300   # sai com erro se ficar abaixo
+
+Serve para que uma troca de seletor não derrube a vazão sem ninguém notar.
+"""
+
+import os
+import sys
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from medicao import importar_scripts, ler_fixture, medir, emitir
+
+
+def casos():
+    (artigos, links, autores), _ = importar_scripts(
+        "artigos_data_scraper", "artigo_link_scraper", "authors_data_scraper"
+    )
+    from comum.extracao_http import parse_html
+
+    item = ler_fixture("html", "item.html")
+    discover = ler_fixture("html", "discover.html")
+    autor = ler_fixture("html", "autor.html")
+    url_item = "https://ri.conicet.gov.ar/handle/11336/100001"
+
+    def extrair_item():
+        doc = parse_html(item, url_item)
+        return artigos.CAMPOS_ARTIGO.extrair(doc, url_item, tratar=artigos.escapar_texto)
+
+    def extrair_item_link():
+        return links.CAMPOS_ITEM.extrair(parse_html(item, url_item), url_item)
+
+    def extrair_discover():
+        return links.extrair_links_html(discover)
+
+    def extrair_autor():
+        doc = parse_html(autor)
+        dados = autores.CAMPOS_AUTOR.extrair(doc, tratar=str.strip)
+        dados["Handles"] = set(autores.RE_HANDLE.findall(autor.decode("utf-8")))
+        return dados
+
+    return {
+        "item": (extrair_item, lambda d: d["Titulo"] and d["Autores"] and d["DOI"]),
+        "item_link": (extrair_item_link, lambda d: d["author"]),
+        "discover": (extrair_discover, lambda d: len(d) == 10),
+        "autor": (extrair_autor, lambda d: d["Titulo"] and len(d["Handles"]) == 100),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--segundos", type=float, default=1.0, help="tempo de medição por caso")
+    parser.add_argument("--saida", type=str, default=None, help="grava o JSON também neste arquivo")
+    parser.add_argument("--minimo", action="append", default=[], metavar="CASO=PAGINAS_POR_S",
+                        help="falha se o caso ficar abaixo deste valor; repetível")
+    args = parser.parse_args()
+    saida = os.path.abspath(args.saida) if args.saida else None
+
+    resultados = {}
+    erros = []
+    for nome, (funcao, conferir) in casos().items():
+        if not conferir(funcao()):
+            erros.append(f"{nome}: extração não encontrou os campos esperados")
+        resultados[nome] = medir(funcao, segundos=args.segundos)
+
+    for esp in args.minimo:
+        caso, _, valor = esp.partition("=")
+        if caso in resultados and resultados[caso]["por_segundo"] < float(valor):
+            erros.append(f"{caso}: {resultados[caso]['por_segundo']} páginas/s < {valor}")
+
+    emitir({"paginas_por_segundo": {k: v["por_segundo"] for k, v in resultados.items()},
+            "detalhes": resultados, "erros": erros}, saida)
+    sys.exit(1 if erros else 0)
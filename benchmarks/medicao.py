@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+medicao.py
+Utilitários comuns dos benchmarks (sem rede, só fixtures e dados sintéticos).
+
+Os scripts importam os módulos dos scrapers; como eles criam pastas de saída e
+logs no diretório atual ao serem importados, importar_scripts() troca para um
+diretório temporário antes.
+"""
+
+import os
+import sys
+import json
+import time
+import tempfile
+import importlib
+import platform
+import statistics
+import subprocess
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FIXTURES = os.path.join(RAIZ, "fixtures")
+
+SCRIPTS = {
+    "artigos_data_scraper": "artigos_data",
+    "artigo_link_scraper": "artigos_links",
+    "authors_data_scraper": "autors_unificado",
+}
+
+
+def importar_scripts(*nomes):
+    """Importa os scrapers a partir de um diretório temporário; retorna (modulos, dir_tmp)."""
+    tmp = tempfile.mkdtemp(prefix="bench_conicet_")
+    os.chdir(tmp)
+    if RAIZ not in sys.path:
+        sys.path.insert(0, RAIZ)
+    argv = sys.argv
+    sys.argv = [argv[0]]
+    try:
+        modulos = []
+        for nome in nomes:
+            pasta = os.path.join(RAIZ, SCRIPTS[nome])
+            if pasta not in sys.path:
+                sys.path.insert(0, pasta)
+            modulos.append(importlib.import_module(nome))
+    finally:
+        sys.argv = argv
+    return modulos, tmp
+
+
+def ler_fixture(*caminho):
+    with open(os.path.join(FIXTURES, *caminho), "rb") as f:
+        return f.read()
+
+
+def medir(funcao, segundos=1.0, minimo=5):
+    """
+    Chama funcao() repetidamente por ~`segundos` (pelo menos `minimo` vezes).
+    Retorna {"execucoes", "total_s", "media_ms", "mediana_ms", "p95_ms", "por_segundo"}.
+    """
+    tempos = []
+    inicio = time.perf_counter()
+    while len(tempos) < minimo or time.perf_counter() - inicio < segundos:
+        t0 = time.perf_counter()
+        funcao()
+        tempos.append(time.perf_counter() - t0)
+    total = sum(tempos)
+    ordenados = sorted(tempos)
+    return {
+        "execucoes": len(tempos),
+        "total_s": round(total, 4),
+        "media_ms": round(total / len(tempos) * 1000, 4),
+        "mediana_ms": round(statistics.median(tempos) * 1000, 4),
+        "p95_ms": round(ordenados[min(len(ordenados) - 1, int(0.95 * len(ordenados)))] * 1000, 4),
+        "por_segundo": round(len(tempos) / total, 2) if total else None,
+    }
+
+
+def cronometrar(funcao):
+    """Uma execução (casos pesados, ex.: gravar 313 mil linhas). Retorna (segundos, resultado)."""
+    t0 = time.perf_counter()
+    resultado = funcao()
+    return time.perf_counter() - t0, resultado
+
+
+def metadados():
+    """Commit, Python e data da medição, para comparar execuções entre commits."""
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=RAIZ,
+                                capture_output=True, text=True, timeout=10).stdout.strip() or None
+    except Exception:
+        commit = None
+    return {
+        "commit": commit,
+        "python": platform.python_version(),
+        "plataforma": platform.platform(),
+        "data": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+
+
+def emitir(resultados, saida=None):
+    texto = json.dumps(resultados, indent=2, ensure_ascii=False)
+    if saida:
+        with open(saida, "w", encoding="utf-8") as f:
+            f.write(texto + "\n")
+    print(texto)
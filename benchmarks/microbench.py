@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+microbench.py
+Microbenchmarks dos caminhos quentes na escala de produção (~313 mil
+registros), com dados sintéticos e as páginas de fixtures/html/ — sem rede.
+
+    python benchmarks/microbench.py --saida bench_$(git rev-parse --short HEAD).json
+    python benchmarks/microbench.py --escala 0.1 --casos parquet,estado
+
+Casos:
+  parquet   append_parquet_row (autores) e salvar_dados (artigos)
+  estado    salvar_estado com 313k processados (sqlite e json) e custo por autor
+  links     carregar_links_existentes / salvar_links_novos com 300k links
+  escapar   escapar_texto (artigos_data e link scraper)
+  listagem  parse HTML de obter_links_pagina (página de 90 autores)
+
+O JSON traz commit/Python/data para comparar execuções entre commits.
+"""
+
+import os
+import sys
+import shutil
+import random
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from medicao import importar_scripts, ler_fixture, medir, cronometrar, metadados, emitir
+
+PROCESSADOS_PRODUCAO = 313000
+LINKS_PRODUCAO = 300000
+CASOS = ("parquet", "estado", "links", "escapar", "listagem")
+
+
+# ---------- dados sintéticos ----------
+def _texto(rnd, palavras):
+    base = ["suelo", "carbono", "\"región\"", "pampeana", "análisis\n", "datos", "modelo", "CONICET"]
+    return " ".join(rnd.choice(base) for _ in range(palavras))
+
+
+def linha_autor(rnd, i):
+    handles = sorted(str(rnd.randint(1, 250000)) for _ in range(rnd.randint(0, 40)))
+    return {
+        "Autor": f"Apellido{i}, Nombre", "Referencia": str(10000 + i),
+        "Link Principal": f"https://ri.conicet.gov.ar/author/{10000 + i}",
+        "Conicet": bool(i % 3), "Titulo": _texto(rnd, 4), "Grado": "Investigador Adjunto",
+        "Especialidade": _texto(rnd, 3), "Campo de Aplicacao": _texto(rnd, 3),
+        "Local de Trabalho": _texto(rnd, 6),
+        "Quantidade de Handles": len(handles), "Handles": "|".join(handles),
+    }
+
+
+def linha_artigo(rnd, i, colunas):
+    dados = {c: _texto(rnd, 3) for c in colunas}
+    dados.update({
+        "url": f"https://ri.conicet.gov.ar/handle/11336/{i}",
+        "Titulo": _texto(rnd, 12), "Autores": "; ".join(f"Apellido{rnd.randint(1, 9999)}, N." for _ in range(5)),
+        "Resumo": _texto(rnd, 180), "Idioma": rnd.choice(["Español", "Inglés", "Portugués"]),
+    })
+    return dados
+
+
+# ---------- casos ----------
+def caso_parquet(artigos, autores, tmp, escala, rnd):
+    from comum.parquet_incremental import EscritorParquet
+    n = int(PROCESSADOS_PRODUCAO * escala)
+
+    autores.PARQUET_FILE = os.path.join(tmp, "autores.parquet")
+    linhas = [linha_autor(rnd, i) for i in range(n)]
+
+    def gravar_autores():
+        for linha in linhas:
+            autores.append_parquet_row(linha)
+        autores.close_parquet()
+    seg_autores, _ = cronometrar(gravar_autores)
+
+    colunas = ["url"] + artigos.CAMPOS_ARTIGO.nomes
+    artigos_linhas = [linha_artigo(rnd, i, colunas) for i in range(n)]
+
+    def gravar_artigos():
+        with EscritorParquet(os.path.join(tmp, "articulos.parquet")) as escritor:
+            for dados in artigos_linhas:
+                artigos.salvar_dados(dados, escritor)
+    seg_artigos, _ = cronometrar(gravar_artigos)
+
+    return {
+        "append_parquet_row": {"linhas": n, "total_s": round(seg_autores, 3),
+                               "linhas_por_segundo": round(n / seg_autores, 1)},
+        "salvar_dados": {"linhas": n, "total_s": round(seg_artigos, 3),
+                         "linhas_por_segundo": round(n / seg_artigos, 1)},
+    }
+
+
+def caso_estado(autores, tmp, escala, rnd):
+    from comum.estado import EstadoSQLite, EstadoJSON
+    n = int(PROCESSADOS_PRODUCAO * escala)
+    chaves = [f"https://ri.conicet.gov.ar/author/{i}" for i in range(n)]
+    resultados = {}
+    for nome, estado in (("sqlite", EstadoSQLite(os.path.join(tmp, "estado.sqlite"))),
+                         ("json", EstadoJSON(os.path.join(tmp, "estado.json")))):
+        seg_carga, _ = cronometrar(lambda: (estado.marcar_varios(chaves), estado.salvar()))
+        contador = iter(range(n, n * 10))
+
+        def um_autor():
+            # o que main() faz a cada autor: marca, atualiza offset e salva
+            estado.marcar_processado(f"https://ri.conicet.gov.ar/author/{next(contador)}")
+            estado.definir("ultimo_offset", 0)
+            autores.salvar_estado(estado)
+        por_autor = medir(um_autor, segundos=1.0, minimo=3)
+        consulta = medir(lambda: chaves[rnd.randrange(n)] in estado, segundos=0.5)
+        resultados[nome] = {
+            "processados": n,
+            "carga_inicial_s": round(seg_carga, 3),
+            "salvar_por_autor_ms": por_autor["media_ms"],
+            "autores_por_segundo": por_autor["por_segundo"],
+            "consulta_us": round(consulta["media_ms"] * 1000, 2),
+        }
+        estado.fechar()
+    return {"salvar_estado": resultados}
+
+
+def caso_links(links_mod, tmp, escala, rnd):
+    n = int(LINKS_PRODUCAO * escala)
+    links_mod.LINKS_FILE = os.path.join(tmp, "links_coletados.txt")
+    with open(links_mod.LINKS_FILE, "w", encoding="utf-8") as f:
+        for i in range(n):
+            f.write(f"https://ri.conicet.gov.ar/handle/11336/{i}\n")
+
+    carga = medir(links_mod.carregar_links_existentes, segundos=1.0, minimo=3)
+    existentes = links_mod.carregar_links_existentes()
+
+    def uma_pagina():
+        # página do discover: 10 links, metade já conhecida
+        pagina = [f"https://ri.conicet.gov.ar/handle/11336/{rnd.randrange(n * 2)}" for _ in range(10)]
+        links_mod.salvar_links_novos(pagina, existentes)
+    paginas = medir(uma_pagina, segundos=1.0)
+    return {
+        "carregar_links_existentes": {"links": n, "media_ms": carga["media_ms"]},
+        "salvar_links_novos": {"pagina_ms": paginas["media_ms"], "paginas_por_segundo": paginas["por_segundo"]},
+    }
+
+
+def caso_escapar(artigos, links_mod, rnd):
+    textos = [_texto(rnd, rnd.randint(1, 200)) for _ in range(1000)]
+    resultados = {}
+    for nome, funcao in (("artigos_data", artigos.escapar_texto), ("artigo_link", links_mod.escapar_texto)):
+        r = medir(lambda: [funcao(t) for t in textos], segundos=0.5)
+        resultados[nome] = {"textos_por_segundo": round(r["por_segundo"] * len(textos), 1),
+                            "lote_1000_ms": r["media_ms"]}
+    return {"escapar_texto": resultados}
+
+
+class _RespostaFixture:
+    status_code = 200
+    headers = {}
+
+    def __init__(self, conteudo):
+        self.content = conteudo
+
+    def raise_for_status(self):
+        pass
+
+
+class _SessaoFixture:
+    """Responde qualquer GET com a página salva (o benchmark não usa a rede)."""
+
+    def __init__(self, conteudo):
+        self.conteudo = conteudo
+
+    def get(self, url, **kwargs):
+        return _RespostaFixture(self.conteudo)
+
+
+def caso_listagem(autores):
+    pagina = ler_fixture("html", "explorar_autores.html")
+    autores.SESSAO = _SessaoFixture(pagina)
+    autores.CACHE = None
+    encontrados = autores.obter_links_pagina(0)
+    r = medir(lambda: autores.obter_links_pagina(0), segundos=1.0)
+    return {"obter_links_pagina": {"autores_na_pagina": len(encontrados), "pagina_ms": r["media_ms"],
+                                   "paginas_por_segundo": r["por_segundo"]}}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--escala", type=float, default=1.0,
+                        help="fração do volume de produção (1.0 = 313k processados / 300k links)")
+    parser.add_argument("--casos", type=str, default=",".join(CASOS), help=f"subconjunto de {','.join(CASOS)}")
+    parser.add_argument("--saida", type=str, default=None, help="grava o JSON também neste arquivo")
+    parser.add_argument("--semente", type=int, default=42)
+    parser.add_argument("--manter", action="store_true", help="não apagar os arquivos gerados")
+    args = parser.parse_args()
+    saida = os.path.abspath(args.saida) if args.saida else None
+    casos = [c.strip() for c in args.casos.split(",") if c.strip()]
+
+    (artigos, links_mod, autores), tmp = importar_scripts(
+        "artigos_data_scraper", "artigo_link_scraper", "authors_data_scraper"
+    )
+    rnd = random.Random(args.semente)
+    resultados = {"meta": dict(metadados(), escala=args.escala)}
+    if "parquet" in casos:
+        resultados.update(caso_parquet(artigos, autores, tmp, args.escala, rnd))
+    if "estado" in casos:
+        resultados.update(caso_estado(autores, tmp, args.escala, rnd))
+    if "links" in casos:
+        resultados.update(caso_links(links_mod, tmp, args.escala, rnd))
+    if "escapar" in casos:
+        resultados.update(caso_escapar(artigos, links_mod, rnd))
+    if "listagem" in casos:
+        resultados.update(caso_listagem(autores))
+    emitir(resultados, saida)
+    os.chdir(os.path.dirname(tmp))
+    if args.manter:
+        print(f"Arquivos em {tmp}", file=sys.stderr)
+    else:
+        shutil.rmtree(tmp, ignore_errors=True)
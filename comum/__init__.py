@@ -0,0 +1,7 @@
+"""
+comum
+Módulos compartilhados pelos scrapers (artigos_links, artigos_data, autors_unificado).
+
+Os scripts continuam sendo executados diretamente (python ./<pasta>/<script>.py);
+cada um adiciona a raiz do repositório ao sys.path para importar daqui.
+"""
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+bitmap.py
+Bitmap persistente de inteiros (ex.: páginas concluídas do discover).
+
+Permite checkpoint fora de ordem: com várias páginas em voo ao mesmo tempo,
+"página N concluída" não implica que 1..N-1 estejam prontas.
+"""
+
+import os
+
+
+class Bitmap:
+    def __init__(self, caminho, tamanho=0):
+        self.caminho = caminho
+        self._bits = bytearray((tamanho + 7) // 8)
+        if os.path.exists(caminho):
+            with open(caminho, "rb") as f:
+                dados = f.read()
+            if len(dados) > len(self._bits):
+                self._bits = bytearray(dados)
+            else:
+                self._bits[:len(dados)] = dados
+
+    def _garantir(self, n):
+        falta = n // 8 + 1 - len(self._bits)
+        if falta > 0:
+            self._bits.extend(b"\x00" * falta)
+
+    def __contains__(self, n):
+        byte = n // 8
+        return byte < len(self._bits) and bool(self._bits[byte] & (1 << (n % 8)))
+
+    def marcar(self, n):
+        self._garantir(n)
+        self._bits[n // 8] |= 1 << (n % 8)
+
+    def marcar_intervalo(self, inicio, fim):
+        """Marca inicio..fim (inclusive)."""
+        for n in range(inicio, fim + 1):
+            self.marcar(n)
+
+    def contar(self):
+        return sum(bin(b).count("1") for b in self._bits)
+
+    def pendentes(self, inicio, fim):
+        return [n for n in range(inicio, fim + 1) if n not in self]
+
+    def primeiro_pendente(self, inicio=0):
+        n = inicio
+        while n in self:
+            n += 1
+        return n
+
+    def salvar(self):
+        tmp = self.caminho + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(self._bits)
+        os.replace(tmp, self.caminho)
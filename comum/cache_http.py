@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+cache_http.py
+Cache de respostas HTTP em disco, compartilhado pelos três scrapers.
+
+  - corpo comprimido (zlib) e endereçado pelo conteúdo: objetos/ab/<sha256>.z
+    (duas URLs com o mesmo HTML ocupam um arquivo só);
+  - índice SQLite (WAL) url -> sha256, ETag, Last-Modified, data da busca;
+  - validade por classe de URL (discover, item, autor, ...): dentro do TTL o
+    corpo sai do disco sem tocar a rede; vencido, a requisição vai com
+    If-None-Match/If-Modified-Since e um 304 só renova a data.
+"""
+
+import os
+import re
+import time
+import zlib
+import sqlite3
+import hashlib
+import threading
+
+from comum.ritmo import requisicao
+
+CACHE_DIR = "cache_http"
+
+# Segundos de validade por classe de URL (--cache-ttl classe=segundos)
+TTL_PADRAO = {
+    "discover": 6 * 3600,           # listagem muda a cada item novo
+    "listagem_autores": 24 * 3600,
+    "autor": 7 * 24 * 3600,
+    "artigo": 30 * 24 * 3600,       # página do item quase nunca muda
+    "mets": 30 * 24 * 3600,
+    "outro": 24 * 3600,
+}
+
+_CLASSES = [
+    ("mets", re.compile(r"/metadata/handle/.*mets\.xml")),
+    ("discover", re.compile(r"/discover\b")),
+    ("listagem_autores", re.compile(r"explorar-autores")),
+    ("autor", re.compile(r"(/author/|filtertype=author)", re.I)),
+    ("artigo", re.compile(r"/handle/\d+/\d+")),
+]
+
+
+def classe_url(url):
+    for classe, padrao in _CLASSES:
+        if padrao.search(url):
+            return classe
+    return "outro"
+
+
+def interpretar_ttls(especificacoes):
+    """["discover=3600", "artigo=0"] -> {"discover": 3600, "artigo": 0}"""
+    ttls = {}
+    for esp in especificacoes or []:
+        classe, _, segundos = esp.partition("=")
+        if classe not in TTL_PADRAO or not segundos.isdigit():
+            raise ValueError(f"TTL inválido: {esp} (use classe=segundos; classes: {', '.join(TTL_PADRAO)})")
+        ttls[classe] = int(segundos)
+    return ttls
+
+
+class CacheHTTP:
+    def __init__(self, diretorio=CACHE_DIR, ttls=None):
+        self.diretorio = diretorio
+        self.ttls = dict(TTL_PADRAO, **(ttls or {}))
+        self.acertos = 0
+        self.revalidados = 0
+        self.baixados = 0
+        os.makedirs(os.path.join(diretorio, "objetos"), exist_ok=True)
+        self.conn = sqlite3.connect(os.path.join(diretorio, "indice.sqlite"), timeout=60,
+                                    check_same_thread=False)
+        self._lock = threading.Lock()
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS respostas (
+                url           TEXT PRIMARY KEY,
+                sha256        TEXT NOT NULL,
+                etag          TEXT,
+                last_modified TEXT,
+                buscado       REAL NOT NULL
+            ) WITHOUT ROWID;
+        """)
+        self.conn.commit()
+
+    def _caminho(self, sha):
+        return os.path.join(self.diretorio, "objetos", sha[:2], sha + ".z")
+
+    def _registro(self, url):
+        with self._lock:
+            return self.conn.execute(
+                "SELECT sha256, etag, last_modified, buscado FROM respostas WHERE url = ?", (url,)
+            ).fetchone()
+
+    def _ler_objeto(self, sha):
+        try:
+            with open(self._caminho(sha), "rb") as f:
+                return zlib.decompress(f.read())
+        except (OSError, zlib.error):
+            return None
+
+    # ---------- consulta ----------
+    def consultar(self, url):
+        """
+        Retorna (conteudo, fresco, cabecalhos_condicionais).
+        conteudo None = nada em cache; fresco True = pode usar sem ir à rede.
+        """
+        reg = self._registro(url)
+        if reg is None:
+            return None, False, {}
+        sha, etag, last_modified, buscado = reg
+        conteudo = self._ler_objeto(sha)
+        if conteudo is None:
+            return None, False, {}
+        fresco = time.time() - buscado < self.ttls.get(classe_url(url), self.ttls["outro"])
+        cabecalhos = {}
+        if etag:
+            cabecalhos["If-None-Match"] = etag
+        if last_modified:
+            cabecalhos["If-Modified-Since"] = last_modified
+        return conteudo, fresco, cabecalhos
+
+    # ---------- atualização ----------
+    def guardar(self, url, conteudo, etag=None, last_modified=None):
+        sha = hashlib.sha256(conteudo).hexdigest()
+        caminho = self._caminho(sha)
+        if not os.path.exists(caminho):
+            os.makedirs(os.path.dirname(caminho), exist_ok=True)
+            tmp = f"{caminho}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp, "wb") as f:
+                f.write(zlib.compress(conteudo, 6))
+            os.replace(tmp, caminho)
+        with self._lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO respostas (url, sha256, etag, last_modified, buscado) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (url, sha, etag, last_modified, time.time()),
+            )
+            self.conn.commit()
+
+    def renovar(self, url):
+        """Resposta 304: o corpo guardado continua valendo."""
+        with self._lock:
+            self.conn.execute("UPDATE respostas SET buscado = ? WHERE url = ?", (time.time(), url))
+            self.conn.commit()
+
+    def invalidar(self, url):
+        """Ex.: página de erro/proxy que veio com 200; a próxima busca vai à rede."""
+        with self._lock:
+            self.conn.execute("DELETE FROM respostas WHERE url = ?", (url,))
+            self.conn.commit()
+
+    def registrar_resposta(self, url, status, conteudo, cabecalhos, anterior=None):
+        """
+        Aplica o resultado de uma requisição (condicional ou não) e devolve o corpo
+        a usar: o guardado em caso de 304, o novo em caso de 200.
+        """
+        if status == 304 and anterior is not None:
+            self.renovar(url)
+            self.revalidados += 1
+            return anterior
+        self.guardar(url, conteudo, cabecalhos.get("ETag"), cabecalhos.get("Last-Modified"))
+        self.baixados += 1
+        return conteudo
+
+    def resumo(self):
+        return {"acertos": self.acertos, "revalidados": self.revalidados, "baixados": self.baixados}
+
+    def fechar(self):
+        with self._lock:
+            self.conn.close()
+
+
+def get_com_cache(sessao, url, cache=None, timeout=30, ritmo=None):
+    """
+    sessao.get com cache: devolve os bytes do corpo. Erros HTTP sobem como
+    requests.HTTPError (raise_for_status), igual à chamada sem cache.
+    ritmo: ControladorRitmo (comum/ritmo.py); acertos de cache não passam por ele.
+    """
+    if cache is None:
+        with requisicao(ritmo, url) as r:
+            resp = sessao.get(url, timeout=timeout)
+            r.resposta(resp.status_code, resp.headers)
+            resp.raise_for_status()
+        return resp.content
+    anterior, fresco, condicionais = cache.consultar(url)
+    if fresco:
+        cache.acertos += 1
+        return anterior
+    with requisicao(ritmo, url) as r:
+        resp = sessao.get(url, headers=condicionais, timeout=timeout)
+        r.resposta(resp.status_code, resp.headers)
+        if resp.status_code != 304:
+            resp.raise_for_status()
+    return cache.registrar_resposta(url, resp.status_code, resp.content, resp.headers, anterior)
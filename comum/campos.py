@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+campos.py
+Especificação declarativa dos campos extraídos das páginas.
+
+Cada Campo diz de onde vem o valor (XPath ou seletor CSS), qual atributo ler
+("text" = texto visível), se é multivalorado e como juntar os valores. A
+Especificacao compila os seletores uma vez em lxml.etree.XPath e serve aos
+dois motores:
+  - lxml (HTML baixado via HTTP): extrair(doc, url);
+  - navegador: lista de (nome, xpath, attr, multi) para
+    comum/extracao_navegador.extrair_campos_navegador.
+
+CSS precisa do pacote cssselect (opcional); os campos atuais usam só XPath.
+"""
+
+from collections import namedtuple
+
+from lxml import etree
+
+from comum.extracao_http import valor_elemento
+
+try:
+    from cssselect import GenericTranslator
+    HAS_CSSSELECT = True
+except Exception:
+    HAS_CSSSELECT = False
+
+
+Campo = namedtuple("Campo", ["nome", "xpath", "attr", "multi", "juntar", "css"])
+Campo.__new__.__defaults__ = (None, "text", False, "; ", None)
+
+
+def _xpath_do_campo(campo):
+    if campo.css:
+        if not HAS_CSSSELECT:
+            raise RuntimeError(f"Campo {campo.nome} usa CSS; instale cssselect (pip install cssselect)")
+        return GenericTranslator().css_to_xpath(campo.css)
+    if not campo.xpath:
+        raise ValueError(f"Campo {campo.nome} sem xpath nem css")
+    return campo.xpath
+
+
+class Especificacao:
+    """
+    Uso:
+        CAMPOS = Especificacao([
+            Campo("Titulo", "//h1"),
+            Campo("Autores", '//div[@class="autores"]//a', multi=True),
+            Campo("URI", '//a[@class="uri"]', attr="href"),
+        ])
+        dados = CAMPOS.extrair(parse_html(conteudo), url, tratar=escapar_texto)
+    """
+
+    def __init__(self, campos):
+        self.campos = [c if isinstance(c, Campo) else Campo(*c) for c in campos]
+        self.xpaths = [_xpath_do_campo(c) for c in self.campos]
+        self._compilados = [etree.XPath(x) for x in self.xpaths]
+
+    def __iter__(self):
+        return iter(self.campos)
+
+    def __len__(self):
+        return len(self.campos)
+
+    @property
+    def nomes(self):
+        return [c.nome for c in self.campos]
+
+    def para_navegador(self):
+        """[(nome, xpath, attr, multi)] com o CSS já traduzido para XPath."""
+        return [(c.nome, x, c.attr, c.multi) for c, x in zip(self.campos, self.xpaths)]
+
+    def extrair(self, doc, url=None, tratar=None):
+        """
+        Mesmo contrato do safe_xpath do Selenium: string vazia quando não
+        encontra, valores múltiplos unidos por campo.juntar.
+        """
+        tratar = tratar or (lambda t: t)
+        dados = {}
+        for campo, xpath in zip(self.campos, self._compilados):
+            try:
+                elems = xpath(doc)
+            except etree.XPathError:
+                dados[campo.nome] = ""
+                continue
+            if campo.multi:
+                dados[campo.nome] = campo.juntar.join(tratar(valor_elemento(e, campo.attr, url)) for e in elems)
+            elif elems:
+                dados[campo.nome] = tratar(valor_elemento(elems[0], campo.attr, url))
+            else:
+                dados[campo.nome] = ""
+        return dados
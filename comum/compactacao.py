@@ -0,0 +1,278 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+compactacao.py
+Compactação e deduplicação dos datasets de saída.
+
+Reinícios depois de queda, novas tentativas e execuções sobrepostas deixam
+linhas repetidas e muitas partes pequenas. compactar():
+  1. lê só a coluna-chave de cada parte, em record batches, numerando as
+     linhas na ordem de gravação (ordem_gravacao: hora do flush no nome da parte);
+     fica a última ocorrência de cada chave;
+  2. relê as partes em batches, descarta as versões antigas, distribui as
+     linhas nas partições hive do dataset (PARTICOES; os escritores gravam
+     partes planas) e grava arquivos novos ordenados pela chave num
+     diretório ao lado, descarregando a cada `linhas_por_arquivo` linhas;
+  3. troca o diretório antigo pelo novo.
+
+Memória: a chave + um inteiro por linha na passada 1 (depois só um byte por
+linha) e no máximo `linhas_por_arquivo` linhas na passada 2. Não rode com
+um scraper gravando no mesmo dataset.
+
+    python -m comum.compactacao compact artigos
+    python -m comum.compactacao compact autores --simular
+    python -m comum.compactacao compact caminho/dataset.parquet --chave url
+"""
+
+import os
+import re
+import csv
+import sys
+import json
+import shutil
+import argparse
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from comum.parquet_incremental import (listar_partes, schema_unificado, ordem_gravacao, diretorio_particao,
+                                       _migrar_arquivo_legado)
+
+# nome: (dataset, chave, csv legado ou None); cada script grava na própria pasta
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATASETS = {
+    "artigos": (os.path.join(RAIZ, "artigos_data", "arq_articulos_authors", "articulos.parquet"), "url", None),
+    "links": (os.path.join(RAIZ, "artigos_links", "saida_arq_articulo_link", "dados_completos_articulos_link.parquet"),
+              "link", None),
+    "autores": (os.path.join(RAIZ, "autors_unificado", "saida_conicet_autores", "autores_completo.parquet"),
+                "Referencia", os.path.join(RAIZ, "autors_unificado", "saida_conicet_autores", "autores_completo.csv")),
+}
+RE_ANO = re.compile(r"\b(1[5-9]\d{2}|20\d{2})\b")
+
+
+def ano_publicacao(linha):
+    m = RE_ANO.search(linha.get("Data de Publicacao") or "")
+    return int(m.group(1)) if m else None
+
+
+# partições hive de cada dataset: {nome: funcao(linha)}, na ordem dos diretórios
+PARTICOES = {
+    "artigos": {"ano": ano_publicacao, "tipo": lambda linha: linha.get("Tipo de Recurso")},
+    "autores": {"conicet": lambda linha: "true" if linha.get("Conicet") else "false"},
+}
+LINHAS_POR_ARQUIVO = 250000
+LINHAS_POR_BATCH = 64 * 1024
+LINHAS_POR_GRUPO = 64 * 1024
+COMPRESSAO = "zstd"
+NIVEL_COMPRESSAO = 6
+SUFIXO_NOVO = ".compactando"
+SUFIXO_ANTIGO = ".antigo"
+
+
+def _batches(parte, schema, colunas=None):
+    return ds.dataset([parte], format="parquet", schema=schema).to_batches(
+        columns=colunas, batch_size=LINHAS_POR_BATCH)
+
+
+def _colunas_dicionario(parte):
+    """Colunas que a parte mais recente gravou com dicionário (mantém o layout do escritor)."""
+    meta = pq.ParquetFile(parte).metadata
+    if not meta.num_row_groups:
+        return True
+    grupo = meta.row_group(0)
+    return [grupo.column(i).path_in_schema.split(".")[0] for i in range(grupo.num_columns)
+            if any("DICTIONARY" in e for e in grupo.column(i).encodings)]
+
+
+def recuperar(destino):
+    """Desfaz uma compactação interrompida no meio da troca de diretórios."""
+    if os.path.isdir(destino + SUFIXO_NOVO):
+        shutil.rmtree(destino + SUFIXO_NOVO)
+    if not os.path.exists(destino) and os.path.isdir(destino + SUFIXO_ANTIGO):
+        os.replace(destino + SUFIXO_ANTIGO, destino)
+    elif os.path.isdir(destino + SUFIXO_ANTIGO):
+        shutil.rmtree(destino + SUFIXO_ANTIGO)
+
+
+def _tamanho(caminhos):
+    return sum(os.path.getsize(c) for c in caminhos)
+
+
+def compactar(destino, chave, particoes=None, linhas_por_arquivo=LINHAS_POR_ARQUIVO, compressao=COMPRESSAO,
+              nivel_compressao=NIVEL_COMPRESSAO, simular=False):
+    """
+    Deduplica `destino` por `chave` (fica a última versão). Com `particoes`
+    ({nome: funcao(linha)}) as linhas vão para as partições hive; sem, cada
+    linha fica no diretório em que já estava. Retorna o relatório;
+    FileNotFoundError se `destino` não existe.
+    """
+    recuperar(destino)
+    if not os.path.exists(destino):
+        raise FileNotFoundError(f"dataset não encontrado: {destino}")
+    if not simular:
+        _migrar_arquivo_legado(destino)  # .parquet monolítico antigo vira diretório
+    partes = sorted(listar_partes(destino), key=ordem_gravacao)
+    relatorio = {"dataset": destino, "chave": chave, "partes_antes": len(partes),
+                 "bytes_antes": _tamanho(partes), "linhas_lidas": 0}
+    if not partes:
+        return relatorio
+    schema = schema_unificado(partes)
+    if schema.get_field_index(chave) < 0:
+        raise ValueError(f"{destino} não tem a coluna {chave}")
+
+    # ---------- passada 1: última ocorrência de cada chave ----------
+    inicio = {}
+    lotes = []
+    seq = 0
+    for parte in partes:
+        inicio[parte] = seq
+        for batch in _batches(parte, schema, [chave]):
+            n = batch.num_rows
+            lotes.append(pa.table({"chave": batch.column(0),
+                                   "seq": pa.array(np.arange(seq, seq + n, dtype=np.int64))}))
+            seq += n
+    relatorio["linhas_lidas"] = seq
+    chaves = pa.concat_tables(lotes)
+    del lotes
+    nulas = pc.is_null(chaves["chave"])
+    com_chave = chaves.filter(pc.invert(nulas))
+    ultimas = com_chave.group_by("chave").aggregate([("seq", "max")])["seq_max"]
+    # máscara por número de linha: fica a última versão de cada chave e toda linha sem chave
+    manter = np.zeros(seq, dtype=bool)
+    manter[ultimas.to_numpy()] = True
+    manter[chaves.filter(nulas)["seq"].to_numpy()] = True
+    sem_chave = chaves.num_rows - com_chave.num_rows
+    del chaves, com_chave, ultimas
+    relatorio["linhas_unicas"] = int(manter.sum())
+    relatorio["linhas_sem_chave"] = sem_chave
+    relatorio["duplicadas"] = seq - relatorio["linhas_unicas"]
+    relatorio["taxa_duplicadas"] = round(relatorio["duplicadas"] / seq, 4) if seq else 0.0
+    if simular:
+        return relatorio
+
+    # ---------- passada 2: reescreve por diretório de partição ----------
+    novo = destino + SUFIXO_NOVO
+    dicionario = _colunas_dicionario(partes[-1])
+    escritos = []
+    por_diretorio = {}   # diretório relativo -> batches ainda não gravados
+
+    def gravar(acumulado, relativo):
+        tabela = pa.Table.from_batches(acumulado, schema=schema).sort_by([(chave, "ascending")])
+        diretorio = os.path.normpath(os.path.join(novo, relativo))
+        os.makedirs(diretorio, exist_ok=True)
+        caminho = os.path.join(diretorio, f"part-00000000-compactado-{len(escritos):06d}.parquet")
+        pq.write_table(tabela, caminho, row_group_size=LINHAS_POR_GRUPO, compression=compressao,
+                       compression_level=nivel_compressao, use_dictionary=dicionario, write_statistics=True)
+        escritos.append(caminho)
+
+    def descarregar():
+        for relativo, acumulado in sorted(por_diretorio.items()):
+            gravar(acumulado, relativo)
+        por_diretorio.clear()
+
+    linhas = 0
+    for parte in partes:
+        seq = inicio[parte]
+        atual = os.path.relpath(os.path.dirname(parte), destino)
+        for batch in _batches(parte, schema):
+            n = batch.num_rows
+            batch = batch.filter(pa.array(manter[seq:seq + n]))
+            seq += n
+            if not batch.num_rows:
+                continue
+            if particoes:
+                grupos = {}
+                for i, linha in enumerate(batch.to_pylist()):
+                    grupos.setdefault(diretorio_particao(linha, particoes), []).append(i)
+                for relativo, indices in grupos.items():
+                    por_diretorio.setdefault(relativo, []).append(batch.take(pa.array(indices)))
+            else:
+                por_diretorio.setdefault(atual, []).append(batch)
+            linhas += batch.num_rows
+            if linhas >= linhas_por_arquivo:
+                descarregar()
+                linhas = 0
+    descarregar()
+
+    for caminho in escritos:
+        with open(caminho, "rb") as f:
+            os.fsync(f.fileno())
+    # troca: destino -> .antigo, .compactando -> destino (recuperar() desfaz se cair no meio)
+    os.replace(destino, destino + SUFIXO_ANTIGO)
+    os.replace(novo, destino)
+    shutil.rmtree(destino + SUFIXO_ANTIGO)
+
+    escritos = listar_partes(destino)
+    relatorio["linhas_escritas"] = sum(pq.ParquetFile(p).metadata.num_rows for p in escritos)
+    relatorio["arquivos_depois"] = len(escritos)
+    relatorio["bytes_depois"] = _tamanho(escritos)
+    relatorio["bytes_economizados"] = relatorio["bytes_antes"] - relatorio["bytes_depois"]
+    return relatorio
+
+
+def compactar_csv(caminho, chave, simular=False):
+    """Mesma regra para o CSV legado: fica a última linha de cada chave, na ordem original."""
+    relatorio = {"dataset": caminho, "chave": chave, "bytes_antes": os.path.getsize(caminho)}
+    ultima = {}
+    with open(caminho, newline="", encoding="utf-8") as f:
+        for i, linha in enumerate(csv.DictReader(f)):
+            ultima[linha.get(chave) or f"\0{i}"] = i
+    lidas = i + 1 if ultima else 0
+    manter = set(ultima.values())
+    relatorio.update({"linhas_lidas": lidas, "linhas_unicas": len(manter), "duplicadas": lidas - len(manter),
+                      "taxa_duplicadas": round((lidas - len(manter)) / lidas, 4) if lidas else 0.0})
+    if simular:
+        return relatorio
+    tmp = caminho + ".tmp"
+    with open(caminho, newline="", encoding="utf-8") as f, open(tmp, "w", newline="", encoding="utf-8") as saida:
+        leitor = csv.DictReader(f)
+        escritor = csv.DictWriter(saida, fieldnames=leitor.fieldnames)
+        escritor.writeheader()
+        for i, linha in enumerate(leitor):
+            if i in manter:
+                escritor.writerow(linha)
+        saida.flush()
+        os.fsync(saida.fileno())
+    os.replace(tmp, caminho)
+    relatorio["linhas_escritas"] = len(manter)
+    relatorio["bytes_depois"] = os.path.getsize(caminho)
+    relatorio["bytes_economizados"] = relatorio["bytes_antes"] - relatorio["bytes_depois"]
+    return relatorio
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compacta e deduplica datasets de saída")
+    parser.add_argument("comando", choices=["compact"])
+    parser.add_argument("dataset", help=f"{', '.join(DATASETS)} ou caminho do dataset Parquet")
+    parser.add_argument("--chave", type=str, default=None, help="coluna de deduplicação (obrigatória com caminho)")
+    parser.add_argument("--csv", type=str, default=None, help="CSV a deduplicar junto (autores: o padrão)")
+    parser.add_argument("--linhas-por-arquivo", type=int, default=LINHAS_POR_ARQUIVO)
+    parser.add_argument("--compression", type=str, default=COMPRESSAO, choices=["zstd", "snappy", "gzip", "none"])
+    parser.add_argument("--compression-level", type=int, default=NIVEL_COMPRESSAO)
+    parser.add_argument("--simular", action="store_true", help="só conta duplicatas, sem reescrever")
+    args = parser.parse_args()
+
+    if args.dataset in DATASETS:
+        destino, chave, caminho_csv = DATASETS[args.dataset]
+    else:
+        destino, chave, caminho_csv = args.dataset, None, None
+    chave = args.chave or chave
+    caminho_csv = args.csv or caminho_csv
+    if not chave:
+        parser.error("--chave é obrigatória quando o dataset é um caminho")
+
+    try:
+        relatorios = [compactar(destino, chave, particoes=PARTICOES.get(args.dataset),
+                                linhas_por_arquivo=args.linhas_por_arquivo,
+                                compressao=args.compression,
+                                nivel_compressao=args.compression_level if args.compression in ("zstd", "gzip") else None,
+                                simular=args.simular)]
+    except FileNotFoundError as e:
+        parser.error(str(e))
+    if caminho_csv and os.path.exists(caminho_csv):
+        relatorios.append(compactar_csv(caminho_csv, chave, simular=args.simular))
+    json.dump(relatorios, sys.stdout, indent=2, ensure_ascii=False)
+    sys.stdout.write("\n")
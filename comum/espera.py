@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+espera.py
+Esperas explícitas por tipo de página no lugar de time.sleep fixo.
+
+Cada tipo de página tem uma condição de "pronta" (ex.: ds-artifact-item no
+discover, h1 do título no item). Os tempos observados alimentam uma janela
+deslizante e o timeout passa a ser o p99 dessa distribuição vezes uma margem,
+limitado entre TIMEOUT_MIN e TIMEOUT_MAX. Páginas prontas retornam na hora;
+páginas lentas ganham mais tempo do que o sleep fixo dava. Timeouts são
+contados à parte e não entram na janela: como amostra igual ao limite, cada
+um subia o p99 e o limite seguinte (x MARGEM) até TIMEOUT_MAX.
+"""
+
+import os
+import json
+import time
+import threading
+from collections import deque
+
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import TimeoutException
+
+TIMEOUT_INICIAL = 10
+TIMEOUT_MIN = 2
+TIMEOUT_MAX = 30
+MARGEM = 1.5
+PERCENTIL = 0.99
+JANELA = 500
+AMOSTRAS_MINIMAS = 20
+POLL = 0.1
+
+# Rodapé do tema Mirage do DSpace: só aparece com a página inteira renderizada
+_RODAPE = (By.XPATH, '//*[@id="ds-footer-wrapper" or @id="ds-footer"]')
+# h1 do título do item (o mesmo de Titulo em artigos_data); um //h1 qualquer
+# casava com o cabeçalho do tema antes do conteúdo do item
+_TITULO_ITEM = '//h1[contains(@style,"font-size:150%")]'
+
+CONDICOES = {
+    "discover": EC.any_of(
+        EC.presence_of_element_located((By.CLASS_NAME, "ds-artifact-item")),
+        EC.presence_of_element_located(_RODAPE),
+    ),
+    "artigo": EC.any_of(
+        EC.presence_of_element_located((By.XPATH, '//div[contains(@class,"simple-item-view-authors")] | '
+                                                  + _TITULO_ITEM)),
+        EC.presence_of_element_located(_RODAPE),
+    ),
+    "autor": EC.any_of(
+        EC.presence_of_element_located((By.XPATH, "//td/following-sibling::td")),
+        EC.presence_of_element_located((By.XPATH, "//a[contains(@href, '/handle/11336/')]")),
+        EC.presence_of_element_located(_RODAPE),
+    ),
+}
+
+
+def percentil(valores, p):
+    if not valores:
+        return None
+    ordenados = sorted(valores)
+    k = min(len(ordenados) - 1, max(0, int(round(p * (len(ordenados) - 1)))))
+    return ordenados[k]
+
+
+class EsperaAdaptativa:
+    """
+    Uso:
+        espera = EsperaAdaptativa("saida/tempos_prontidao.json")
+        driver.get(url)
+        espera.aguardar(driver, "artigo")
+    """
+
+    def __init__(self, caminho=None, timeout_inicial=TIMEOUT_INICIAL,
+                 timeout_min=TIMEOUT_MIN, timeout_max=TIMEOUT_MAX,
+                 margem=MARGEM, percentil=PERCENTIL, janela=JANELA):
+        self.caminho = caminho
+        self.timeout_inicial = timeout_inicial
+        self.timeout_min = timeout_min
+        self.timeout_max = timeout_max
+        self.margem = margem
+        self.p = percentil
+        self.janela = janela
+        self._amostras = {}
+        self._timeouts = {}
+        self._lock = threading.Lock()
+        self._carregar()
+
+    def _carregar(self):
+        if not self.caminho or not os.path.exists(self.caminho):
+            return
+        try:
+            with open(self.caminho, "r", encoding="utf-8") as f:
+                dados = json.load(f)
+            for tipo, valores in dados.get("amostras", {}).items():
+                self._amostras[tipo] = deque(valores[-self.janela:], maxlen=self.janela)
+            self._timeouts.update(dados.get("timeouts", {}))
+        except Exception:
+            pass
+
+    def salvar(self):
+        if not self.caminho:
+            return
+        with self._lock:
+            dados = {"amostras": {t: list(v) for t, v in self._amostras.items()},
+                     "timeouts": dict(self._timeouts), "resumo": self._resumo()}
+        os.makedirs(os.path.dirname(self.caminho) or ".", exist_ok=True)
+        tmp = self.caminho + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(dados, f, indent=2)
+        os.replace(tmp, self.caminho)
+
+    def registrar(self, tipo, segundos):
+        with self._lock:
+            self._amostras.setdefault(tipo, deque(maxlen=self.janela)).append(round(segundos, 3))
+
+    def timeout(self, tipo):
+        with self._lock:
+            amostras = list(self._amostras.get(tipo, ()))
+        if len(amostras) < AMOSTRAS_MINIMAS:
+            return self.timeout_inicial
+        return min(self.timeout_max, max(self.timeout_min, percentil(amostras, self.p) * self.margem))
+
+    def aguardar(self, driver, tipo, condicao=None):
+        """
+        Espera a condição do tipo (ou a informada). Retorna True se a página ficou
+        pronta, False se estourou o timeout (quem chama decide se segue assim mesmo).
+        """
+        condicao = condicao or CONDICOES[tipo]
+        limite = self.timeout(tipo)
+        inicio = time.time()
+        try:
+            WebDriverWait(driver, limite, poll_frequency=POLL).until(condicao)
+            self.registrar(tipo, time.time() - inicio)
+            return True
+        except TimeoutException:
+            # fora da janela: o tempo real é desconhecido
+            with self._lock:
+                self._timeouts[tipo] = self._timeouts.get(tipo, 0) + 1
+            return False
+
+    def _resumo(self):
+        resumo = {}
+        for tipo in set(self._amostras) | set(self._timeouts):
+            valores = list(self._amostras.get(tipo, ()))
+            resumo[tipo] = {
+                "amostras": len(valores),
+                "p50": percentil(valores, 0.5),
+                "p99": percentil(valores, 0.99),
+                "timeouts": self._timeouts.get(tipo, 0),
+            }
+        return resumo
+
+    def resumo(self):
+        with self._lock:
+            resumo = self._resumo()
+        for tipo, r in resumo.items():
+            r["timeout_atual"] = round(self.timeout(tipo), 2)
+        return resumo
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+estado.py
+Estado de coleta (itens já processados + valores soltos como ultimo_offset).
+
+Duas implementações com a mesma interface:
+  - EstadoSQLite: SQLite em modo WAL, inserção O(1) por item e busca indexada;
+    não precisa carregar nada em memória.
+  - EstadoJSON: formato antigo (um dict serializado inteiro a cada salvar()).
+
+abrir_estado() escolhe o backend e, na primeira vez com SQLite, migra o
+estado.json existente.
+"""
+
+import os
+import json
+import sqlite3
+
+
+class EstadoSQLite:
+    def __init__(self, caminho):
+        self.caminho = caminho
+        os.makedirs(os.path.dirname(caminho) or ".", exist_ok=True)
+        self.conn = sqlite3.connect(caminho, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS processados (
+                chave TEXT PRIMARY KEY,
+                ts    TEXT DEFAULT CURRENT_TIMESTAMP
+            ) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS meta (
+                chave TEXT PRIMARY KEY,
+                valor TEXT
+            );
+        """)
+        self.conn.commit()
+
+    def __contains__(self, chave):
+        return self.ja_processado(chave)
+
+    def __len__(self):
+        return self.conn.execute("SELECT COUNT(*) FROM processados").fetchone()[0]
+
+    def ja_processado(self, chave):
+        return self.conn.execute(
+            "SELECT 1 FROM processados WHERE chave = ?", (chave,)
+        ).fetchone() is not None
+
+    def marcar_processado(self, chave):
+        self.conn.execute("INSERT OR IGNORE INTO processados (chave) VALUES (?)", (chave,))
+
+    def marcar_varios(self, chaves):
+        self.conn.executemany(
+            "INSERT OR IGNORE INTO processados (chave) VALUES (?)", ((c,) for c in chaves)
+        )
+
+    def chaves(self):
+        """Itera os processados (ex.: para juntar estados de vários shards)."""
+        for (chave,) in self.conn.execute("SELECT chave FROM processados"):
+            yield chave
+
+    def obter(self, chave, padrao=None):
+        row = self.conn.execute("SELECT valor FROM meta WHERE chave = ?", (chave,)).fetchone()
+        return json.loads(row[0]) if row else padrao
+
+    def definir(self, chave, valor):
+        self.conn.execute(
+            "INSERT INTO meta (chave, valor) VALUES (?, ?) "
+            "ON CONFLICT(chave) DO UPDATE SET valor = excluded.valor",
+            (chave, json.dumps(valor)),
+        )
+
+    def salvar(self):
+        self.conn.commit()
+
+    def fechar(self):
+        try:
+            self.conn.commit()
+            self.conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        finally:
+            self.conn.close()
+
+
+class EstadoJSON:
+    """Formato legado: {"processados": {link: true}, ...} reescrito inteiro em salvar()."""
+
+    def __init__(self, caminho):
+        self.caminho = caminho
+        self.dados = {"processados": {}}
+        if os.path.exists(caminho):
+            with open(caminho, "r", encoding="utf-8") as f:
+                self.dados = json.load(f)
+        self.dados.setdefault("processados", {})
+
+    def __contains__(self, chave):
+        return chave in self.dados["processados"]
+
+    def __len__(self):
+        return len(self.dados["processados"])
+
+    def ja_processado(self, chave):
+        return chave in self.dados["processados"]
+
+    def marcar_processado(self, chave):
+        self.dados["processados"][chave] = True
+
+    def marcar_varios(self, chaves):
+        for c in chaves:
+            self.dados["processados"][c] = True
+
+    def chaves(self):
+        return iter(list(self.dados["processados"]))
+
+    def obter(self, chave, padrao=None):
+        return self.dados.get(chave, padrao)
+
+    def definir(self, chave, valor):
+        self.dados[chave] = valor
+
+    def salvar(self):
+        tmp = self.caminho + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.dados, f, indent=2, ensure_ascii=False)
+        os.replace(tmp, self.caminho)
+
+    def fechar(self):
+        self.salvar()
+
+
+MARCA_MIGRACAO = "_migrado_de_json"
+
+
+def migrar_json_para_sqlite(caminho_json, estado):
+    """
+    Importa estado.json e renomeia o arquivo para .migrado. Os dados e a marca
+    de migração entram no mesmo commit: se cair antes do rename, a próxima
+    abertura só renomeia (sem reimportar por cima do que já avançou).
+    """
+    if estado.obter(MARCA_MIGRACAO):
+        os.replace(caminho_json, caminho_json + ".migrado")
+        return 0
+    with open(caminho_json, "r", encoding="utf-8") as f:
+        dados = json.load(f)
+    estado.marcar_varios(dados.get("processados", {}).keys())
+    for chave, valor in dados.items():
+        if chave != "processados":
+            estado.definir(chave, valor)
+    estado.definir(MARCA_MIGRACAO, True)
+    estado.salvar()
+    os.replace(caminho_json, caminho_json + ".migrado")
+    return len(dados.get("processados", {}))
+
+
+def abrir_estado(backend, caminho_sqlite, caminho_json, log=None):
+    if backend == "json":
+        return EstadoJSON(caminho_json)
+    estado = EstadoSQLite(caminho_sqlite)
+    # decide pelo estado.json (renomeado só no fim da migração), não pela existência
+    # do .sqlite: uma migração interrompida deixa o banco criado e é refeita
+    if os.path.exists(caminho_json):
+        n = migrar_json_para_sqlite(caminho_json, estado)
+        if log:
+            log(f"ESTADO: {n} processados migrados de {caminho_json} para {caminho_sqlite}")
+    return estado
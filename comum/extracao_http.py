@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+extracao_http.py
+Extração sem navegador: baixa o HTML com requests e avalia os mesmos XPaths
+usados no Selenium com lxml.
+
+As páginas do DSpace (XMLUI) do CONICET são renderizadas no servidor, então o
+HTML puro já contém todos os campos; o navegador só é necessário quando algum
+campo obrigatório não aparece (página de erro, proxy, layout diferente).
+"""
+
+from urllib.parse import urljoin
+
+import requests
+from requests.adapters import HTTPAdapter
+from lxml import html as lxml_html
+
+from comum.cache_http import get_com_cache
+
+HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+}
+TIMEOUT = 30
+
+
+def criar_sessao(headers=None, pool=10):
+    """Sessão com keep-alive (reaproveita a conexão TCP/TLS entre itens)."""
+    sessao = requests.Session()
+    sessao.headers.update(headers or HEADERS)
+    adapter = HTTPAdapter(pool_connections=pool, pool_maxsize=pool)
+    sessao.mount("http://", adapter)
+    sessao.mount("https://", adapter)
+    return sessao
+
+
+def baixar_html(sessao, url, timeout=TIMEOUT, cache=None, ritmo=None):
+    """Corpo da página em bytes; com `cache` (CacheHTTP) só vai à rede se vencido."""
+    return get_com_cache(sessao, url, cache=cache, timeout=timeout, ritmo=ritmo)
+
+
+_PARSERS = {}
+
+
+def parse_html(conteudo, url=None, encoding="utf-8"):
+    # Sem encoding explícito o lxml assume latin-1 para bytes sem <meta charset>
+    if isinstance(conteudo, bytes):
+        parser = _PARSERS.get(encoding)
+        if parser is None:
+            parser = _PARSERS[encoding] = lxml_html.HTMLParser(encoding=encoding)
+        return lxml_html.fromstring(conteudo, base_url=url, parser=parser)
+    return lxml_html.fromstring(conteudo, base_url=url)
+
+
+# Tags que o navegador quebra em linhas separadas no .text
+_TAGS_BLOCO = {"div", "p", "br", "li", "tr", "td", "th", "h1", "h2", "h3", "h4", "h5", "h6", "dt", "dd"}
+
+
+def _pedacos_texto(elem):
+    if not isinstance(elem.tag, str) or elem.tag in ("script", "style"):
+        if elem.tail:
+            yield elem.tail
+        return
+    bloco = elem.tag in _TAGS_BLOCO
+    if bloco:
+        yield " "
+    if elem.text:
+        yield elem.text
+    for filho in elem:
+        yield from _pedacos_texto(filho)
+    if bloco:
+        yield " "
+    if elem.tail:
+        yield elem.tail
+
+
+def texto_elemento(elem):
+    """Equivalente aproximado de WebElement.text: texto visível com espaços normalizados."""
+    if isinstance(elem, str):
+        return " ".join(elem.split())
+    partes = [elem.text or ""]
+    for filho in elem:
+        partes.extend(_pedacos_texto(filho))
+    return " ".join("".join(partes).split())
+
+
+def valor_elemento(elem, attr="text", url=None):
+    if attr == "text":
+        return texto_elemento(elem)
+    valor = elem.get(attr) or ""
+    # WebElement.get_attribute("href") devolve a URL absoluta; replica aqui
+    if url and attr in ("href", "src") and valor:
+        valor = urljoin(url, valor)
+    return valor
+
+
+def avaliar_xpath(doc, xpath, attr="text", multi=False, url=None, tratar=None):
+    """
+    Mesmo contrato do safe_xpath do Selenium: string vazia quando não encontra,
+    valores múltiplos unidos por "; ".
+    """
+    tratar = tratar or (lambda t: t)
+    try:
+        elems = doc.xpath(xpath)
+    except Exception:
+        return ""
+    if multi:
+        return "; ".join(tratar(valor_elemento(e, "text", url)) for e in elems)
+    if not elems:
+        return ""
+    return tratar(valor_elemento(elems[0], attr, url))
+
+
+def extrair_campos(doc, campos, url=None, tratar=None):
+    """campos: Especificacao (comum/campos.py, XPaths pré-compilados) ou lista de (nome, xpath, attr, multi)."""
+    if hasattr(campos, "extrair"):
+        return campos.extrair(doc, url=url, tratar=tratar)
+    return {
+        nome: avaliar_xpath(doc, xpath, attr=attr, multi=multi, url=url, tratar=tratar)
+        for nome, xpath, attr, multi in campos
+    }
+
+
+def campos_faltando(dados, obrigatorios):
+    return [c for c in obrigatorios if not dados.get(c)]
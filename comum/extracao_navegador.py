@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+extracao_navegador.py
+Extração de vários campos numa única chamada ao WebDriver.
+
+Cada find_element/.text/get_attribute é um round-trip HTTP até o driver; com
+~18 campos (e um .text por autor/palavra-chave) a página custava dezenas de
+chamadas. Aqui a lista de campos vai inteira para o navegador num
+execute_script, os XPaths são avaliados com document.evaluate e volta um
+dict. Campos que o navegador não conseguiu avaliar voltam como None e são
+refeitos um a um pelo caminho antigo.
+"""
+
+_JS_EXTRAIR = """
+const campos = arguments[0];
+const saida = {};
+const texto = n => (n.nodeType === 1 ? n.innerText : n.textContent) || '';
+const valor = (n, attr) => {
+    if (attr === 'text') return texto(n);
+    if (n.nodeType !== 1) return n.textContent || '';
+    // igual ao get_attribute do Selenium: href/src absolutos (propriedade)
+    if ((attr === 'href' || attr === 'src') && n[attr]) return n[attr];
+    return n.getAttribute(attr) || '';
+};
+for (const [nome, xpath, attr, multi] of campos) {
+    try {
+        const r = document.evaluate(xpath, document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+        if (multi) {
+            const valores = [];
+            for (let i = 0; i < r.snapshotLength; i++) valores.push(valor(r.snapshotItem(i), attr).trim());
+            saida[nome] = valores;
+        } else {
+            saida[nome] = r.snapshotLength ? valor(r.snapshotItem(0), attr).trim() : '';
+        }
+    } catch (e) {
+        saida[nome] = null;
+    }
+}
+return saida;
+"""
+
+
+def _normalizar_espacos(texto):
+    # o .text do Selenium troca &nbsp; por espaço comum; innerText não
+    return texto.replace("\u00a0", " ")
+
+
+def extrair_campos_navegador(driver, campos, tratar=None):
+    """
+    campos: Especificacao (comum/campos.py) ou lista de (nome, xpath, attr, multi).
+    Retorna (dados, falhos): falhos são os nomes que precisam do caminho antigo
+    (todos, se o execute_script falhar).
+    """
+    tratar = tratar or (lambda t: t)
+    juntar = {}
+    if hasattr(campos, "para_navegador"):
+        juntar = {c.nome: c.juntar for c in campos}
+        campos = campos.para_navegador()
+    try:
+        brutos = driver.execute_script(_JS_EXTRAIR, [list(c) for c in campos])
+    except Exception:
+        return {}, [nome for nome, _, _, _ in campos]
+    dados = {}
+    falhos = []
+    for nome, _, _, multi in campos:
+        valor = (brutos or {}).get(nome)
+        if valor is None:
+            falhos.append(nome)
+        elif multi:
+            dados[nome] = juntar.get(nome, "; ").join(tratar(_normalizar_espacos(v)) for v in valor)
+        else:
+            dados[nome] = tratar(_normalizar_espacos(valor))
+    return dados, falhos
@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+fronteira.py
+Fronteira de URLs persistente (SQLite local) compartilhada pelos scrapers.
+
+Cada URL pertence a uma fila ("discover", "artigo", "listagem_autores",
+"autor", ...) e tem status, número de tentativas, último erro e validade do
+arrendamento (lease). Vários processos podem consumir a mesma fila: arrendar()
+marca os itens dentro de uma transação BEGIN IMMEDIATE, então dois workers
+nunca recebem a mesma URL; se um worker morrer, o lease expira e a URL volta
+a ser entregue. A chave é (fila, url): a mesma URL pode estar em filas
+diferentes. concluir/falhar/renovar só valem para quem ainda tem o lease;
+o que voltou a outro worker é devolvido ao chamador.
+"""
+
+import os
+import json
+import time
+import socket
+import sqlite3
+import threading
+import functools
+
+LEASE_SEGUNDOS = 600
+MAX_TENTATIVAS = 5
+
+# Nomes de fila usados pelos três scrapers
+FILA_DISCOVER = "discover"
+FILA_ARTIGOS = "artigo"
+FILA_LISTAGEM_AUTORES = "listagem_autores"
+FILA_AUTORES = "autor"
+
+PENDENTE = "pendente"
+EM_ANDAMENTO = "em_andamento"
+CONCLUIDO = "concluido"
+FALHOU = "falhou"
+
+
+def _sincronizado(metodo):
+    @functools.wraps(metodo)
+    def envolvido(self, *args, **kwargs):
+        with self._lock:
+            return metodo(self, *args, **kwargs)
+    return envolvido
+
+
+def id_worker():
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+_ESQUEMA = """
+    CREATE TABLE IF NOT EXISTS urls (
+        url         TEXT NOT NULL,
+        fila        TEXT NOT NULL,
+        status      TEXT NOT NULL DEFAULT 'pendente',
+        tentativas  INTEGER NOT NULL DEFAULT 0,
+        ultimo_erro TEXT,
+        lease_ate   REAL,
+        worker      TEXT,
+        dados       TEXT,
+        atualizado  REAL,
+        PRIMARY KEY (fila, url)
+    );
+    CREATE INDEX IF NOT EXISTS idx_urls_fila_status ON urls (fila, status, lease_ate);
+"""
+
+_COLUNAS = "url, fila, status, tentativas, ultimo_erro, lease_ate, worker, dados, atualizado"
+
+
+class Fronteira:
+    def __init__(self, caminho, lease_segundos=LEASE_SEGUNDOS, max_tentativas=MAX_TENTATIVAS, worker=None):
+        self.caminho = caminho
+        self.lease_segundos = lease_segundos
+        self.max_tentativas = max_tentativas
+        self.worker = worker or id_worker()
+        os.makedirs(os.path.dirname(caminho) or ".", exist_ok=True)
+        # isolation_level=None: transações explícitas (BEGIN IMMEDIATE no arrendar)
+        self.conn = sqlite3.connect(caminho, timeout=60, isolation_level=None, check_same_thread=False)
+        # Uma conexão pode ser usada por várias threads; as transações não podem se misturar
+        self._lock = threading.RLock()
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self._migrar_chave()
+        self.conn.executescript(_ESQUEMA)
+
+    def _migrar_chave(self):
+        """Fronteiras antigas tinham url como chave única: passa para (fila, url)."""
+        chave = [r[1] for r in sorted(self.conn.execute("PRAGMA table_info(urls)"), key=lambda r: r[5]) if r[5]]
+        if chave != ["url"]:
+            return
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            self.conn.execute("ALTER TABLE urls RENAME TO urls_antiga")
+            self.conn.execute("DROP INDEX IF EXISTS idx_urls_fila_status")
+            # executescript faria COMMIT no meio: um comando por vez
+            for comando in _ESQUEMA.split(";"):
+                if comando.strip():
+                    self.conn.execute(comando)
+            self.conn.execute(f"INSERT INTO urls ({_COLUNAS}) SELECT {_COLUNAS} FROM urls_antiga ORDER BY rowid")
+            self.conn.execute("DROP TABLE urls_antiga")
+            self.conn.execute("COMMIT")
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+
+    def fechar(self):
+        self.conn.close()
+
+    # ---------- produção ----------
+    @_sincronizado
+    def enfileirar(self, fila, urls, dados=None):
+        """
+        Adiciona URLs novas (as já conhecidas são ignoradas, qualquer status).
+        dados: lista paralela de dicts opcionais (ex.: nome do autor).
+        Retorna quantas foram inseridas.
+        """
+        urls = list(urls)
+        if not urls:
+            return 0
+        dados = dados or [None] * len(urls)
+        agora = time.time()
+        linhas = [
+            (u, fila, json.dumps(d, ensure_ascii=False) if d is not None else None, agora)
+            for u, d in zip(urls, dados)
+        ]
+        antes = self.conn.total_changes
+        self.conn.execute("BEGIN")
+        self.conn.executemany(
+            "INSERT OR IGNORE INTO urls (url, fila, dados, atualizado) VALUES (?, ?, ?, ?)", linhas
+        )
+        self.conn.execute("COMMIT")
+        return self.conn.total_changes - antes
+
+    # ---------- consumo ----------
+    @_sincronizado
+    def arrendar(self, fila, n=1, worker=None):
+        """
+        Entrega até n URLs pendentes (ou com lease vencido) com lease novo.
+        Retorna lista de (url, dados).
+        """
+        worker = worker or self.worker
+        agora = time.time()
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            rows = self.conn.execute(
+                """
+                SELECT url, dados FROM urls
+                WHERE fila = ?
+                  AND (status = ? OR (status = ? AND lease_ate < ?))
+                ORDER BY rowid
+                LIMIT ?
+                """,
+                (fila, PENDENTE, EM_ANDAMENTO, agora, n),
+            ).fetchall()
+            self.conn.executemany(
+                """
+                UPDATE urls SET status = ?, tentativas = tentativas + 1,
+                                lease_ate = ?, worker = ?, atualizado = ?
+                WHERE fila = ? AND url = ?
+                """,
+                [(EM_ANDAMENTO, agora + self.lease_segundos, worker, agora, fila, url) for url, _ in rows],
+            )
+            self.conn.execute("COMMIT")
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+        return [(url, json.loads(d) if d else None) for url, d in rows]
+
+    def _com_lease(self, fila, urls, sql, parametros, worker):
+        """
+        Executa `sql` (um UPDATE terminado em "WHERE fila = ? AND url = ?") só
+        nas URLs cujo lease ainda é deste worker. Retorna as que não eram mais.
+        """
+        if isinstance(urls, str):
+            urls = [urls]
+        worker = worker or self.worker
+        perdidas = []
+        self.conn.execute("BEGIN")
+        try:
+            for u in urls:
+                cur = self.conn.execute(sql + " AND status = ? AND worker = ?",
+                                        (*parametros, fila, u, EM_ANDAMENTO, worker))
+                if cur.rowcount == 0:
+                    perdidas.append(u)
+            self.conn.execute("COMMIT")
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+        return perdidas
+
+    @_sincronizado
+    def renovar(self, fila, urls, worker=None):
+        """Estende o lease; retorna as URLs cujo lease já foi perdido."""
+        agora = time.time()
+        return self._com_lease(
+            fila, urls, "UPDATE urls SET lease_ate = ?, atualizado = ? WHERE fila = ? AND url = ?",
+            (agora + self.lease_segundos, agora), worker,
+        )
+
+    @_sincronizado
+    def concluir(self, fila, urls, worker=None):
+        """
+        Marca como concluídas. Retorna as URLs cujo lease venceu e foi entregue
+        a outro worker (ou que já estavam concluídas): essas não são alteradas.
+        """
+        return self._com_lease(
+            fila, urls,
+            "UPDATE urls SET status = ?, lease_ate = NULL, ultimo_erro = NULL, atualizado = ? "
+            "WHERE fila = ? AND url = ?",
+            (CONCLUIDO, time.time()), worker,
+        )
+
+    @_sincronizado
+    def falhar(self, fila, url, erro, worker=None):
+        """
+        Volta para pendente; após max_tentativas fica como 'falhou'.
+        Retorna False se o lease já não era deste worker (nada é alterado).
+        """
+        return not self._com_lease(
+            fila, url,
+            """
+            UPDATE urls SET
+                status = CASE WHEN tentativas >= ? THEN ? ELSE ? END,
+                ultimo_erro = ?, lease_ate = NULL, atualizado = ?
+            WHERE fila = ? AND url = ?""",
+            (self.max_tentativas, FALHOU, PENDENTE, str(erro)[:1000], time.time()), worker,
+        )
+
+    @_sincronizado
+    def reabrir_falhas(self, fila):
+        cur = self.conn.execute(
+            "UPDATE urls SET status = ?, tentativas = 0 WHERE fila = ? AND status = ?",
+            (PENDENTE, fila, FALHOU),
+        )
+        return cur.rowcount
+
+    # ---------- consulta ----------
+    @_sincronizado
+    def contagem(self, fila):
+        rows = self.conn.execute(
+            "SELECT status, COUNT(*) FROM urls WHERE fila = ? GROUP BY status", (fila,)
+        ).fetchall()
+        return dict(rows)
+
+    @_sincronizado
+    def restantes(self, fila):
+        """Pendentes + em andamento (inclui leases de outros workers ainda válidos)."""
+        return self.conn.execute(
+            "SELECT COUNT(*) FROM urls WHERE fila = ? AND status IN (?, ?)",
+            (fila, PENDENTE, EM_ANDAMENTO),
+        ).fetchone()[0]
+
+    @_sincronizado
+    def status(self, fila, url):
+        row = self.conn.execute("SELECT status FROM urls WHERE fila = ? AND url = ?", (fila, url)).fetchone()
+        return row[0] if row else None
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+http_async.py
+Busca concorrente com asyncio + aiohttp, com limite de concorrência e de
+requisições por segundo por host.
+
+As respostas são entregues ao callback na ordem em que chegam; quem chama é
+responsável por registrar o progresso (ver comum/bitmap.py).
+
+Com `ritmo` (ControladorRitmo, comum/ritmo.py) o espaçamento, o limite de
+requisições em voo e a reação a erros ficam com o controlador AIMD, cujo
+orçamento é o da máquina inteira; `concorrencia` vira só o teto local.
+"""
+
+import asyncio
+import random
+from urllib.parse import urlsplit
+
+from comum.ritmo import requisicao, corpo_erro_de_proxy, ErroProxy
+
+try:
+    import aiohttp
+    HAS_AIOHTTP = True
+except Exception:
+    HAS_AIOHTTP = False
+
+HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+}
+CONCORRENCIA = 8
+REQ_POR_SEGUNDO = 2.0
+TENTATIVAS = 5
+TIMEOUT = 30
+
+
+class LimitadorPorHost:
+    """Espaça o início das requisições de cada host em 1/req_por_segundo."""
+
+    def __init__(self, req_por_segundo=REQ_POR_SEGUNDO):
+        self.intervalo = 1.0 / req_por_segundo if req_por_segundo > 0 else 0.0
+        self._proximo = {}
+        self._lock = asyncio.Lock()
+
+    async def aguardar(self, url):
+        if not self.intervalo:
+            return
+        host = urlsplit(url).netloc
+        loop = asyncio.get_running_loop()
+        async with self._lock:
+            agora = loop.time()
+            inicio = max(agora, self._proximo.get(host, 0.0))
+            self._proximo[host] = inicio + self.intervalo
+        if inicio > agora:
+            await asyncio.sleep(inicio - agora)
+
+
+async def _buscar(sessao, limitador, url, tentativas, timeout, cache=None, ritmo=None):
+    anterior, condicionais = None, {}
+    if cache is not None:
+        anterior, fresco, condicionais = cache.consultar(url)
+        if fresco:
+            # acerto de cache: nem passa pelo limitador
+            cache.acertos += 1
+            return anterior
+    ultimo_erro = None
+    for tentativa in range(tentativas):
+        if ritmo is None:
+            await limitador.aguardar(url)
+        try:
+            async with requisicao(ritmo, url) as r:
+                async with sessao.get(url, headers=condicionais,
+                                      timeout=aiohttp.ClientTimeout(total=timeout)) as resp:
+                    r.resposta(resp.status, resp.headers)
+                    if resp.status == 429 or resp.status >= 500:
+                        raise aiohttp.ClientResponseError(
+                            resp.request_info, resp.history, status=resp.status, message=resp.reason or ""
+                        )
+                    if resp.status != 304:
+                        resp.raise_for_status()
+                    conteudo = await resp.read()
+                    if corpo_erro_de_proxy(conteudo):
+                        # 200 com a página de erro do proxy: conta como sobrecarga,
+                        # não vai para o cache e entra nas novas tentativas
+                        r.sinalizar("proxy")
+                        raise ErroProxy(url)
+            if cache is not None:
+                return cache.registrar_resposta(url, resp.status, conteudo, resp.headers, anterior)
+            return conteudo
+        except Exception as e:
+            ultimo_erro = e
+            if ritmo is None and tentativa < tentativas - 1:
+                # backoff exponencial com jitter, como nos scripts síncronos
+                # (com ritmo, a próxima vaga já vem espaçada pelo controlador)
+                await asyncio.sleep((2 ** tentativa) + random.random())
+    raise ultimo_erro
+
+
+async def buscar_concorrente(itens, ao_receber, ao_falhar=None,
+                             concorrencia=CONCORRENCIA, req_por_segundo=REQ_POR_SEGUNDO,
+                             tentativas=TENTATIVAS, timeout=TIMEOUT, headers=None, cache=None, ritmo=None):
+    """
+    itens: iterável de (chave, url).
+    cache: CacheHTTP opcional (comum/cache_http.py).
+    ritmo: ControladorRitmo opcional (substitui req_por_segundo e o backoff fixo).
+    ao_receber(chave, url, conteudo_bytes) é chamado assim que cada resposta chega.
+    ao_falhar(chave, url, erro) após esgotar as tentativas.
+    Retorna (ok, falhas).
+    """
+    if not HAS_AIOHTTP:
+        raise RuntimeError("Modo assíncrono requer aiohttp (pip install aiohttp)")
+
+    fila = asyncio.Queue(maxsize=concorrencia * 2)
+    limitador = LimitadorPorHost(req_por_segundo)
+    contagem = {"ok": 0, "falhas": 0}
+
+    async def trabalhador(sessao):
+        while True:
+            item = await fila.get()
+            if item is None:
+                fila.task_done()
+                return
+            chave, url = item
+            try:
+                conteudo = await _buscar(sessao, limitador, url, tentativas, timeout, cache, ritmo)
+                ao_receber(chave, url, conteudo)
+                contagem["ok"] += 1
+            except Exception as e:
+                contagem["falhas"] += 1
+                if ao_falhar:
+                    ao_falhar(chave, url, e)
+            finally:
+                fila.task_done()
+
+    conector = aiohttp.TCPConnector(limit=concorrencia)
+    async with aiohttp.ClientSession(headers=headers or HEADERS, connector=conector) as sessao:
+        trabalhadores = [asyncio.create_task(trabalhador(sessao)) for _ in range(concorrencia)]
+        for item in itens:
+            await fila.put(item)
+        for _ in trabalhadores:
+            await fila.put(None)
+        await asyncio.gather(*trabalhadores)
+
+    return contagem["ok"], contagem["falhas"]
+
+
+async def buscar_um(url, tentativas=TENTATIVAS, timeout=TIMEOUT, headers=None, cache=None, ritmo=None):
+    if not HAS_AIOHTTP:
+        raise RuntimeError("Modo assíncrono requer aiohttp (pip install aiohttp)")
+    async with aiohttp.ClientSession(headers=headers or HEADERS) as sessao:
+        return await _buscar(sessao, LimitadorPorHost(0), url, tentativas, timeout, cache, ritmo)
@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+indice_handles.py
+Índice compacto de handles (11336/<n>) e de outros ids inteiros (autores).
+
+No lugar de um set com centenas de milhares de URLs (~50 bytes cada, mais o
+overhead de objeto), um bitmap: bit n ligado = id n presente. 300 mil handles
+ocupam ~40 KB. O arquivo é mapeado com np.memmap em modo cópia-na-escrita, então
+abrir é imediato e só as páginas lidas vão para a memória; alterações ficam
+em memória até salvar(), que grava um arquivo novo e troca atomicamente.
+
+Formato: cabeçalho de 16 bytes (MAGICO + uint64 `marca`) e o bitmap, bit n no
+byte n // 8, posição n % 8 (a mesma ordem de comum/bitmap.py). `marca` é livre
+para quem usa; o link scraper guarda ali até que byte de links_coletados.txt o
+índice já cobre, e relê só o resto ao abrir. Com chaves fora do padrão
+(extras), o mágico é MAGICO_EXTRAS, o preenchimento do cabeçalho guarda o
+tamanho do bitmap em bytes e os extras vêm depois dele, como lista JSON.
+
+Pertinência O(1); união, interseção e diferença são operações vetoriais sobre
+os bytes. Linha de comando:
+
+    python -m comum.indice_handles info a.idx
+    python -m comum.indice_handles importar links_coletados.txt -o links.idx
+    python -m comum.indice_handles diferenca handles_autores.idx links.idx -o faltando.idx
+    python -m comum.indice_handles exportar faltando.idx
+"""
+
+import os
+import re
+import sys
+import json
+import struct
+import argparse
+
+import numpy as np
+
+MAGICO = b"IDX1"
+MAGICO_EXTRAS = b"IDX2"
+_CABECALHO = struct.Struct("<4sIQ")   # mágico, bytes do bitmap (só IDX2), marca
+URL_HANDLE = "https://ri.conicet.gov.ar/handle/11336/"
+URL_AUTOR = "https://ri.conicet.gov.ar/author/"
+RE_HANDLE = re.compile(r"(?:^|/handle/|^hdl:)11336/(\d+)")
+RE_AUTOR = re.compile(r"/author/(\d+)")
+RE_NUMERO = re.compile(r"^\d+$")
+
+
+class IndiceHandles:
+    """
+    Uso:
+        indice = IndiceHandles("saida/links.idx")
+        "https://ri.conicet.gov.ar/handle/11336/123" in indice   # ou 123, ou "11336/123"
+        indice.adicionar(url)
+        faltando = handles_autores - indice
+        indice.salvar()
+
+    Chaves aceitas: int, "11336/<n>" ou URL; com padrao=RE_AUTOR, URLs de
+    autor. Strings fora do padrão não cabem no bitmap e ficam num set à parte,
+    gravado depois do bitmap.
+    """
+
+    def __init__(self, caminho=None, padrao=RE_HANDLE, prefixo_url=URL_HANDLE):
+        self.caminho = caminho
+        self.padrao = padrao
+        self.prefixo_url = prefixo_url
+        self.marca = 0
+        self.extras = set()
+        self._bits = np.zeros(0, dtype=np.uint8)
+        if caminho and os.path.exists(caminho) and os.path.getsize(caminho) >= _CABECALHO.size:
+            self._abrir(caminho)
+
+    def _abrir(self, caminho):
+        tamanho = os.path.getsize(caminho)
+        with open(caminho, "rb") as f:
+            magico, n_bytes, self.marca = _CABECALHO.unpack(f.read(_CABECALHO.size))
+            if magico == MAGICO:
+                n_bytes = tamanho - _CABECALHO.size
+            elif magico == MAGICO_EXTRAS:
+                f.seek(_CABECALHO.size + n_bytes)
+                self.extras = set(json.loads(f.read().decode("utf-8")))
+            else:
+                raise ValueError(f"{caminho} não é um índice de handles")
+        self._bits = np.zeros(0, dtype=np.uint8)
+        if n_bytes:
+            self._bits = np.memmap(caminho, dtype=np.uint8, mode="c", offset=_CABECALHO.size, shape=(n_bytes,))
+
+    # ---------- chaves ----------
+    def id_de(self, chave):
+        """int da chave, ou None se não segue o padrão."""
+        if isinstance(chave, (int, np.integer)):
+            return int(chave) if chave >= 0 else None
+        chave = str(chave).strip()
+        if RE_NUMERO.match(chave):
+            return int(chave)
+        m = self.padrao.search(chave)
+        return int(m.group(1)) if m else None
+
+    def url_de(self, n):
+        return f"{self.prefixo_url}{n}"
+
+    # ---------- pertinência ----------
+    def __contains__(self, chave):
+        n = self.id_de(chave)
+        if n is None:
+            return chave in self.extras
+        byte = n >> 3
+        return byte < len(self._bits) and bool(self._bits[byte] & (1 << (n & 7)))
+
+    def __len__(self):
+        return int(np.unpackbits(self._bits).sum()) + len(self.extras)
+
+    def __bool__(self):
+        return bool(self.extras) or bool(self._bits.any())
+
+    def __iter__(self):
+        """ids em ordem crescente (sem os extras)."""
+        return iter(self.ids().tolist())
+
+    def ids(self):
+        return np.flatnonzero(np.unpackbits(self._bits, bitorder="little"))
+
+    def urls(self):
+        for n in self.ids().tolist():
+            yield self.url_de(n)
+
+    # ---------- escrita ----------
+    def _garantir(self, n):
+        falta = (n >> 3) + 1 - len(self._bits)
+        if falta > 0:
+            # cresce com folga para não realocar a cada id novo
+            novo = np.zeros(len(self._bits) + max(falta, len(self._bits) // 4, 1024), dtype=np.uint8)
+            novo[:len(self._bits)] = self._bits
+            self._bits = novo
+
+    def adicionar(self, chave):
+        """True se a chave era nova."""
+        n = self.id_de(chave)
+        if n is None:
+            if chave in self.extras:
+                return False
+            self.extras.add(chave)
+            return True
+        self._garantir(n)
+        byte, bit = n >> 3, np.uint8(1 << (n & 7))
+        if self._bits[byte] & bit:
+            return False
+        self._bits[byte] |= bit
+        return True
+
+    add = adicionar  # compatível com o set que o índice substitui
+
+    def adicionar_varios(self, chaves):
+        ids = []
+        for chave in chaves:
+            n = self.id_de(chave)
+            if n is None:
+                self.extras.add(chave)
+            else:
+                ids.append(n)
+        if ids:
+            ids = np.asarray(ids, dtype=np.int64)
+            self._garantir(int(ids.max()))
+            np.bitwise_or.at(self._bits, ids >> 3, (1 << (ids & 7)).astype(np.uint8))
+
+    def atualizar(self, outro):
+        """União no lugar (merge em massa de outro índice)."""
+        self._garantir(max(len(outro._bits) * 8 - 1, 0))
+        self._bits[:len(outro._bits)] |= outro._bits
+        self.extras |= outro.extras
+        return self
+
+    # ---------- conjuntos ----------
+    def _novo(self, bits, extras):
+        r = IndiceHandles(None, self.padrao, self.prefixo_url)
+        r._bits = bits
+        r.extras = extras
+        return r
+
+    def _alinhados(self, outro):
+        n = max(len(self._bits), len(outro._bits))
+        a = np.zeros(n, dtype=np.uint8)
+        b = np.zeros(n, dtype=np.uint8)
+        a[:len(self._bits)] = self._bits
+        b[:len(outro._bits)] = outro._bits
+        return a, b
+
+    def __or__(self, outro):
+        a, b = self._alinhados(outro)
+        return self._novo(a | b, self.extras | outro.extras)
+
+    def __and__(self, outro):
+        a, b = self._alinhados(outro)
+        return self._novo(a & b, self.extras & outro.extras)
+
+    def __sub__(self, outro):
+        a, b = self._alinhados(outro)
+        return self._novo(a & ~b, self.extras - outro.extras)
+
+    # ---------- persistência ----------
+    def salvar(self, caminho=None, marca=None):
+        caminho = caminho or self.caminho
+        if marca is not None:
+            self.marca = marca
+        ultimo = np.flatnonzero(self._bits)
+        util = int(ultimo[-1]) + 1 if len(ultimo) else 0
+        tmp = caminho + ".tmp"
+        with open(tmp, "wb") as f:
+            # sem extras, o formato antigo: leitores de IDX1 continuam abrindo
+            f.write(_CABECALHO.pack(MAGICO_EXTRAS if self.extras else MAGICO, util if self.extras else 0, self.marca))
+            f.write(self._bits[:util].tobytes())
+            if self.extras:
+                f.write(json.dumps(sorted(map(str, self.extras)), ensure_ascii=False).encode("utf-8"))
+            f.flush()
+            os.fsync(f.fileno())
+        # o memmap antigo aponta para o arquivo que vai ser trocado (no Windows,
+        # nem deixaria trocar): solta o mapeamento e remapeia o arquivo novo
+        self._bits = np.zeros(0, dtype=np.uint8)
+        os.replace(tmp, caminho)
+        self.caminho = caminho
+        self._abrir(caminho)
+
+
+def importar_texto(caminho_txt, indice, inicio=0):
+    """Adiciona ao índice as linhas de um arquivo de links a partir do byte `inicio`. Retorna o byte final."""
+    if not os.path.exists(caminho_txt):
+        return inicio
+    with open(caminho_txt, "rb") as f:
+        f.seek(inicio)
+        # só linhas completas: uma escrita pela metade será relida na próxima vez
+        dados = f.read()
+    fim = dados.rfind(b"\n") + 1
+    linhas = dados[:fim].decode("utf-8", errors="replace").split("\n")
+    indice.adicionar_varios(l.strip() for l in linhas if l.strip())
+    return inicio + fim
+
+
+# ---------- CLI ----------
+def _abrir(caminho):
+    if caminho.endswith(".idx"):
+        return IndiceHandles(caminho)
+    indice = IndiceHandles()
+    importar_texto(caminho, indice)
+    return indice
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Índice compacto de handles")
+    parser.add_argument("comando", choices=["info", "importar", "exportar", "uniao", "intersecao", "diferenca"])
+    parser.add_argument("entradas", nargs="+", help="arquivos .idx ou listas de links (.txt)")
+    parser.add_argument("-o", "--saida", type=str, default=None, help="grava o resultado como .idx")
+    args = parser.parse_args()
+
+    indices = [_abrir(c) for c in args.entradas]
+    if args.comando in ("uniao", "intersecao", "diferenca"):
+        resultado = indices[0]
+        for outro in indices[1:]:
+            if args.comando == "uniao":
+                resultado = resultado | outro
+            elif args.comando == "intersecao":
+                resultado = resultado & outro
+            else:
+                resultado = resultado - outro
+    else:
+        resultado = indices[0]
+        for outro in indices[1:]:
+            resultado.atualizar(outro)
+
+    if args.comando == "exportar":
+        for url in resultado.urls():
+            sys.stdout.write(url + "\n")
+    else:
+        ids = resultado.ids()
+        faixa = f", ids {ids[0]}..{ids[-1]}" if len(ids) else ""
+        print(f"{len(resultado)} handles{faixa}, {len(resultado._bits) / 1024:.1f} KB de bitmap", file=sys.stderr)
+    if args.saida:
+        resultado.salvar(args.saida)
@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+metricas.py
+Instrumentação comum aos três scrapers.
+
+  - tempo por etapa (listagem, carga_pagina, extracao, persistencia, espera,
+    ...) em histogramas com buckets fixos, no formato do Prometheus;
+  - contadores de erro por tipo e contadores livres;
+  - ETA a partir de uma taxa exponencialmente ponderada (EWMA): depois de
+    uma lentidão ou aceleração a previsão converge em poucos minutos, em vez
+    de ficar presa à média da execução inteira.
+
+As métricas vão para <prefixo>.json e <prefixo>.prom (texto do Prometheus,
+ex.: para o textfile collector do node_exporter), reescritos a cada
+`intervalo` segundos, e opcionalmente para um endpoint HTTP local
+(/metrics e /metrics.json).
+"""
+
+import os
+import json
+import math
+import time
+import threading
+from contextlib import contextmanager
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+# Segundos; cobre de uma extração lxml (~ms) a uma página lenta do Selenium
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+MEIA_VIDA = 600      # segundos: peso das medições cai pela metade a cada 10 min
+INTERVALO_FLUSH = 15
+
+
+class Histograma:
+    def __init__(self, limites=BUCKETS):
+        self.limites = tuple(limites)
+        self.contagens = [0] * (len(self.limites) + 1)   # último = +Inf
+        self.soma = 0.0
+        self.n = 0
+        self.maximo = 0.0
+
+    def observar(self, valor):
+        i = 0
+        while i < len(self.limites) and valor > self.limites[i]:
+            i += 1
+        self.contagens[i] += 1
+        self.soma += valor
+        self.n += 1
+        self.maximo = max(self.maximo, valor)
+
+    def quantil(self, q):
+        """Estimativa pelo limite superior do bucket (como histogram_quantile)."""
+        if not self.n:
+            return None
+        alvo = q * self.n
+        acumulado = 0
+        for i, c in enumerate(self.contagens):
+            acumulado += c
+            if acumulado >= alvo:
+                return self.limites[i] if i < len(self.limites) else self.maximo
+        return self.maximo
+
+    def resumo(self):
+        return {
+            "n": self.n,
+            "soma_s": round(self.soma, 3),
+            "media_s": round(self.soma / self.n, 4) if self.n else None,
+            "p50_s": self.quantil(0.5),
+            "p95_s": self.quantil(0.95),
+            "max_s": round(self.maximo, 4),
+            "buckets": dict(zip([str(l) for l in self.limites] + ["+Inf"], self.contagens)),
+        }
+
+
+class TaxaEWMA:
+    """Itens por segundo com média móvel exponencial no tempo (meia-vida em segundos)."""
+
+    def __init__(self, meia_vida=MEIA_VIDA, inicio=None):
+        self.tau = meia_vida / math.log(2)
+        self.taxa = None
+        # o relógio começa na criação: os itens do primeiro registrar() também contam
+        self._ultimo = inicio if inicio is not None else time.time()
+        self._acumulado = 0
+
+    def registrar(self, n=1, agora=None):
+        agora = agora if agora is not None else time.time()
+        self._acumulado += n
+        dt = agora - self._ultimo
+        if dt < 1.0:
+            # junta eventos muito próximos para não amplificar ruído
+            return
+        instantanea = self._acumulado / dt
+        if self.taxa is None:
+            self.taxa = instantanea
+        else:
+            alfa = 1 - math.exp(-dt / self.tau)
+            self.taxa += alfa * (instantanea - self.taxa)
+        self._ultimo = agora
+        self._acumulado = 0
+
+    def eta(self, restantes):
+        """Segundos até terminar `restantes` itens (None sem taxa ainda)."""
+        if not self.taxa:
+            return None
+        return restantes / self.taxa
+
+
+class Metricas:
+    """
+    Uso:
+        METRICAS = Metricas("autores", os.path.join(OUTPUT_DIR, "metricas"))
+        with METRICAS.etapa("carga_pagina"):
+            driver.get(url)
+        METRICAS.erro(e)
+        METRICAS.progresso(concluidos, total)
+        METRICAS.flush_se_necessario()
+    """
+
+    def __init__(self, job, prefixo=None, intervalo=INTERVALO_FLUSH, meia_vida=MEIA_VIDA):
+        self.job = job
+        self.prefixo = prefixo
+        self.intervalo = intervalo
+        self.inicio = time.time()
+        self.etapas = {}
+        self.erros = {}
+        self.contadores = {}
+        self.taxa = TaxaEWMA(meia_vida)
+        self.concluidos = 0
+        self.total = None
+        self._ultimo_flush = 0.0
+        self._lock = threading.Lock()
+        self._servidor = None
+
+    # ---------- registro ----------
+    def observar(self, etapa, segundos):
+        with self._lock:
+            self.etapas.setdefault(etapa, Histograma()).observar(segundos)
+
+    @contextmanager
+    def etapa(self, nome):
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observar(nome, time.perf_counter() - inicio)
+
+    def erro(self, tipo):
+        """tipo: exceção (conta pelo nome da classe) ou string."""
+        nome = type(tipo).__name__ if isinstance(tipo, BaseException) else str(tipo)
+        with self._lock:
+            self.erros[nome] = self.erros.get(nome, 0) + 1
+
+    def contar(self, nome, n=1):
+        with self._lock:
+            self.contadores[nome] = self.contadores.get(nome, 0) + n
+
+    def progresso(self, concluidos=None, total=None, novos=1):
+        """Avança a taxa em `novos` itens; concluidos/total alimentam o ETA."""
+        with self._lock:
+            self.taxa.registrar(novos)
+            if concluidos is not None:
+                self.concluidos = concluidos
+            else:
+                self.concluidos += novos
+            if total is not None:
+                self.total = total
+
+    # ---------- leitura ----------
+    def eta_segundos(self):
+        with self._lock:
+            if self.total is None:
+                return None
+            return self.taxa.eta(max(self.total - self.concluidos, 0))
+
+    def instantaneo(self):
+        with self._lock:
+            restantes = max(self.total - self.concluidos, 0) if self.total is not None else None
+            eta = self.taxa.eta(restantes) if restantes is not None else None
+            return {
+                "job": self.job,
+                "atualizado": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "decorrido_s": round(time.time() - self.inicio, 1),
+                "concluidos": self.concluidos,
+                "total": self.total,
+                "taxa_ewma_por_s": round(self.taxa.taxa, 4) if self.taxa.taxa else None,
+                "eta_s": round(eta) if eta is not None else None,
+                "etapas": {k: h.resumo() for k, h in self.etapas.items()},
+                "erros": dict(self.erros),
+                "contadores": dict(self.contadores),
+            }
+
+    def prometheus(self):
+        d = self.instantaneo()
+        job = self.job
+        linhas = [
+            "# TYPE conicet_itens_concluidos gauge",
+            f'conicet_itens_concluidos{{job="{job}"}} {d["concluidos"]}',
+        ]
+        if d["total"] is not None:
+            linhas += ["# TYPE conicet_itens_total gauge", f'conicet_itens_total{{job="{job}"}} {d["total"]}']
+        if d["taxa_ewma_por_s"] is not None:
+            linhas += ["# TYPE conicet_taxa_ewma gauge", f'conicet_taxa_ewma{{job="{job}"}} {d["taxa_ewma_por_s"]}']
+        if d["eta_s"] is not None:
+            linhas += ["# TYPE conicet_eta_segundos gauge", f'conicet_eta_segundos{{job="{job}"}} {d["eta_s"]}']
+        linhas.append("# TYPE conicet_etapa_segundos histogram")
+        with self._lock:
+            for nome, h in self.etapas.items():
+                acumulado = 0
+                for limite, c in zip([str(l) for l in h.limites] + ["+Inf"], h.contagens):
+                    acumulado += c
+                    linhas.append(f'conicet_etapa_segundos_bucket{{job="{job}",etapa="{nome}",le="{limite}"}} {acumulado}')
+                linhas.append(f'conicet_etapa_segundos_sum{{job="{job}",etapa="{nome}"}} {h.soma:.6f}')
+                linhas.append(f'conicet_etapa_segundos_count{{job="{job}",etapa="{nome}"}} {h.n}')
+        linhas.append("# TYPE conicet_erros_total counter")
+        for tipo, n in d["erros"].items():
+            linhas.append(f'conicet_erros_total{{job="{job}",tipo="{tipo}"}} {n}')
+        linhas.append("# TYPE conicet_contador_total counter")
+        for nome, n in d["contadores"].items():
+            linhas.append(f'conicet_contador_total{{job="{job}",nome="{nome}"}} {n}')
+        return "\n".join(linhas) + "\n"
+
+    # ---------- saída ----------
+    def _gravar(self, caminho, texto):
+        os.makedirs(os.path.dirname(caminho) or ".", exist_ok=True)
+        tmp = caminho + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(texto)
+        os.replace(tmp, caminho)
+
+    def flush(self):
+        self._ultimo_flush = time.time()
+        if not self.prefixo:
+            return
+        self._gravar(self.prefixo + ".json", json.dumps(self.instantaneo(), indent=2, ensure_ascii=False))
+        self._gravar(self.prefixo + ".prom", self.prometheus())
+
+    def flush_se_necessario(self):
+        if time.time() - self._ultimo_flush >= self.intervalo:
+            self.flush()
+            return True
+        return False
+
+    def servir(self, porta, host="127.0.0.1"):
+        """Endpoint local: /metrics (Prometheus) e /metrics.json, numa thread daemon."""
+        metricas = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.startswith("/metrics.json"):
+                    corpo = json.dumps(metricas.instantaneo(), ensure_ascii=False).encode("utf-8")
+                    tipo = "application/json"
+                elif self.path.startswith("/metrics"):
+                    corpo = metricas.prometheus().encode("utf-8")
+                    tipo = "text/plain; version=0.0.4"
+                else:
+                    self.send_response(404)
+                    self.end_headers()
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", tipo)
+                self.send_header("Content-Length", str(len(corpo)))
+                self.end_headers()
+                self.wfile.write(corpo)
+
+            def log_message(self, *args):
+                pass
+
+        self._servidor = ThreadingHTTPServer((host, porta), Handler)
+        threading.Thread(target=self._servidor.serve_forever, daemon=True).start()
+        return self._servidor
+
+    def fechar(self):
+        self.flush()
+        if self._servidor is not None:
+            self._servidor.shutdown()
+            self._servidor = None
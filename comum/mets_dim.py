@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+mets_dim.py
+Metadados do item a partir do METS/DIM do DSpace (/metadata/handle/<h>/mets.xml).
+
+O documento traz os campos como <dim:field mdschema="dc" element="title"
+qualifier="..."> — menor que a página HTML e sem depender de estilo inline.
+O parse é feito com iterparse, liberando cada elemento após a leitura.
+"""
+
+import io
+from urllib.parse import urlsplit
+
+from lxml import etree
+
+NS_DIM = "http://www.dspace.org/xmlns/dspace/dim"
+_FIELD = "{%s}field" % NS_DIM
+
+
+def url_mets(url_item):
+    """https://ri.conicet.gov.ar/handle/11336/123 -> .../metadata/handle/11336/123/mets.xml"""
+    partes = urlsplit(url_item)
+    caminho = partes.path.rstrip("/")
+    return f"{partes.scheme}://{partes.netloc}/metadata{caminho}/mets.xml"
+
+
+def parse_dim(conteudo):
+    """
+    Retorna {"dc.title": [...], "dc.contributor.author": [...], ...} na ordem do documento.
+    Sem qualifier a chave é schema.element.
+    """
+    campos = {}
+    for _, elem in etree.iterparse(io.BytesIO(conteudo), events=("end",), tag=_FIELD, huge_tree=True):
+        chave = f"{elem.get('mdschema')}.{elem.get('element')}"
+        if elem.get("qualifier"):
+            chave += "." + elem.get("qualifier")
+        texto = (elem.text or "").strip()
+        if texto:
+            campos.setdefault(chave, []).append(texto)
+        elem.clear()
+        while elem.getprevious() is not None:
+            del elem.getparent()[0]
+    return campos
+
+
+def valores(campos, chaves):
+    """Valores da primeira chave presente (ordem de preferência)."""
+    for chave in chaves:
+        if campos.get(chave):
+            return campos[chave]
+    return []
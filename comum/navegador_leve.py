@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+navegador_leve.py
+Perfil de navegador enxuto para quando o Selenium é inevitável.
+
+Os scrapers só leem o DOM; imagens, fontes, folhas de estilo e scripts de
+analytics são baixados e descartados. O perfil:
+  - bloqueia esses recursos por CDP (Network.setBlockedURLs) e por prefs de
+    conteúdo (imagens, notificações, popups, plugins);
+  - usa pageLoadStrategy "eager" (driver.get volta no DOMContentLoaded; as
+    esperas explícitas de comum/espera.py cuidam do resto);
+  - desliga extensões e fixa um cache de disco pequeno.
+
+Perfis: "completo" (nada bloqueado), "sem_midia" (imagens, fontes, mídia e
+rastreadores) e "leve" (sem_midia + CSS). O padrão é "sem_midia": sem CSS,
+WebElement.text passa a incluir texto que a folha de estilo escondia, então
+"leve" fica por conta de cada scraper (--browser-profile leve), depois de
+conferir que os campos extraídos não mudam.
+
+medir_pagina() lê a Resource Timing API da página atual (bytes transferidos,
+número de recursos, tempo até DOMContentLoaded/load) para comparar perfis.
+"""
+
+PERFIS = ("completo", "sem_midia", "leve")
+PERFIL_PADRAO = "sem_midia"
+CACHE_DISCO_BYTES = 32 * 1024 * 1024
+
+_MIDIA = [
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.svg", "*.ico", "*.bmp",
+    "*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot",
+    "*.mp4", "*.webm", "*.mp3",
+]
+_RASTREADORES = [
+    "*google-analytics.com*", "*googletagmanager.com*", "*doubleclick.net*",
+    "*facebook.net*", "*connect.facebook*", "*hotjar.com*", "*addthis.com*",
+    "*sharethis.com*", "*altmetric.com*", "*plumx*", "*scholar.google*",
+]
+_CSS = ["*.css", "*fonts.googleapis.com*"]
+
+BLOQUEIOS = {
+    "completo": [],
+    "sem_midia": _MIDIA + _RASTREADORES,
+    "leve": _MIDIA + _RASTREADORES + _CSS,
+}
+
+# 2 = bloquear (content settings do Chromium)
+_PREFS = {
+    "profile.managed_default_content_settings.images": 2,
+    "profile.default_content_setting_values.notifications": 2,
+    "profile.managed_default_content_settings.popups": 2,
+    "profile.managed_default_content_settings.plugins": 2,
+    "profile.managed_default_content_settings.geolocation": 2,
+    "profile.managed_default_content_settings.media_stream": 2,
+}
+
+
+def _validar(perfil):
+    if perfil not in PERFIS:
+        raise ValueError(f"Perfil de navegador inválido: {perfil} (use {', '.join(PERFIS)})")
+
+
+def aplicar_perfil(options, perfil=PERFIL_PADRAO):
+    """Ajusta as options (Edge/Chrome/Firefox) antes de criar o driver."""
+    _validar(perfil)
+    if perfil == "completo":
+        return options
+    options.page_load_strategy = "eager"
+    if hasattr(options, "set_preference"):
+        # Firefox: sem CDP; só o que as prefs permitem
+        options.set_preference("permissions.default.image", 2)
+        options.set_preference("browser.cache.disk.capacity", CACHE_DISCO_BYTES // 1024)
+        if perfil == "leve":
+            options.set_preference("permissions.default.stylesheet", 2)
+        return options
+    options.add_argument("--disable-extensions")
+    options.add_argument("--disable-component-extensions-with-background-pages")
+    options.add_argument(f"--disk-cache-size={CACHE_DISCO_BYTES}")
+    options.add_argument("--blink-settings=imagesEnabled=false")
+    options.add_experimental_option("prefs", dict(_PREFS))
+    return options
+
+
+def ativar_bloqueio(driver, perfil=PERFIL_PADRAO):
+    """Bloqueio por URL via CDP (Chromium). Chamar logo após criar o driver."""
+    _validar(perfil)
+    padroes = BLOQUEIOS[perfil]
+    if not padroes or not hasattr(driver, "execute_cdp_cmd"):
+        return False
+    driver.execute_cdp_cmd("Network.enable", {})
+    driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": padroes})
+    return True
+
+
+_JS_MEDIR = """
+const nav = performance.getEntriesByType('navigation')[0];
+const recursos = performance.getEntriesByType('resource');
+const tam = e => e.transferSize || e.encodedBodySize || 0;
+let bytes = nav ? tam(nav) : 0;
+for (const r of recursos) bytes += tam(r);
+return {
+    bytes: bytes,
+    recursos: recursos.length,
+    dom_ms: nav ? Math.round(nav.domContentLoadedEventEnd - nav.startTime) : null,
+    load_ms: nav && nav.loadEventEnd ? Math.round(nav.loadEventEnd - nav.startTime) : null
+};
+"""
+
+
+def medir_pagina(driver):
+    """{"bytes", "recursos", "dom_ms", "load_ms"} da página atual; None se não der."""
+    try:
+        return driver.execute_script(_JS_MEDIR)
+    except Exception:
+        return None
+
+
+def descrever_medida(medida):
+    if not medida:
+        return "sem medida"
+    return (f"{medida['bytes'] / 1024:.0f} KB, {medida['recursos']} recursos, "
+            f"DOM {medida['dom_ms']} ms, load {medida['load_ms']} ms")
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+oai_pmh.py
+Coleta em lote via OAI-PMH (ListRecords) com paginação por resumptionToken.
+
+Cada resposta traz ~100 registros Dublin Core (oai_dc ou qdc); o XML é lido
+com iterparse e cada <record> é liberado da memória assim que convertido.
+Janelas from/until independentes permitem rodar várias coletas em paralelo.
+"""
+
+import io
+import time
+from datetime import date, timedelta
+
+import requests
+from lxml import etree
+
+from comum.ritmo import requisicao
+
+OAI_URL = "https://ri.conicet.gov.ar/oai/request"
+TIMEOUT = 60
+TENTATIVAS = 5
+
+NS = {
+    "oai": "http://www.openarchives.org/OAI/2.0/",
+    "oai_dc": "http://www.openarchives.org/OAI/2.0/oai_dc/",
+    "dc": "http://purl.org/dc/elements/1.1/",
+    "dcterms": "http://purl.org/dc/terms/",
+}
+_RECORD = "{%s}record" % NS["oai"]
+_TOKEN = "{%s}resumptionToken" % NS["oai"]
+_ERRO = "{%s}error" % NS["oai"]
+
+
+class ErroOAI(Exception):
+    def __init__(self, codigo, mensagem):
+        super().__init__(f"{codigo}: {mensagem}")
+        self.codigo = codigo
+
+
+def _campos_dc(metadata):
+    """Agrupa os elementos dc:/dcterms: por nome local, na ordem em que aparecem."""
+    campos = {}
+    if metadata is None:
+        return campos
+    for elem in metadata.iter():
+        if not isinstance(elem.tag, str):
+            continue
+        ns, _, local = elem.tag[1:].partition("}")
+        if ns not in (NS["dc"], NS["dcterms"]):
+            continue
+        texto = (elem.text or "").strip()
+        if texto:
+            campos.setdefault(local, []).append(texto)
+    return campos
+
+
+def _converter_registro(record):
+    header = record.find("oai:header", NS)
+    identificador = header.findtext("oai:identifier", default="", namespaces=NS)
+    datestamp = header.findtext("oai:datestamp", default="", namespaces=NS)
+    apagado = header.get("status") == "deleted"
+    return {
+        "identificador": identificador,
+        "datestamp": datestamp,
+        "apagado": apagado,
+        "sets": [s.text for s in header.findall("oai:setSpec", NS)],
+        "campos": {} if apagado else _campos_dc(record.find("oai:metadata", NS)),
+    }
+
+
+def parse_pagina(conteudo):
+    """
+    Lê uma resposta ListRecords. Retorna (registros, resumption_token).
+    Token vazio/ausente significa última página.
+    """
+    registros = []
+    token = None
+    for _, elem in etree.iterparse(io.BytesIO(conteudo), events=("end",), tag=(_RECORD, _TOKEN, _ERRO)):
+        if elem.tag == _RECORD:
+            registros.append(_converter_registro(elem))
+            # libera o registro já convertido (e irmãos anteriores)
+            elem.clear()
+            while elem.getprevious() is not None:
+                del elem.getparent()[0]
+        elif elem.tag == _TOKEN:
+            token = (elem.text or "").strip() or None
+        else:
+            codigo = elem.get("code", "")
+            if codigo == "noRecordsMatch":
+                return [], None
+            raise ErroOAI(codigo, (elem.text or "").strip())
+    return registros, token
+
+
+def _get(sessao, url, params, timeout, tentativas, ritmo=None):
+    for tentativa in range(tentativas):
+        try:
+            with requisicao(ritmo, url) as r:
+                resp = sessao.get(url, params=params, timeout=timeout)
+                r.resposta(resp.status_code, resp.headers)
+            if resp.status_code == 503 and tentativa < tentativas - 1:
+                # OAI-PMH usa 503 + Retry-After para pedir calma (com ritmo, o
+                # controlador já adiou a próxima vaga pelo Retry-After)
+                if ritmo is None:
+                    espera = resp.headers.get("Retry-After", "")
+                    time.sleep(int(espera) if espera.isdigit() else 2 ** tentativa * 2)
+                continue
+            resp.raise_for_status()
+            return resp.content
+        except requests.exceptions.RequestException:
+            if tentativa == tentativas - 1:
+                raise
+            if ritmo is None:
+                time.sleep(2 ** tentativa * 2)
+
+
+def listar_registros(base_url=OAI_URL, metadata_prefix="oai_dc", de=None, ate=None,
+                     set_spec=None, token=None, sessao=None, ao_pagina=None,
+                     timeout=TIMEOUT, tentativas=TENTATIVAS, ritmo=None):
+    """
+    Gera os registros de ListRecords, seguindo os resumptionTokens.
+    ao_pagina(token_seguinte) é chamado após cada página já entregue (para
+    checkpoint); com `token` retoma uma coleta interrompida.
+    ritmo: ControladorRitmo opcional (comum/ritmo.py).
+    """
+    sessao = sessao or requests.Session()
+    while True:
+        if token:
+            params = {"verb": "ListRecords", "resumptionToken": token}
+        else:
+            params = {"verb": "ListRecords", "metadataPrefix": metadata_prefix}
+            if de:
+                params["from"] = str(de)
+            if ate:
+                params["until"] = str(ate)
+            if set_spec:
+                params["set"] = set_spec
+        registros, token = parse_pagina(_get(sessao, base_url, params, timeout, tentativas, ritmo))
+        for registro in registros:
+            yield registro
+        if ao_pagina:
+            ao_pagina(token)
+        if not token:
+            return
+
+
+def janelas(de, ate, dias):
+    """Divide [de, ate] em janelas de `dias` dias: [(de, ate), ...] (datas ISO)."""
+    de = date.fromisoformat(str(de))
+    ate = date.fromisoformat(str(ate))
+    atual = de
+    resultado = []
+    while atual <= ate:
+        fim = min(ate, atual + timedelta(days=dias - 1))
+        resultado.append((atual.isoformat(), fim.isoformat()))
+        atual = fim + timedelta(days=1)
+    return resultado
@@ -0,0 +1,289 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+parquet_incremental.py
+Escrita incremental de Parquet sem reler/reescrever o arquivo a cada linha.
+
+As linhas ficam em buffer e são gravadas em "partes" (part-*.parquet) dentro de
+um diretório. Cada parte é escrita em um arquivo temporário oculto e só recebe
+o nome final depois que o rodapé foi gravado e o arquivo sincronizado em disco,
+então uma queda no meio da escrita nunca deixa uma parte corrompida visível.
+O diretório inteiro é lido como um único dataset (pd.read_parquet(diretorio)
+ou ler_dataset()).
+
+Layout opcional para leitura analítica:
+  - partições no estilo hive (destino/ano=2019/tipo=.../part-*): o escritor
+    grava partes planas na raiz (um arquivo por flush; dividir cada flush por
+    ano x tipo dava milhares de partes de poucas linhas) e comum/compactacao.py
+    distribui as linhas nas partições, com diretorio_particao();
+  - dicionario: só essas colunas (baixa cardinalidade) usam dicionário no
+    Parquet; textos longos não pagam a tentativa e o fallback;
+  - compressao/nivel_compressao (ex.: zstd nível 6) e estatísticas min/max
+    por row group, para ler_dataset(filtro=...) pular partições e grupos.
+"""
+
+import os
+import re
+import time
+import shutil
+import itertools
+from urllib.parse import quote
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+LINHAS_POR_FLUSH = 500
+SEGUNDOS_POR_FLUSH = 60
+LINHAS_POR_GRUPO = 64 * 1024
+
+PARTICAO_NULA = "__HIVE_DEFAULT_PARTITION__"  # mesmo marcador do pyarrow/Hive
+
+# distingue escritores do mesmo processo (desempate no nome das partes)
+_INSTANCIAS = itertools.count(1)
+
+
+def _migrar_arquivo_legado(destino):
+    """Converte um .parquet monolítico antigo na primeira parte do diretório."""
+    if not os.path.isfile(destino):
+        return
+    tmp = destino + ".legado"
+    os.replace(destino, tmp)
+    os.makedirs(destino, exist_ok=True)
+    os.replace(tmp, os.path.join(destino, "part-00000000-legado.parquet"))
+
+
+_RE_PARTE = re.compile(r"^part-(\d+)(?:T(\d{6}))?-(.*)\.parquet$")
+
+
+def ordem_gravacao(parte):
+    """
+    Chave de ordenação das partes pela hora de gravação. Nomes atuais:
+    part-<ns do flush>-<pid>-<instância>-<seq>; os antigos (part-AAAAMMDDTHHMMSS-...,
+    hora de abertura do escritor) e os legado/compactado (part-00000000-...)
+    vêm antes, na melhor ordem possível.
+    """
+    nome = os.path.basename(parte)
+    m = _RE_PARTE.match(nome)
+    if not m:
+        return (0, (), nome)
+    data, hora, resto = m.groups()
+    if hora is not None:
+        ns = int(time.mktime(time.strptime(data + hora, "%Y%m%d%H%M%S"))) * 10 ** 9
+    else:
+        ns = int(data)
+    return (ns, tuple(int(n) for n in re.findall(r"\d+", resto)), nome)
+
+
+def listar_partes(destino):
+    """Partes finalizadas, inclusive dentro de partições (ignora temporários ocultos)."""
+    if os.path.isfile(destino):
+        return [destino]
+    if not os.path.isdir(destino):
+        return []
+    partes = []
+    for raiz, dirs, nomes in os.walk(destino):
+        dirs[:] = sorted(d for d in dirs if not d.startswith((".", "_")))
+        partes.extend(
+            os.path.join(raiz, nome)
+            for nome in nomes
+            if nome.endswith(".parquet") and not nome.startswith((".", "_"))
+        )
+    return sorted(partes)
+
+
+def _segmento(nome, valor):
+    if valor is None or valor == "":
+        return f"{nome}={PARTICAO_NULA}"
+    return f"{nome}={quote(str(valor), safe='')}"
+
+
+def diretorio_particao(linha, particoes):
+    """Caminho relativo da partição hive da linha: "ano=2019/tipo=Artigo"."""
+    return "/".join(_segmento(n, f(linha)) for n, f in particoes.items())
+
+
+def _normalizar_schema(schema):
+    """Colunas que só vieram nulas no primeiro lote viram string."""
+    campos = []
+    for campo in schema:
+        if pa.types.is_null(campo.type):
+            campo = campo.with_type(pa.string())
+        campos.append(campo)
+    return pa.schema(campos)
+
+
+class EscritorParquet:
+    """
+    Acumula linhas (dicts) e grava uma nova parte a cada `linhas_por_flush`
+    linhas ou `segundos_por_flush` segundos, o que vier primeiro.
+    Use fechar() (ou o bloco with) para gravar o que restar no buffer.
+
+    Com flush_automatico=False quem chama decide o momento (ex.: ao fim de
+    cada página, para o checkpoint só avançar com tudo gravado) chamando
+    flush_se_necessario().
+
+    As partes vão sempre para a raiz de `destino`; o particionamento fica
+    para a compactação (comum/compactacao.py).
+    """
+
+    def __init__(self, destino, colunas=None, schema=None,
+                 linhas_por_flush=LINHAS_POR_FLUSH,
+                 segundos_por_flush=SEGUNDOS_POR_FLUSH,
+                 linhas_por_grupo=LINHAS_POR_GRUPO,
+                 compressao="snappy", flush_automatico=True,
+                 dicionario=None, nivel_compressao=None,
+                 estatisticas=True):
+        self.destino = destino
+        self.colunas = list(colunas) if colunas else None
+        self.schema = schema
+        self.linhas_por_flush = linhas_por_flush
+        self.segundos_por_flush = segundos_por_flush
+        self.linhas_por_grupo = linhas_por_grupo
+        self.compressao = compressao
+        self.flush_automatico = flush_automatico
+        self.dicionario = list(dicionario) if dicionario is not None else None
+        self.nivel_compressao = nivel_compressao
+        self.estatisticas = estatisticas
+
+        self._buffer = []
+        self._ultimo_flush = time.time()
+        self._sequencia = 0
+        self._instancia = next(_INSTANCIAS)
+        self._ultimo_ns = 0
+
+        _migrar_arquivo_legado(destino)
+        os.makedirs(destino, exist_ok=True)
+
+        # Reaproveita o schema das partes já gravadas para manter o dataset coerente
+        if self.schema is None:
+            partes = listar_partes(destino)
+            if partes:
+                try:
+                    self.schema = _normalizar_schema(pq.read_schema(partes[-1]).remove_metadata())
+                except Exception:
+                    self.schema = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.fechar()
+        return False
+
+    def __len__(self):
+        return len(self._buffer)
+
+    def escrever(self, linha):
+        if self.colunas:
+            linha = {c: linha.get(c) for c in self.colunas}
+        self._buffer.append(linha)
+        if self.flush_automatico:
+            self.flush_se_necessario()
+
+    def flush_se_necessario(self):
+        """Grava se algum limite foi atingido. True se o buffer ficou vazio (tudo em disco)."""
+        if (len(self._buffer) >= self.linhas_por_flush
+                or time.time() - self._ultimo_flush >= self.segundos_por_flush):
+            self.flush()
+        return not self._buffer
+
+    def _tabela(self, linhas):
+        if self.schema is None:
+            tabela = pa.Table.from_pylist(linhas)
+            self.schema = _normalizar_schema(tabela.schema)
+            if self.schema != tabela.schema:
+                tabela = tabela.cast(self.schema)
+            return tabela
+        return pa.Table.from_pylist(linhas, schema=self.schema)
+
+    def flush(self):
+        """Grava o buffer como uma parte nova e finalizada. Retorna o caminho ou None."""
+        self._ultimo_flush = time.time()
+        if not self._buffer:
+            return None
+
+        tabela = self._tabela(self._buffer)
+        self._sequencia += 1
+        final = self._gravar_parte(tabela, self.destino, self._nome_parte())
+        self._buffer = []
+        return final
+
+    def _nome_parte(self):
+        # Hora do flush (não da abertura), em ns e com largura fixa: a ordem dos
+        # nomes é a ordem de gravação mesmo entre escritores sobrepostos, que
+        # é o que ordem_gravacao()/compactação usam para "fica a última versão"
+        ns = max(time.time_ns(), self._ultimo_ns + 1)
+        self._ultimo_ns = ns
+        return f"part-{ns:020d}-{os.getpid():010d}-{self._instancia:06d}-{self._sequencia:06d}.parquet"
+
+    def _gravar_parte(self, tabela, diretorio, nome):
+        os.makedirs(diretorio, exist_ok=True)
+        final = os.path.join(diretorio, nome)
+        tmp = os.path.join(diretorio, "." + nome + ".tmp")
+        dicionario = True
+        if self.dicionario is not None:
+            dicionario = [c for c in self.dicionario if c in tabela.schema.names]
+        with pq.ParquetWriter(tmp, tabela.schema, compression=self.compressao,
+                              compression_level=self.nivel_compressao,
+                              use_dictionary=dicionario,
+                              write_statistics=self.estatisticas) as writer:
+            writer.write_table(tabela, row_group_size=self.linhas_por_grupo)
+        with open(tmp, "rb") as f:
+            os.fsync(f.fileno())
+        os.replace(tmp, final)
+        return final
+
+    def fechar(self):
+        return self.flush()
+
+
+def ler_dataset(destino, colunas=None, filtro=None):
+    """
+    Lê todas as partes (ou o arquivo legado) como um único DataFrame.
+    filtro: expressão do pyarrow.dataset, ex. (ds.field("ano") == 2019); partições
+    e row groups que não podem satisfazê-la nem são lidos.
+    """
+    if not listar_partes(destino):
+        return pd.DataFrame(columns=colunas or [])
+    tabela = abrir_dataset(destino).to_table(columns=colunas, filter=filtro)
+    return tabela.to_pandas()
+
+
+def schema_unificado(partes):
+    """Schema comum às partes (sem as colunas de partição); None se não há partes."""
+    schemas = [_normalizar_schema(pq.read_schema(p).remove_metadata()) for p in partes]
+    return pa.unify_schemas(schemas, promote_options="permissive") if schemas else None
+
+
+def abrir_dataset(destino_ou_partes):
+    """
+    pyarrow.dataset com schema unificado entre partes (legado pode ter colunas
+    nulas). Dado o diretório, as partições hive viram colunas (ano, tipo, ...).
+    """
+    base = None
+    if isinstance(destino_ou_partes, (list, tuple)):
+        partes = list(destino_ou_partes)
+    else:
+        partes = listar_partes(destino_ou_partes)
+        if os.path.isdir(destino_ou_partes):
+            base = destino_ou_partes
+    schema = schema_unificado(partes)
+    particionado = base is not None and any(os.path.dirname(p) != base.rstrip(os.sep) for p in partes)
+    if not particionado:
+        return ds.dataset(partes, format="parquet", schema=schema)
+    particionamento = ds.HivePartitioning.discover(null_fallback=PARTICAO_NULA)
+    descoberto = ds.dataset(partes, format="parquet", partitioning=particionamento, partition_base_dir=base)
+    for campo in descoberto.schema:
+        if schema.get_field_index(campo.name) < 0:
+            schema = schema.append(campo)
+    return ds.dataset(partes, format="parquet", schema=schema,
+                      partitioning=particionamento, partition_base_dir=base)
+
+
+def remover_dataset(destino):
+    if os.path.isdir(destino):
+        shutil.rmtree(destino)
+    elif os.path.exists(destino):
+        os.remove(destino)
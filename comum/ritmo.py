@@ -0,0 +1,362 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ritmo.py
+Controle adaptativo de ritmo (AIMD) com um orçamento único por máquina.
+
+Todo caminho de busca (requests, aiohttp, Selenium) pede vez ao controlador
+antes da requisição e informa o resultado depois:
+  - resposta saudável, latência normal e taxa de erros baixa: aumento aditivo
+    (+INCREMENTO_TAXA req/s por resposta; a concorrência ganha
+    ~INCREMENTO_CONCORRENCIA a cada janela completa);
+  - 429, 5xx, página de erro do proxy, timeout/erro de conexão ou latência
+    acima de FATOR_PICO x a média da classe: taxa e concorrência multiplicadas
+    por FATOR_REDUCAO, no máximo uma vez a cada RESFRIAMENTO segundos (as
+    requisições já em voo no mesmo congestionamento não derrubam de novo);
+    Retry-After adia a próxima vaga.
+
+O estado fica num SQLite compartilhado, por host: os workers de --shards, as
+threads de detalhes e os três scripts rodando juntos dividem a mesma taxa e o
+mesmo limite de requisições em voo. Vagas de processos que morreram expiram
+após TTL_VAGA segundos.
+
+    RITMO = ControladorRitmo(log=log_line)
+    with requisicao(RITMO, url) as r:        # RITMO None: sem controle
+        resp = sessao.get(url)
+        r.resposta(resp.status_code, resp.headers)
+
+Latências de classes diferentes (http, navegador) têm médias separadas: uma
+carga no Selenium não é pico em relação a um GET simples.
+"""
+
+import os
+import re
+import time
+import random
+import sqlite3
+import asyncio
+import tempfile
+import threading
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+
+RITMO_DB = os.path.join(tempfile.gettempdir(), "conicet_ritmo.sqlite")  # um por máquina
+CLASSE_HTTP = "http"
+CLASSE_NAVEGADOR = "navegador"
+
+TAXA_INICIAL = 0.5          # req/s por host
+TAXA_MIN = 0.05
+TAXA_MAX = 4.0
+CONCORRENCIA_INICIAL = 2.0  # requisições em voo por host, somando todos os processos
+CONCORRENCIA_MAX = 8
+INCREMENTO_TAXA = 0.02
+INCREMENTO_CONCORRENCIA = 0.5
+FATOR_REDUCAO = 0.5
+RESFRIAMENTO = 2.0          # s entre reduções
+FATOR_PICO = 3.0
+LATENCIA_MIN_PICO = 2.0     # abaixo disso nunca é pico
+ALFA = 0.1                  # peso da amostra nova nas médias (latência, erros)
+LIMIAR_ERROS = 0.1          # acima disso não aumenta
+TTL_VAGA = 300.0
+ESPERA_VAGA = 0.25          # s até tentar de novo quando a concorrência está no limite
+RETRY_AFTER_MAX = 600.0
+# Páginas de erro do proxy do repositório chegam com status 200 no navegador
+ERROS_PROXY = ("Proxy Error", "502 Bad Gateway", "invalid response")
+
+_ESQUEMA = """
+CREATE TABLE IF NOT EXISTS hosts (
+    host TEXT PRIMARY KEY,
+    taxa REAL NOT NULL,
+    concorrencia REAL NOT NULL,
+    proximo REAL NOT NULL DEFAULT 0,
+    erros REAL NOT NULL DEFAULT 0,
+    ultima_reducao REAL NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS latencias (
+    host TEXT NOT NULL,
+    classe TEXT NOT NULL,
+    media REAL NOT NULL,
+    PRIMARY KEY (host, classe)
+);
+CREATE TABLE IF NOT EXISTS vagas (
+    id INTEGER PRIMARY KEY,
+    host TEXT NOT NULL,
+    pid INTEGER NOT NULL,
+    inicio REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS vagas_host ON vagas (host);
+"""
+
+
+def host_de(url):
+    return urlsplit(url).netloc or url
+
+
+def sobrecarga(status):
+    """Status que indicam servidor ou proxy sobrecarregado."""
+    return status == 429 or status >= 500
+
+
+class ErroProxy(Exception):
+    """Página de erro do proxy no lugar do conteúdo."""
+
+
+def erro_de_proxy(texto):
+    return any(err in (texto or "") for err in ERROS_PROXY)
+
+
+_RE_TITULO = re.compile(rb"<title[^>]*>(.*?)</title>", re.I | re.S)
+
+
+def corpo_erro_de_proxy(conteudo):
+    """Resposta HTTP (bytes) que é a página de erro do proxy, pelo <title>."""
+    m = _RE_TITULO.search(conteudo[:8192])
+    return bool(m) and erro_de_proxy(m.group(1).decode("utf-8", "replace"))
+
+
+def _retry_after(cabecalhos):
+    valor = (cabecalhos or {}).get("Retry-After")
+    if not valor:
+        return None
+    valor = valor.strip()
+    if valor.isdigit():
+        return min(float(valor), RETRY_AFTER_MAX)
+    try:
+        return min(max(parsedate_to_datetime(valor).timestamp() - time.time(), 0.0), RETRY_AFTER_MAX)
+    except (TypeError, ValueError):
+        return None
+
+
+def _motivo_excecao(exc):
+    # requests.HTTPError (.response.status_code) e aiohttp.ClientResponseError (.status)
+    resposta = getattr(exc, "response", None)
+    status = getattr(resposta, "status_code", None) or getattr(exc, "status", None)
+    if isinstance(status, int):
+        return f"http_{status}" if sobrecarga(status) else None
+    return type(exc).__name__
+
+
+class ControladorRitmo:
+    """Taxa e concorrência por host, AIMD, compartilhadas via SQLite."""
+
+    def __init__(self, caminho=RITMO_DB, taxa_max=TAXA_MAX, concorrencia_max=CONCORRENCIA_MAX,
+                 taxa_inicial=TAXA_INICIAL, log=None):
+        self.caminho = caminho
+        self.taxa_max = taxa_max
+        self.concorrencia_max = concorrencia_max
+        self.taxa_inicial = min(taxa_inicial, taxa_max)
+        self.log = log
+        self.reducoes = 0
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(caminho)), exist_ok=True)
+        self.conn = sqlite3.connect(caminho, timeout=60, isolation_level=None, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(_ESQUEMA)
+
+    # ---------- transações ----------
+    def _transacao(self, funcao, *args):
+        # BEGIN IMMEDIATE: a leitura e a escrita do host ficam atômicas entre processos
+        with self._lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                resultado = funcao(*args)
+            except BaseException:
+                self.conn.execute("ROLLBACK")
+                raise
+            self.conn.execute("COMMIT")
+            return resultado
+
+    def _linha(self, host):
+        linha = self.conn.execute(
+            "SELECT taxa, concorrencia, proximo, erros, ultima_reducao FROM hosts WHERE host = ?", (host,)
+        ).fetchone()
+        if linha is None:
+            linha = (self.taxa_inicial, CONCORRENCIA_INICIAL, 0.0, 0.0, 0.0)
+            self.conn.execute("INSERT INTO hosts (host, taxa, concorrencia) VALUES (?, ?, ?)",
+                              (host, linha[0], linha[1]))
+        return linha
+
+    # ---------- vagas ----------
+    def _reservar(self, host):
+        """(id da vaga, espera em s) ou (None, ESPERA_VAGA) se a concorrência está no limite."""
+        agora = time.time()
+        taxa, concorrencia, proximo, _, _ = self._linha(host)
+        self.conn.execute("DELETE FROM vagas WHERE inicio < ?", (agora - TTL_VAGA,))
+        em_voo = self.conn.execute("SELECT COUNT(*) FROM vagas WHERE host = ?", (host,)).fetchone()[0]
+        if em_voo >= max(1, int(min(concorrencia, self.concorrencia_max))):
+            return None, ESPERA_VAGA
+        inicio = max(agora, proximo)
+        self.conn.execute("UPDATE hosts SET proximo = ? WHERE host = ?",
+                          (inicio + 1.0 / min(taxa, self.taxa_max), host))
+        cursor = self.conn.execute("INSERT INTO vagas (host, pid, inicio) VALUES (?, ?, ?)",
+                                   (host, os.getpid(), inicio))
+        return cursor.lastrowid, inicio - agora
+
+    def adquirir(self, host):
+        """Bloqueia até a vez desta requisição; devolve o id da vaga."""
+        while True:
+            vaga, espera = self._transacao(self._reservar, host)
+            if espera > 0:
+                time.sleep(espera if vaga is not None else espera * (0.5 + random.random()))
+            if vaga is not None:
+                return vaga
+
+    async def adquirir_async(self, host):
+        # a transação espera o lock do SQLite (até 60 s com outros processos
+        # disputando): roda numa thread para não parar o event loop
+        while True:
+            vaga, espera = await asyncio.to_thread(self._transacao, self._reservar, host)
+            if espera > 0:
+                await asyncio.sleep(espera if vaga is not None else espera * (0.5 + random.random()))
+            if vaga is not None:
+                return vaga
+
+    # ---------- AIMD ----------
+    def _registrar(self, vaga, host, classe, latencia, motivo, retry_after):
+        agora = time.time()
+        if vaga is not None:
+            self.conn.execute("DELETE FROM vagas WHERE id = ?", (vaga,))
+        taxa, concorrencia, proximo, erros, ultima_reducao = self._linha(host)
+        media = self.conn.execute("SELECT media FROM latencias WHERE host = ? AND classe = ?",
+                                  (host, classe)).fetchone()
+        media = media[0] if media else None
+        if motivo is None and latencia is not None:
+            if media is not None and latencia > max(FATOR_PICO * media, LATENCIA_MIN_PICO):
+                motivo = "latencia"
+            # picos também entram na média: uma mudança duradoura vira o novo normal
+            media = latencia if media is None else (1 - ALFA) * media + ALFA * latencia
+            self.conn.execute("INSERT INTO latencias (host, classe, media) VALUES (?, ?, ?) "
+                              "ON CONFLICT(host, classe) DO UPDATE SET media = excluded.media",
+                              (host, classe, media))
+        erros = (1 - ALFA) * erros + (ALFA if motivo else 0.0)
+        reduziu = False
+        if motivo:
+            if agora - ultima_reducao >= RESFRIAMENTO:
+                taxa = max(TAXA_MIN, taxa * FATOR_REDUCAO)
+                concorrencia = max(1.0, concorrencia * FATOR_REDUCAO)
+                ultima_reducao = agora
+                reduziu = True
+            if retry_after:
+                proximo = max(proximo, agora + retry_after)
+        elif erros < LIMIAR_ERROS:
+            taxa = min(self.taxa_max, taxa + INCREMENTO_TAXA)
+            concorrencia = min(float(self.concorrencia_max), concorrencia + INCREMENTO_CONCORRENCIA / concorrencia)
+        self.conn.execute("UPDATE hosts SET taxa = ?, concorrencia = ?, proximo = ?, erros = ?, ultima_reducao = ? "
+                          "WHERE host = ?", (taxa, concorrencia, proximo, erros, ultima_reducao, host))
+        return reduziu, motivo, taxa, concorrencia
+
+    def concluir(self, vaga, host, classe=CLASSE_HTTP, latencia=None, motivo=None, retry_after=None):
+        """Libera a vaga e ajusta o ritmo. motivo None = resposta saudável."""
+        reduziu, motivo, taxa, concorrencia = self._transacao(
+            self._registrar, vaga, host, classe, latencia, motivo, retry_after)
+        if reduziu:
+            self.reducoes += 1
+            if self.log:
+                espera = f", Retry-After {retry_after:.0f}s" if retry_after else ""
+                self.log(f"RITMO: {host} {motivo} -> {taxa:.2f} req/s, concorrência {int(concorrencia)}{espera}")
+
+    def penalizar(self, url, motivo, classe=CLASSE_HTTP):
+        """Sinal depois da requisição (ex.: página de erro do proxy com status 200)."""
+        self.concluir(None, host_de(url), classe, motivo=motivo)
+
+    def requisicao(self, url, classe=CLASSE_HTTP):
+        return Requisicao(self, url, classe)
+
+    # ---------- consulta ----------
+    def estado(self, host=None):
+        with self._lock:
+            consulta = "SELECT host, taxa, concorrencia, erros FROM hosts"
+            linhas = self.conn.execute(consulta + (" WHERE host = ?" if host else ""),
+                                       (host,) if host else ()).fetchall()
+        return {h: {"taxa": round(min(t, self.taxa_max), 3), "concorrencia": int(c), "erros": round(e, 3)}
+                for h, t, c, e in linhas}
+
+    def resumo(self):
+        return "; ".join(f"{h}: {d['taxa']} req/s, concorrência {d['concorrencia']}"
+                         for h, d in self.estado().items()) or "sem requisições"
+
+    def fechar(self):
+        with self._lock:
+            self.conn.close()
+
+
+class Requisicao:
+    """Uma requisição controlada; `with` (threads) ou `async with` (asyncio)."""
+
+    def __init__(self, controlador, url, classe=CLASSE_HTTP):
+        self.controlador = controlador
+        self.host = host_de(url)
+        self.classe = classe
+        self.motivo = None
+        self.retry_after = None
+        self.vaga = None
+        self.inicio = None
+
+    def resposta(self, status, cabecalhos=None):
+        if sobrecarga(status):
+            self.motivo = f"http_{status}"
+            self.retry_after = _retry_after(cabecalhos)
+
+    def sinalizar(self, motivo):
+        """Falha percebida no conteúdo (ex.: "proxy")."""
+        self.motivo = motivo
+
+    def _resultado(self, exc):
+        """Argumentos de concluir(); a latência é medida aqui, antes de qualquer espera."""
+        if exc is not None and self.motivo is None:
+            self.motivo = _motivo_excecao(exc)
+        # latência só de respostas: timeout não diz nada sobre o tempo normal
+        latencia = time.monotonic() - self.inicio if exc is None else None
+        return self.vaga, self.host, self.classe, latencia, self.motivo, self.retry_after
+
+    def __enter__(self):
+        self.vaga = self.controlador.adquirir(self.host)
+        self.inicio = time.monotonic()
+        return self
+
+    def __exit__(self, tipo, exc, tb):
+        self.controlador.concluir(*self._resultado(exc))
+        return False
+
+    async def __aenter__(self):
+        self.vaga = await self.controlador.adquirir_async(self.host)
+        self.inicio = time.monotonic()
+        return self
+
+    async def __aexit__(self, tipo, exc, tb):
+        await asyncio.to_thread(self.controlador.concluir, *self._resultado(exc))
+        return False
+
+
+class _SemControle:
+    def resposta(self, status, cabecalhos=None):
+        pass
+
+    def sinalizar(self, motivo):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, tipo, exc, tb):
+        return False
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, tipo, exc, tb):
+        return False
+
+
+SEM_CONTROLE = _SemControle()
+
+
+def requisicao(controlador, url, classe=CLASSE_HTTP):
+    """Requisição controlada por `controlador`, ou sem controle se ele for None."""
+    return SEM_CONTROLE if controlador is None else controlador.requisicao(url, classe)
+
+
+def penalizar(controlador, url, motivo, classe=CLASSE_HTTP):
+    if controlador is not None:
+        controlador.penalizar(url, motivo, classe)
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+servidor_oai.py
+Endpoint OAI-PMH local que serve os XMLs de fixtures/oai/ (sem rede).
+Também responde /metadata/handle/<h>/mets.xml com fixtures/mets/item.xml.
+
+    python fixtures/servidor_oai.py --port 8080
+    python artigos_data/artigos_data_scraper.py --engine oai --oai-url http://127.0.0.1:8080/oai/request
+
+ListRecords sem token devolve listrecords_1.xml (com resumptionToken),
+com token devolve listrecords_2.xml (última página). Um `from` anterior a
+2000 devolve noRecordsMatch.
+"""
+
+import os
+import argparse
+from urllib.parse import urlsplit, parse_qs
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+DIR_OAI = os.path.join(os.path.dirname(os.path.abspath(__file__)), "oai")
+ITEM_METS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "mets", "item.xml")
+
+
+def escolher_fixture(params):
+    if params.get("verb") != "ListRecords":
+        return None
+    if "resumptionToken" in params:
+        return "listrecords_2.xml"
+    if params.get("from", "2000") < "2000":
+        return "sem_registros.xml"
+    return "listrecords_1.xml"
+
+
+class Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        caminho = urlsplit(self.path).path
+        params = {k: v[0] for k, v in parse_qs(urlsplit(self.path).query).items()}
+        if caminho.startswith("/metadata/handle/") and caminho.endswith("/mets.xml"):
+            arquivo = ITEM_METS
+        else:
+            nome = escolher_fixture(params)
+            if nome is None:
+                self.send_response(400)
+                self.end_headers()
+                return
+            arquivo = os.path.join(DIR_OAI, nome)
+        with open(arquivo, "rb") as f:
+            corpo = f.read()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/xml; charset=utf-8")
+        self.send_header("Content-Length", str(len(corpo)))
+        self.end_headers()
+        self.wfile.write(corpo)
+
+    def log_message(self, *args):
+        pass
+
+
+def servir(porta=8080):
+    servidor = ThreadingHTTPServer(("127.0.0.1", porta), Handler)
+    servidor.serve_forever()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--port", type=int, default=8080)
+    args = parser.parse_args()
+    servir(args.port)
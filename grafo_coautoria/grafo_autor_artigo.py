@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+grafo_autor_artigo.py
+Grafo bipartido autor x artigo e projeção de coautoria.
+
+Lê as arestas (author_ref, handle_id) gravadas pelo scraper de autores
+(autor_artigo.parquet; sem ele, a coluna Handles de autores_completo.parquet)
+em record batches, dá ids densos a autores e handles e monta:
+  - B: matriz de incidência autor x artigo (scipy CSR, 1 = autor do artigo);
+  - C = B·Bᵀ sem a diagonal: C[i, j] = artigos em comum entre i e j.
+
+Artigos com mais de --max-autores-por-artigo autores ficam em B mas fora de C
+(um artigo com n autores gera n² pares na projeção).
+
+Saída (em --saida):
+  incidencia_autor_artigo.npz, coautoria.npz   scipy.sparse.save_npz
+  autores_ids.parquet   author_id, author_ref, n_artigos, grau_coautoria, coautorias
+  artigos_ids.parquet   article_id, handle_id, n_autores, coletado
+  resumo.json           contagens e tempo de cada etapa
+
+    python grafo_autor_artigo.py
+    python grafo_autor_artigo.py --somente-coletados --max-autores-por-artigo 50
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+from datetime import datetime
+from contextlib import contextmanager
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+from scipy import sparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from comum.parquet_incremental import abrir_dataset, listar_partes
+
+# ---------- CONFIG ----------
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ARESTAS_FILE = os.path.join(RAIZ, "autors_unificado", "saida_conicet_autores", "autor_artigo.parquet")
+AUTORES_FILE = os.path.join(RAIZ, "autors_unificado", "saida_conicet_autores", "autores_completo.parquet")
+ARTIGOS_FILE = os.path.join(RAIZ, "artigos_data", "arq_articulos_authors", "articulos.parquet")
+OUTPUT_DIR = "saida_grafo"
+
+LINHAS_POR_BATCH = 1024 * 1024
+MAX_AUTORES_POR_ARTIGO = 100
+RE_HANDLE = r"11336/(?P<handle>\d+)"
+
+
+# ---------- HELPERS ----------
+def log(msg):
+    print(f"{datetime.utcnow().isoformat()} - {msg}", flush=True)
+
+
+@contextmanager
+def etapa(tempos, nome):
+    inicio = time.perf_counter()
+    yield
+    tempos[nome] = round(time.perf_counter() - inicio, 3)
+    log(f"{nome}: {tempos[nome]}s")
+
+
+def _handles_de_texto(coluna):
+    """URLs/URIs -> int32 do handle (nulo se a string não tem 11336/<n>)."""
+    extraido = pc.extract_regex(pc.fill_null(coluna.cast(pa.string()), ""), RE_HANDLE)
+    return pc.cast(pc.struct_field(extraido, [0]), pa.int32())
+
+
+# ---------- LEITURA DAS ARESTAS ----------
+def lotes_arestas(arestas_file=ARESTAS_FILE, autores_file=AUTORES_FILE):
+    """Gera (author_ref: pa.Array string, handle_id: np.int32) por record batch."""
+    if listar_partes(arestas_file):
+        log(f"Arestas de {arestas_file}")
+        for batch in abrir_dataset(arestas_file).to_batches(columns=["author_ref", "handle_id"],
+                                                              batch_size=LINHAS_POR_BATCH):
+            refs = batch.column(0)
+            if pa.types.is_dictionary(refs.type):
+                refs = refs.dictionary_decode()
+            yield refs, batch.column(1).to_numpy(zero_copy_only=False).astype(np.int32)
+        return
+
+    # sem o arquivo de arestas: explode Handles (list<int32> ou "a|b|c" legado) sem laço em Python
+    log(f"Sem {arestas_file}; usando a coluna Handles de {autores_file}")
+    for batch in abrir_dataset(autores_file).to_batches(columns=["Referencia", "Handles"],
+                                                         batch_size=LINHAS_POR_BATCH // 16):
+        refs, handles = batch.column(0), batch.column(1)
+        if pa.types.is_string(handles.type) or pa.types.is_large_string(handles.type):
+            handles = pc.split_pattern(pc.fill_null(handles, ""), "|")
+        pais = pc.list_parent_indices(handles)
+        valores = pc.list_flatten(handles)
+        if not pa.types.is_integer(valores.type):
+            validos = pc.match_substring_regex(valores, r"^\d+$")
+            valores, pais = valores.filter(validos), pais.filter(validos)
+        refs = refs.take(pais).cast(pa.string())
+        yield refs, pc.cast(valores, pa.int32()).to_numpy(zero_copy_only=False)
+
+
+def handles_coletados(artigos_file=ARTIGOS_FILE):
+    """Handles presentes no dataset de artigos (url; URI quando url não tem handle)."""
+    if not listar_partes(artigos_file):
+        return None
+    dataset = abrir_dataset(artigos_file)
+    colunas = [c for c in ("url", "URI") if c in dataset.schema.names]
+    encontrados = []
+    for batch in dataset.to_batches(columns=colunas, batch_size=LINHAS_POR_BATCH):
+        ids = _handles_de_texto(batch.column(0))
+        if len(colunas) > 1:
+            ids = pc.coalesce(ids, _handles_de_texto(batch.column(1)))
+        encontrados.append(ids.drop_null().to_numpy())
+    return np.unique(np.concatenate(encontrados)) if encontrados else np.zeros(0, dtype=np.int32)
+
+
+# ---------- CONSTRUÇÃO ----------
+def construir(arestas_file=ARESTAS_FILE, autores_file=AUTORES_FILE, artigos_file=ARTIGOS_FILE,
+              max_autores_por_artigo=MAX_AUTORES_POR_ARTIGO, somente_coletados=False):
+    tempos = {}
+
+    with etapa(tempos, "artigos_coletados"):
+        coletados = handles_coletados(artigos_file)
+    if somente_coletados and coletados is None:
+        raise RuntimeError(f"--somente-coletados sem dataset de artigos em {artigos_file}")
+
+    # passada 1: vocabulários (autores e handles distintos), já ordenados
+    with etapa(tempos, "ids"):
+        refs_unicos, handles_unicos = [], []
+        for refs, handles in lotes_arestas(arestas_file, autores_file):
+            refs_unicos.append(pc.unique(refs))
+            handles_unicos.append(np.unique(handles))
+        autores = pc.unique(pa.chunked_array(refs_unicos, type=pa.string()))
+        autores = autores.filter(pc.is_valid(autores)).take(pc.sort_indices(autores))
+        handles = np.unique(np.concatenate(handles_unicos)) if handles_unicos else np.zeros(0, dtype=np.int32)
+        if somente_coletados:
+            handles = handles[np.isin(handles, coletados)]
+    log(f"{len(autores)} autores, {len(handles)} artigos")
+
+    # passada 2: (linha, coluna) densos
+    with etapa(tempos, "arestas"):
+        linhas, colunas = [], []
+        for refs, hs in lotes_arestas(arestas_file, autores_file):
+            indices = pc.index_in(refs, value_set=autores)
+            ids_autor = pc.fill_null(indices, -1).to_numpy(zero_copy_only=False)
+            pos = np.searchsorted(handles, hs)
+            # handle fora do vocabulário (ex.: --somente-coletados) ou autor nulo: aresta descartada
+            validos = (ids_autor >= 0) & (pos < len(handles))
+            validos[validos] &= handles[pos[validos]] == hs[validos]
+            linhas.append(ids_autor[validos].astype(np.int32))
+            colunas.append(pos[validos].astype(np.int32))
+        linhas = np.concatenate(linhas) if linhas else np.zeros(0, dtype=np.int32)
+        colunas = np.concatenate(colunas) if colunas else np.zeros(0, dtype=np.int32)
+
+    with etapa(tempos, "incidencia_csr"):
+        B = sparse.csr_matrix((np.ones(len(linhas), dtype=np.int32), (linhas, colunas)),
+                              shape=(len(autores), len(handles)))
+        B.sum_duplicates()
+        B.data[:] = 1   # aresta repetida (partes duplicadas) conta uma vez
+        del linhas, colunas
+    n_artigos = np.diff(B.indptr)
+    n_autores = np.asarray(B.sum(axis=0)).ravel()
+    log(f"Incidência: {B.shape[0]}x{B.shape[1]}, {B.nnz} arestas")
+
+    with etapa(tempos, "coautoria"):
+        grandes = n_autores > max_autores_por_artigo
+        Bp = B[:, ~grandes] if grandes.any() else B
+        C = (Bp @ Bp.T).tocsr()
+        C.setdiag(0)
+        C.eliminate_zeros()
+        grau = np.diff(C.indptr)
+        coautorias = np.asarray(C.sum(axis=1)).ravel()
+    log(f"Coautoria: {C.nnz // 2} pares de autores; {int(grandes.sum())} artigos com mais de "
+        f"{max_autores_por_artigo} autores fora da projeção")
+
+    resumo = {
+        "autores": int(B.shape[0]),
+        "artigos": int(B.shape[1]),
+        "arestas": int(B.nnz),
+        "pares_coautoria": int(C.nnz // 2),
+        "artigos_fora_da_projecao": int(grandes.sum()),
+        "max_autores_por_artigo": max_autores_por_artigo,
+        "grau_medio": round(float(grau.mean()), 3) if len(grau) else 0.0,
+        "grau_maximo": int(grau.max()) if len(grau) else 0,
+        "autores_isolados": int((grau == 0).sum()),
+        "artigos_coletados": int(np.isin(handles, coletados).sum()) if coletados is not None else None,
+    }
+    mapa_autores = pa.table({
+        "author_id": pa.array(np.arange(len(autores), dtype=np.int32)),
+        "author_ref": autores,
+        "n_artigos": pa.array(n_artigos.astype(np.int32)),
+        "grau_coautoria": pa.array(grau.astype(np.int32)),
+        "coautorias": pa.array(coautorias.astype(np.int64)),
+    })
+    mapa_artigos = pa.table({
+        "article_id": pa.array(np.arange(len(handles), dtype=np.int32)),
+        "handle_id": pa.array(handles.astype(np.int32)),
+        "n_autores": pa.array(n_autores.astype(np.int32)),
+        "coletado": pa.array(np.isin(handles, coletados) if coletados is not None else np.zeros(len(handles), bool)),
+    })
+    return B, C, mapa_autores, mapa_artigos, resumo, tempos
+
+
+def salvar(saida, B, C, mapa_autores, mapa_artigos, resumo):
+    os.makedirs(saida, exist_ok=True)
+    sparse.save_npz(os.path.join(saida, "incidencia_autor_artigo.npz"), B)
+    sparse.save_npz(os.path.join(saida, "coautoria.npz"), C)
+    pq.write_table(mapa_autores, os.path.join(saida, "autores_ids.parquet"), compression="zstd")
+    pq.write_table(mapa_artigos, os.path.join(saida, "artigos_ids.parquet"), compression="zstd")
+    with open(os.path.join(saida, "resumo.json"), "w", encoding="utf-8") as f:
+        json.dump(resumo, f, indent=2, ensure_ascii=False)
+
+
+# ---------- CLI ----------
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--arestas", type=str, default=ARESTAS_FILE, help="dataset (author_ref, handle_id)")
+    parser.add_argument("--autores", type=str, default=AUTORES_FILE, help="usado se não houver arestas")
+    parser.add_argument("--artigos", type=str, default=ARTIGOS_FILE, help="dataset de artigos (coluna url/URI)")
+    parser.add_argument("--saida", type=str, default=OUTPUT_DIR)
+    parser.add_argument("--max-autores-por-artigo", type=int, default=MAX_AUTORES_POR_ARTIGO,
+                        help="artigos com mais autores ficam fora da projeção de coautoria")
+    parser.add_argument("--somente-coletados", action="store_true",
+                        help="só artigos presentes no dataset de artigos")
+    args = parser.parse_args()
+
+    inicio = time.perf_counter()
+    B, C, mapa_autores, mapa_artigos, resumo, etapas = construir(
+        arestas_file=args.arestas, autores_file=args.autores, artigos_file=args.artigos,
+        max_autores_por_artigo=args.max_autores_por_artigo, somente_coletados=args.somente_coletados,
+    )
+    resumo["tempos_s"] = dict(etapas, total=round(time.perf_counter() - inicio, 3))
+    salvar(args.saida, B, C, mapa_autores, mapa_artigos, resumo)
+    log(f"Grafo salvo em {args.saida}: {json.dumps(resumo, ensure_ascii=False)}")
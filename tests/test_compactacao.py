@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+test_compactacao.py
+comum/compactacao.py sobre datasets gravados pelo EscritorParquet: fica a
+última versão de cada chave mesmo quando ela muda de partição, linhas sem
+chave não são descartadas e recuperar() desfaz uma troca de diretórios
+interrompida.
+
+    python -m pytest tests
+"""
+
+import os
+import sys
+import shutil
+
+import pytest
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+pytest.importorskip("pyarrow")
+
+from comum.parquet_incremental import EscritorParquet, ler_dataset, listar_partes
+from comum.compactacao import compactar, recuperar, PARTICOES, SUFIXO_NOVO, SUFIXO_ANTIGO
+
+COLUNAS = ["url", "Titulo", "Data de Publicacao", "Tipo de Recurso"]
+
+
+def _artigo(url, titulo, data, tipo="Artículo"):
+    return {"url": url, "Titulo": titulo, "Data de Publicacao": data, "Tipo de Recurso": tipo}
+
+
+def _gravar(destino, *flushes):
+    """Uma parte por lista de linhas, na ordem (como flushes sucessivos do scraper)."""
+    escritor = EscritorParquet(destino, colunas=COLUNAS, flush_automatico=False)
+    for linhas in flushes:
+        for linha in linhas:
+            escritor.escrever(linha)
+        escritor.flush()
+
+
+def _linhas(destino):
+    dados = ler_dataset(destino)
+    # url nula vira NaN no pandas
+    return sorted((r["url"] if isinstance(r["url"], str) else "", r["Titulo"], str(r["ano"]))
+                  for r in dados.to_dict("records"))
+
+
+def test_duplicadas_entre_particoes(tmp_path):
+    destino = str(tmp_path / "articulos.parquet")
+    _gravar(destino, [_artigo("a", "a v1", "2019"), _artigo("b", "b v1", "2020-03")])
+    relatorio = compactar(destino, "url", particoes=PARTICOES["artigos"])
+    assert relatorio["duplicadas"] == 0
+    assert os.path.isdir(os.path.join(destino, "ano=2019", "tipo=Art%C3%ADculo"))
+
+    # nova versão de "a" numa parte plana e em outro ano: a de ano=2019 sai
+    _gravar(destino, [_artigo("a", "a v2", "2021")], [_artigo("b", "b v2", "2020")])
+    relatorio = compactar(destino, "url", particoes=PARTICOES["artigos"])
+    assert relatorio["linhas_lidas"] == 4
+    assert relatorio["duplicadas"] == 2
+    assert relatorio["linhas_escritas"] == 2
+    assert _linhas(destino) == [("a", "a v2", "2021"), ("b", "b v2", "2020")]
+    assert not os.path.exists(os.path.join(destino, "ano=2019"))
+    assert all(os.path.dirname(p) != destino for p in listar_partes(destino))
+
+
+def test_linhas_sem_chave_mantidas(tmp_path):
+    destino = str(tmp_path / "articulos.parquet")
+    _gravar(destino, [_artigo(None, "sem url 1", "2019"), _artigo("a", "a v1", "2019")],
+            [_artigo(None, "sem url 2", "2019"), _artigo("a", "a v2", "2019")])
+    relatorio = compactar(destino, "url", particoes=PARTICOES["artigos"])
+    assert relatorio["linhas_sem_chave"] == 2
+    assert relatorio["duplicadas"] == 1
+    assert _linhas(destino) == [("", "sem url 1", "2019"), ("", "sem url 2", "2019"), ("a", "a v2", "2019")]
+
+
+def test_simular_nao_reescreve(tmp_path):
+    destino = str(tmp_path / "articulos.parquet")
+    _gravar(destino, [_artigo("a", "a v1", "2019")], [_artigo("a", "a v2", "2019")])
+    partes = listar_partes(destino)
+    relatorio = compactar(destino, "url", simular=True)
+    assert relatorio["duplicadas"] == 1
+    assert listar_partes(destino) == partes
+
+
+def test_dataset_inexistente(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        compactar(str(tmp_path / "nao_existe.parquet"), "url")
+
+
+def test_recuperar_troca_interrompida(tmp_path):
+    destino = str(tmp_path / "articulos.parquet")
+    _gravar(destino, [_artigo("a", "a v1", "2019")], [_artigo("a", "a v2", "2019")])
+    # caiu entre os dois os.replace: só existem .antigo e .compactando
+    os.replace(destino, destino + SUFIXO_ANTIGO)
+    os.makedirs(destino + SUFIXO_NOVO)
+    recuperar(destino)
+    assert os.path.isdir(destino)
+    assert not os.path.exists(destino + SUFIXO_ANTIGO)
+    assert not os.path.exists(destino + SUFIXO_NOVO)
+    assert len(listar_partes(destino)) == 2
+
+    # caiu antes de apagar o .antigo: a troca já valeu, compactar() limpa e segue
+    shutil.copytree(destino, destino + SUFIXO_ANTIGO)
+    relatorio = compactar(destino, "url")
+    assert relatorio["linhas_escritas"] == 1
+    assert not os.path.exists(destino + SUFIXO_ANTIGO)
+    assert ler_dataset(destino)["Titulo"].tolist() == ["a v2"]
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+test_migracao_handles.py
+Parquet de autores antigo (um arquivo só, gravado com DataFrame.to_parquet e
+Handles em texto "id|id") convertido na primeira gravação nova: Handles vira
+list<int32>, as arestas vão para autor_artigo.parquet e o dataset inteiro
+continua legível. Com pandas >= 3 a coluna sai large_string.
+
+    python -m pytest tests
+"""
+
+import os
+import sys
+import importlib
+
+import pytest
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+pd = pytest.importorskip("pandas")
+pa = pytest.importorskip("pyarrow")
+import pyarrow.parquet as pq
+
+from comum.parquet_incremental import ler_dataset
+
+
+@pytest.fixture
+def autores(tmp_path, monkeypatch):
+    # o script cria pastas de saída e logs no diretório atual ao ser importado
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.syspath_prepend(os.path.join(RAIZ, "autors_unificado"))
+    monkeypatch.setattr(sys, "argv", [sys.argv[0]])
+    # recarrega a cada teste: as pastas de saída são criadas na importação
+    if "authors_data_scraper" in sys.modules:
+        return importlib.reload(sys.modules["authors_data_scraper"])
+    return importlib.import_module("authors_data_scraper")
+
+
+def _linha(autores, n, handles):
+    linha = {c: "" for c in autores.CSV_COLUMNS}
+    linha.update({"Autor": f"Autor {n}", "Referencia": f"ref{n}", "Conicet": n % 2 == 0,
+                  "Quantidade de Handles": len(handles), "Handles": "|".join(map(str, handles))})
+    return linha
+
+
+@pytest.mark.parametrize("gravacao", ["pandas", "string"])
+def test_parquet_legado_convertido(autores, gravacao):
+    legado = [_linha(autores, 1, [10, 2]), _linha(autores, 2, []), _linha(autores, 3, [7])]
+    df = pd.DataFrame(legado, columns=autores.CSV_COLUMNS)
+    if gravacao == "pandas":
+        # como o script antigo gravava (read + concat + to_parquet)
+        df.to_parquet(autores.PARQUET_FILE, index=False, engine="pyarrow", compression="snappy")
+    else:
+        # pandas < 3: colunas de texto como string
+        tabela = pa.Table.from_pandas(df, preserve_index=False)
+        tabela = tabela.cast(pa.schema([f.with_type(pa.string()) if pa.types.is_large_string(f.type) else f
+                                        for f in tabela.schema]))
+        pq.write_table(tabela, autores.PARQUET_FILE)
+
+    autores.append_parquet_row(_linha(autores, 4, [5, 3]))
+    autores.close_parquet()
+
+    dados = ler_dataset(autores.PARQUET_FILE).sort_values("Referencia")
+    assert dados["Referencia"].tolist() == ["ref1", "ref2", "ref3", "ref4"]
+    assert [list(h) for h in dados["Handles"]] == [[2, 10], [], [7], [3, 5]]
+
+    arestas = ler_dataset(autores.EDGES_FILE)
+    pares = sorted(zip(arestas["author_ref"].astype(str), arestas["handle_id"]))
+    assert pares == [("ref1", 2), ("ref1", 10), ("ref3", 7), ("ref4", 3), ("ref4", 5)]